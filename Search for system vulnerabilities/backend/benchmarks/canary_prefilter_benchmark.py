@@ -0,0 +1,124 @@
+"""
+Canary ön elemesi ve istek paketleme karşılaştırması
+Çok alanlı formlarda ve parametreli URL'lerde, alanların yalnızca bir kısmı yansırken gönderilen istek sayısını ölçer
+
+Kullanım (backend dizininden):
+    python benchmarks/canary_prefilter_benchmark.py --fields 30 --reflecting 3
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scanners.http_client import ScannerHTTPClient
+from scanners.xss_scanner import XSSScanner
+
+
+class ContextTarget:
+    """İlk alanı HTML gövdesine, ikincisini attribute'a, üçüncüsünü script'e yansıtan; diğerlerini yansıtmayan sunucu"""
+
+    def __init__(self, fields: int, reflecting: int):
+        self.fields = [f"f{index}" for index in range(fields)]
+        self.reflecting = self.fields[:reflecting]
+        self.requests = 0
+        self.runner = None
+        self.url = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/", self._page)
+        app.router.add_get("/search", self._reflect)
+        app.router.add_post("/comment", self._reflect)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def _page(self, request: web.Request):
+        self.requests += 1
+        inputs = "".join(f'<input name="{name}">' for name in self.fields)
+        page = (f'<html><body><form action="/search" method="get">{inputs}</form>'
+                f'<form action="/comment" method="post">{inputs}</form></body></html>')
+        return web.Response(text=page, content_type="text/html")
+
+    async def _reflect(self, request: web.Request):
+        self.requests += 1
+        values = dict(request.query)
+        if request.method == "POST":
+            values.update(await request.post())
+
+        # Bilerek güvensiz: yansıyan alanlar farklı bağlamlara kaçışsız yazılır
+        body = ["<html><body><p>Sonuçlar</p>"]
+        for index, name in enumerate(self.reflecting):
+            value = values.get(name)
+            if value is None:
+                continue
+            if index % 3 == 0:
+                body.append(f"<div>{value}</div>")
+            elif index % 3 == 1:
+                body.append(f'<input type="text" value="{value}">')
+            else:
+                body.append(f"<script>var term = '{value}';</script>")
+        body.append("</body></html>")
+        return web.Response(text="".join(body), content_type="text/html")
+
+
+async def bench(target: ContextTarget, canary: bool, packing: bool) -> dict:
+    client = ScannerHTTPClient()
+    scanner = XSSScanner({"canary_prefilter": canary, "probe_packing": packing}, http_client=client)
+    query = "&".join(f"{name}=1" for name in target.fields)
+    target.requests = 0
+    try:
+        started = time.perf_counter()
+        result = await scanner.scan(f"{target.url}/?{query}")
+        elapsed = time.perf_counter() - started
+    finally:
+        await client.close()
+
+    return {
+        "canary_prefilter": canary,
+        "probe_packing": packing,
+        "server_requests": target.requests,
+        "elapsed": round(elapsed, 3),
+        "findings": len(result.vulnerabilities),
+        "reflected_params_found": len({vuln.description for vuln in result.vulnerabilities if "Reflected" in vuln.title})
+    }
+
+
+async def main(args):
+    target = ContextTarget(args.fields, args.reflecting)
+    await target.start()
+    try:
+        results = []
+        for canary in (False, True):
+            for packing in (False, True):
+                results.append(await bench(target, canary, packing))
+    finally:
+        await target.stop()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.fields} alan (GET form, POST form, URL parametresi olarak), {args.reflecting} tanesi yansıyor")
+    for result in results:
+        print(", ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Canary ön elemesi ve istek paketleme karşılaştırması")
+    parser.add_argument("--fields", type=int, default=30, help="Form ve URL'deki parametre sayısı")
+    parser.add_argument("--reflecting", type=int, default=3, help="Yansıyan parametre sayısı")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,159 @@
+"""
+HTML ayrıştırıcı altyapısı karşılaştırması
+lxml ve BeautifulSoup (html.parser) altyapılarını aynı sayfa derlemi üzerinde ölçer, çıkarım sonuçlarını karşılaştırır
+
+Kullanım (backend dizininden):
+    python benchmarks/html_parser_benchmark.py --corpus /path/to/html_pages
+    python benchmarks/html_parser_benchmark.py --synthetic 5 --size 2000000
+
+Derlem dizini verilmezse büyük sentetik sayfalar üretilir.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scanners.html_analysis import HTML_PARSERS, LXML_AVAILABLE
+
+
+def load_corpus(directory: str) -> List[Tuple[str, str]]:
+    """Dizindeki .html/.htm dosyalarını okur"""
+    pages = []
+    for path in sorted(Path(directory).rglob("*")):
+        if path.suffix.lower() in (".html", ".htm") and path.is_file():
+            pages.append((path.name, path.read_text(encoding="utf-8", errors="replace")))
+    return pages
+
+
+def synthetic_page(size: int, seed: int) -> str:
+    """Form, script, event handler ve iç içe blokları olan büyük sayfa üretir"""
+    rng = random.Random(seed)
+    parts = ["<!DOCTYPE html><html><head><title>Sentetik sayfa</title>",
+             "<script>window.dataLayer = window.dataLayer || [];</script></head><body>"]
+    length = sum(len(part) for part in parts)
+    index = 0
+
+    while length < size:
+        index += 1
+        choice = rng.random()
+        if choice < 0.05:
+            inputs = "".join(f'<input type="text" name="field{index}_{n}" value="v{n}">' for n in range(rng.randint(2, 8)))
+            block = (f'<form action="/submit/{index}" method="{rng.choice(["get", "post"])}">{inputs}'
+                     f'<textarea name="note{index}"></textarea><select name="opt{index}"><option>1</option></select></form>')
+        elif choice < 0.10:
+            block = f"<script>var item{index} = document.getElementById('i{index}'); item{index}.innerHTML = '{index}';</script>"
+        elif choice < 0.20:
+            block = f'<button id="b{index}" onclick="track({index})" onmouseover="hover(this)">Tıkla {index}</button>'
+        else:
+            words = " ".join(rng.choice(["lorem", "ipsum", "dolor", "sit", "amet", "güvenlik", "tarama"]) for _ in range(30))
+            block = (f'<div class="row c{index % 7}"><div class="col"><p>{words}</p>'
+                     f'<a href="/page/{index}?ref=list&amp;id={index}">Bağlantı {index}</a>'
+                     f'<ul><li>{index}</li><li>{index + 1}</li></ul></div></div>')
+        parts.append(block)
+        length += len(block)
+
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def bench_backend(name: str, pages: List[Tuple[str, str]], repeat: int) -> Tuple[dict, list]:
+    """Ayrıştırıcıyı tüm sayfalarda `repeat` kez çalıştırır"""
+    parser = HTML_PARSERS[name]()
+    total_bytes = sum(len(content.encode("utf-8")) for _, content in pages) * repeat
+    analyses = []
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        analyses = [parser.parse(content) for _, content in pages]
+    elapsed = time.perf_counter() - started
+
+    return {
+        "backend": name,
+        "pages": len(pages),
+        "repeat": repeat,
+        "elapsed": round(elapsed, 3),
+        "ms_per_page": round(elapsed * 1000 / (len(pages) * repeat), 2),
+        "mb_per_second": round(total_bytes / elapsed / 1_000_000, 2),
+        "forms": sum(len(analysis.forms) for analysis in analyses),
+        "fields": sum(len(form.fields) for analysis in analyses for form in analysis.forms),
+        "scripts": sum(len(analysis.scripts) for analysis in analyses),
+        "event_handlers": sum(len(analysis.event_handlers) for analysis in analyses)
+    }, analyses
+
+
+async def measure_loop_lag(name: str, content: str, offload: bool) -> float:
+    """Ayrıştırma sırasında olay döngüsündeki en büyük gecikme (ms)"""
+    parser = HTML_PARSERS[name]()
+    lag = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal lag
+        while not done:
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag = max(lag, time.perf_counter() - started - 0.001)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    if offload:
+        await asyncio.to_thread(parser.parse, content)
+    else:
+        parser.parse(content)
+    done = True
+    await task
+    return round(lag * 1000, 1)
+
+
+def main(args):
+    if args.corpus:
+        pages = load_corpus(args.corpus)
+        if not pages:
+            sys.exit(f"Derlemde HTML dosyası bulunamadı: {args.corpus}")
+    else:
+        pages = [(f"synthetic_{seed}.html", synthetic_page(args.size, seed)) for seed in range(args.synthetic)]
+
+    backends = ["bs4"] + (["lxml"] if LXML_AVAILABLE else [])
+    results = []
+    analyses = {}
+    for name in backends:
+        result, analyses[name] = bench_backend(name, pages, args.repeat)
+        largest = max((content for _, content in pages), key=len)
+        result["loop_lag_ms_inline"] = asyncio.run(measure_loop_lag(name, largest, offload=False))
+        result["loop_lag_ms_thread"] = asyncio.run(measure_loop_lag(name, largest, offload=True))
+        results.append(result)
+
+    # Altyapıların sayfa başına aynı sonucu verip vermediği
+    mismatches = []
+    if len(analyses) == 2:
+        for (page_name, _), bs4_analysis, lxml_analysis in zip(pages, analyses["bs4"], analyses["lxml"]):
+            if bs4_analysis != lxml_analysis:
+                mismatches.append(page_name)
+
+    if args.json:
+        print(json.dumps({"results": results, "mismatched_pages": mismatches}, indent=2))
+        return
+
+    total_mb = sum(len(content) for _, content in pages) / 1_000_000
+    print(f"Derlem: {len(pages)} sayfa, {total_mb:.1f} MB")
+    for result in results:
+        print(f"{result['backend']:>5}: " + ", ".join(f"{key}={value}" for key, value in result.items() if key != "backend"))
+    print(f"Farklı sonuç veren sayfalar: {', '.join(mismatches) if mismatches else 'yok'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTML ayrıştırıcı altyapısı karşılaştırması")
+    parser.add_argument("--corpus", help="Gerçek HTML sayfalarının bulunduğu dizin")
+    parser.add_argument("--synthetic", type=int, default=5, help="Derlem yoksa üretilecek sayfa sayısı")
+    parser.add_argument("--size", type=int, default=1_000_000, help="Sentetik sayfa boyutu (karakter)")
+    parser.add_argument("--repeat", type=int, default=3, help="Her sayfanın ayrıştırılma sayısı")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    main(parser.parse_args())
@@ -0,0 +1,182 @@
+"""
+Paylaşılan HTTP istemcisi karşılaştırması
+Yerel bir test sunucusuna karşı istek başına yeni oturum açmak ile paylaşılan havuzlu istemciyi karşılaştırır
+
+Kullanım (backend dizininden):
+    python benchmarks/http_client_benchmark.py --requests 500 --concurrency 20
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from html import escape
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scanners.http_client import ScannerHTTPClient
+from scanners.xss_scanner import XSSScanner
+
+
+TEST_PAGE = """<html><body>
+<form action="/search" method="get"><input name="q"><input name="page"></form>
+<form action="/comment" method="post"><textarea name="body"></textarea></form>
+<script>document.getElementById('x').innerHTML = location.hash;</script>
+</body></html>"""
+
+
+class MockTarget:
+    """Gelen parametreleri sayfaya yansıtan test sunucusu - açılan TCP bağlantılarını sayar"""
+
+    def __init__(self):
+        self.connections = set()
+        self.requests = 0
+        self.runner = None
+        self.url = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/", self._page)
+        app.router.add_get("/search", self._reflect)
+        app.router.add_post("/comment", self._reflect)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    def _track(self, request: web.Request):
+        self.requests += 1
+        self.connections.add(id(request.transport))
+
+    async def _page(self, request: web.Request):
+        self._track(request)
+        return web.Response(text=TEST_PAGE, content_type="text/html")
+
+    async def _reflect(self, request: web.Request):
+        self._track(request)
+        values = list(request.query.values())
+        if request.method == "POST":
+            values += list((await request.post()).values())
+        # Bilerek güvensiz: ilk parametre kaçışsız, diğerleri kaçışlı yansıtılır
+        body = "".join(str(value) if index == 0 else escape(str(value)) for index, value in enumerate(values))
+        return web.Response(text=f"<html><body>{body}</body></html>", content_type="text/html")
+
+    def reset(self):
+        self.connections.clear()
+        self.requests = 0
+
+
+async def _run_requests(fetch, url: str, total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int):
+        async with semaphore:
+            await fetch(f"{url}/search?q=probe{index}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(total)))
+    return time.perf_counter() - started
+
+
+async def bench_session_per_request(target: MockTarget, total: int, concurrency: int) -> dict:
+    """Eski davranış: her istek için yeni ClientSession"""
+    async def fetch(url):
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url) as response:
+                await response.text()
+
+    target.reset()
+    elapsed = await _run_requests(fetch, target.url, total, concurrency)
+    return {
+        "mode": "session_per_request",
+        "requests": total,
+        "elapsed": round(elapsed, 3),
+        "requests_per_second": round(total / elapsed, 1),
+        "server_connections": len(target.connections)
+    }
+
+
+async def bench_shared_client(target: MockTarget, total: int, concurrency: int) -> dict:
+    """Yeni davranış: paylaşılan havuzlu istemci"""
+    client = ScannerHTTPClient()
+
+    async def fetch(url):
+        async with client.get(url) as response:
+            await response.text()
+
+    target.reset()
+    try:
+        elapsed = await _run_requests(fetch, target.url, total, concurrency)
+        return {
+            "mode": "shared_client",
+            "requests": total,
+            "elapsed": round(elapsed, 3),
+            "requests_per_second": round(total / elapsed, 1),
+            "server_connections": len(target.connections),
+            "client": client.metrics.snapshot()
+        }
+    finally:
+        await client.close()
+
+
+async def bench_xss_scanner(target: MockTarget, runs: int) -> dict:
+    """XSS tarayıcısının tam çalıştırması - tüm istekler paylaşılan istemciden geçer"""
+    client = ScannerHTTPClient()
+    target.reset()
+    try:
+        started = time.perf_counter()
+        findings = 0
+        for _ in range(runs):
+            result = await XSSScanner(http_client=client).scan(f"{target.url}/")
+            findings = len(result.vulnerabilities)
+        elapsed = time.perf_counter() - started
+        return {
+            "mode": "xss_scanner",
+            "runs": runs,
+            "elapsed": round(elapsed, 3),
+            "server_requests": target.requests,
+            "server_connections": len(target.connections),
+            "findings_per_run": findings,
+            "client": client.metrics.snapshot()
+        }
+    finally:
+        await client.close()
+
+
+async def main(args):
+    target = MockTarget()
+    await target.start()
+    try:
+        results = [
+            await bench_session_per_request(target, args.requests, args.concurrency),
+            await bench_shared_client(target, args.requests, args.concurrency),
+            await bench_xss_scanner(target, args.scanner_runs)
+        ]
+    finally:
+        await target.stop()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for result in results:
+        print(f"{result['mode']:>20}: " + ", ".join(f"{key}={value}" for key, value in result.items() if key != "mode"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Paylaşılan HTTP istemcisi karşılaştırması")
+    parser.add_argument("--requests", type=int, default=500, help="Toplam istek sayısı")
+    parser.add_argument("--concurrency", type=int, default=20, help="Aynı anda gönderilen istek sayısı")
+    parser.add_argument("--scanner-runs", type=int, default=3, help="XSS tarayıcısı çalıştırma sayısı")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    asyncio.run(main(parser.parse_args()))
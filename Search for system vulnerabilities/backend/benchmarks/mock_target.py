@@ -0,0 +1,190 @@
+"""
+Karşılaştırmalar için yerel test sunucuları
+Ayarlanabilir sayfa, form, yansıyan parametre, gecikme ve yanıt boyutuna sahip bilerek güvensiz bir hedef site
+ile ZAP API ve Shodan API yerine geçen yerel sunucular
+"""
+
+import asyncio
+from html import escape
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List
+
+from aiohttp import web
+
+
+@dataclass
+class TargetProfile:
+    """Test sunucusunun şekli - karşılaştırma sonuçlarıyla birlikte kaydedilir"""
+    pages: int = 5
+    forms_per_page: int = 2
+    fields_per_form: int = 4
+    reflecting_fields: int = 1  # Her formda kaçışsız yansıtılan alan sayısı (html, attribute, script sırasıyla)
+    latency_ms: float = 0.0  # Her yanıttan önce beklenen süre
+    response_bytes: int = 0  # Her HTML yanıtına eklenen dolgu
+    zap_alerts: int = 50
+    shodan_ports: int = 10
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class LocalServer:
+    """İstekleri sayan, gecikme ekleyebilen yerel aiohttp sunucusu"""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.requests = 0
+        self.runner = None
+        self.url = None
+
+    def routes(self, app: web.Application):
+        raise NotImplementedError
+
+    async def start(self):
+        app = web.Application(middlewares=[self._count])
+        self.routes(app)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    def reset(self):
+        self.requests = 0
+
+    @web.middleware
+    async def _count(self, request: web.Request, handler):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await handler(request)
+
+
+class VulnerableTarget(LocalServer):
+    """Sayfalar arası bağlantılar, formlar ve parametreli URL'ler sunan, bazı alanları kaçışsız yansıtan hedef site
+
+    Ana sayfa tüm sayfalara bağlantı verir. Her sayfada forms_per_page form (sırayla GET ve POST) ve bir
+    parametreli bağlantı bulunur. Her formun ilk reflecting_fields alanı sırasıyla HTML gövdesine, attribute
+    değerine ve script'e kaçışsız, diğer alanlar kaçışlı yansıtılır.
+    """
+
+    def __init__(self, profile: TargetProfile):
+        super().__init__(profile.latency_ms)
+        self.profile = profile
+        self.padding = ("<p>" + "lorem ipsum dolor sit amet " * 4 + "</p>") * (profile.response_bytes // 120 + 1)
+        self.padding = self.padding[:profile.response_bytes]
+        self.fields = [f"f{index}" for index in range(profile.fields_per_form)]
+
+    def routes(self, app: web.Application):
+        app.router.add_get("/", self._index)
+        app.router.add_get("/page/{page}", self._page)
+        app.router.add_route("*", "/submit/{page}/{form}", self._submit)
+
+    def _html(self, body: str) -> web.Response:
+        return web.Response(text=f"<html><body>{body}{self.padding}</body></html>", content_type="text/html")
+
+    async def _index(self, request: web.Request):
+        links = "".join(f'<a href="/page/{page}">Sayfa {page}</a>' for page in range(self.profile.pages))
+        return self._html(links)
+
+    async def _page(self, request: web.Request):
+        page = request.match_info["page"]
+        forms = []
+        for form in range(self.profile.forms_per_page):
+            method = "get" if form % 2 == 0 else "post"
+            inputs = "".join(f'<input name="{name}">' for name in self.fields)
+            forms.append(f'<form action="/submit/{page}/{form}" method="{method}">{inputs}</form>')
+        link = f'<a href="/submit/{page}/0?{self.fields[0]}=1&amp;sort=asc">Liste</a>' if self.fields else ""
+        return self._html("".join(forms) + link)
+
+    async def _submit(self, request: web.Request):
+        values = dict(request.query)
+        if request.method == "POST":
+            values.update(await request.post())
+
+        # Bilerek güvensiz: yansıyan alanlar farklı bağlamlara kaçışsız yazılır
+        body = []
+        for index, name in enumerate(self.fields):
+            value = values.get(name)
+            if value is None:
+                continue
+            if index >= self.profile.reflecting_fields:
+                body.append(f"<span>{escape(str(value))}</span>")
+            elif index % 3 == 0:
+                body.append(f"<div>{value}</div>")
+            elif index % 3 == 1:
+                body.append(f'<input type="text" value="{value}">')
+            else:
+                body.append(f"<script>var term = '{value}';</script>")
+        return self._html("".join(body))
+
+
+class ZAPStandIn(LocalServer):
+    """ZAPScanner'ın kullandığı ZAP JSON API uçlarını taklit eder - spider ve active scan hemen tamamlanır"""
+
+    RISKS = ["High", "Medium", "Low", "Informational"]
+
+    def __init__(self, alerts: int, latency_ms: float = 0.0):
+        super().__init__(latency_ms)
+        self.alerts = alerts
+
+    def routes(self, app: web.Application):
+        app.router.add_get("/JSON/core/view/version", self._json({"version": "2.14.0"}))
+        app.router.add_post("/JSON/context/action/newContext", self._json({"contextId": "1"}))
+        app.router.add_post("/JSON/context/action/includeInContext", self._json({"Result": "OK"}))
+        app.router.add_post("/JSON/spider/action/scan", self._json({"scan": "1"}))
+        app.router.add_get("/JSON/spider/view/status", self._json({"status": "100"}))
+        app.router.add_post("/JSON/ascan/action/scan", self._json({"scan": "2"}))
+        app.router.add_get("/JSON/ascan/view/status", self._json({"status": "100"}))
+        app.router.add_get("/JSON/core/view/alerts", self._alerts)
+
+    def _json(self, payload: Dict[str, Any]):
+        async def handler(request: web.Request):
+            return web.json_response(payload)
+        return handler
+
+    async def _alerts(self, request: web.Request):
+        base_url = request.query.get("baseurl", "")
+        start = int(request.query.get("start", 0))
+        count = int(request.query.get("count", 0)) or self.alerts
+        alerts: List[Dict[str, Any]] = [
+            {
+                "name": f"Test Alert {index}",
+                "description": "Yerel ZAP taklidinden örnek bulgu",
+                "risk": self.RISKS[index % len(self.RISKS)],
+                "confidence": "Medium",
+                "url": f"{base_url}page/{index}",
+                "evidence": f"<script>{index}</script>",
+                "solution": "Girdi doğrulaması uygulayın"
+            }
+            for index in range(start, min(self.alerts, start + count))
+        ]
+        return web.json_response({"alerts": alerts})
+
+
+class ShodanStandIn(LocalServer):
+    """ShodanScanner'ın kullandığı host ve arama uçlarını taklit eder"""
+
+    PORTS = [21, 22, 23, 25, 53, 80, 110, 143, 443, 1433, 3306, 3389, 5432, 5900, 6379, 27017]
+    PRODUCTS = ["Apache httpd", "nginx", "Microsoft IIS", "Apache Tomcat", "OpenSSH"]
+
+    def __init__(self, ports: int, latency_ms: float = 0.0):
+        super().__init__(latency_ms)
+        self.ports = [self.PORTS[index % len(self.PORTS)] for index in range(ports)]
+
+    def routes(self, app: web.Application):
+        app.router.add_get("/shodan/host/search", self._search)
+        app.router.add_get("/shodan/host/{host}", self._host)
+
+    def _banners(self) -> List[Dict[str, Any]]:
+        return [{"port": port, "product": self.PRODUCTS[index % len(self.PRODUCTS)]} for index, port in enumerate(self.ports)]
+
+    async def _host(self, request: web.Request):
+        return web.json_response({"ports": self.ports, "os": "Windows 7", "data": self._banners()})
+
+    async def _search(self, request: web.Request):
+        return web.json_response({"matches": self._banners(), "total": len(self.ports)})
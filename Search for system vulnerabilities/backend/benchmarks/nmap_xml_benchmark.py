@@ -0,0 +1,95 @@
+"""
+Nmap XML ayrıştırma bellek karşılaştırması
+Büyük bir aralık taramasının XML çıktısını tüm metni bellekte ET.fromstring ile ayrıştırmak ile
+dosyadan iterparse ile host host ayrıştırmayı karşılaştırır
+
+Kullanım (backend dizininden):
+    python benchmarks/nmap_xml_benchmark.py --hosts 2000 --ports 50
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scanners.nmap_xml import iter_nmap_hosts
+
+
+SCRIPT_OUTPUT = "&#xa;  VULNERABLE:&#xa;  SSL POODLE information leak&#xa;    State: VULNERABLE&#xa;" + "    detay satırı&#xa;" * 20
+
+
+def write_scan_xml(path: str, hosts: int, ports: int):
+    """-p- -A taramasına benzeyen, her hostta servis ve script çıktılı portlar içeren XML yazar"""
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write('<?xml version="1.0" encoding="UTF-8"?>\n<nmaprun scanner="nmap" args="nmap -p- -A" version="7.94">\n')
+        for host in range(hosts):
+            handle.write(f'<host><status state="up" reason="syn-ack"/><address addr="10.{host // 65536}.{host // 256 % 256}.{host % 256}" addrtype="ipv4"/>'
+                         f'<hostnames><hostname name="host{host}.test" type="PTR"/></hostnames><ports>')
+            for index in range(ports):
+                handle.write(f'<port protocol="tcp" portid="{1000 + index}"><state state="open" reason="syn-ack"/>'
+                             f'<service name="http" product="nginx" version="1.18.0" tunnel="ssl" method="probed" conf="10">'
+                             f'<cpe>cpe:/a:nginx:nginx:1.18.0</cpe></service>'
+                             f'<script id="ssl-poodle" output="{SCRIPT_OUTPUT}"/></port>')
+            handle.write('</ports><os><osmatch name="Linux 4.15" accuracy="95"><osclass osfamily="Linux" osgen="4.X"/></osmatch></os></host>\n')
+        handle.write('<runstats><finished time="1" elapsed="1" exit="success"/></runstats></nmaprun>\n')
+
+
+def parse_full_text(path: str) -> int:
+    """Eski yol: stdout metninin tamamı bellekte, tüm ağaç tek seferde kurulur"""
+    with open(path, encoding="utf-8") as handle:
+        root = ET.fromstring(handle.read())
+    return sum(1 for host in root.findall(".//host") for port in host.findall(".//port")
+               if port.find("state").get("state") == "open")
+
+
+def parse_streaming(path: str) -> int:
+    """Yeni yol: dosyadan host host, işlenen host ağaçtan atılır"""
+    with open(path, "rb") as handle:
+        return sum(len(host.open_ports) for host in iter_nmap_hosts(handle))
+
+
+def measure(name: str, function, path: str) -> dict:
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        open_ports = function(path)
+    finally:
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        "mode": name,
+        "elapsed": round(elapsed, 3),
+        "peak_memory_mb": round(peak / 1_000_000, 1),
+        "open_ports": open_ports
+    }
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "scan.xml")
+        write_scan_xml(path, args.hosts, args.ports)
+        size = os.path.getsize(path)
+        results = [measure("full_text", parse_full_text, path), measure("streaming", parse_streaming, path)]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"XML boyutu: {size / 1_000_000:.1f} MB, {args.hosts} host x {args.ports} açık port")
+    for result in results:
+        print(", ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Nmap XML ayrıştırma bellek karşılaştırması")
+    parser.add_argument("--hosts", type=int, default=2000, help="Host sayısı")
+    parser.add_argument("--ports", type=int, default=50, help="Host başına açık port sayısı")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    main(parser.parse_args())
@@ -0,0 +1,106 @@
+"""
+Çok kalıplı eşleştirme mikro karşılaştırması
+XSS tespit kurallarını kalıp başına re.search/re.findall ile taramak ile tek geçişli MultiPatternMatcher'ı,
+payload yansıma kontrolünde ise kalıp başına `in` ile LiteralMatcher'ı karşılaştırır
+
+Kullanım (backend dizininden):
+    python benchmarks/pattern_matcher_benchmark.py --size 2000000 --repeat 5
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scanners.xss_scanner import XSSScanner
+from scanners.pattern_matcher import LiteralMatcher
+
+
+FRAGMENTS = [
+    "<div class=\"row\"><p>lorem ipsum dolor sit amet, güvenlik taraması</p></div>",
+    "<a href=\"/page?id=1&amp;ref=list\">Bağlantı</a>",
+    "<script>var el = document.getElementById('x'); el.innerHTML = data;</script>",
+    "<script>setTimeout(function () { refresh(); }, 1000);</script>",
+    "<button onclick=\"track(1)\">Tıkla</button>",
+    "<img src=\"/logo.png\" alt=\"logo\">",
+    "<ul><li>bir</li><li>iki</li><li>üç</li></ul>"
+]
+
+
+def build_content(size: int, seed: int) -> str:
+    rng = random.Random(seed)
+    parts, length = [], 0
+    while length < size:
+        fragment = rng.choice(FRAGMENTS)
+        parts.append(fragment)
+        length += len(fragment)
+    return "".join(parts)
+
+
+def timed(function, repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - started) / repeat, result
+
+
+def main(args):
+    scanner = XSSScanner()
+    content = build_content(args.size, seed=1)
+    scripts = re.findall(r"<script>(.*?)</script>", content)
+    # Yansıma kontrolü için küçük yanıtlar - payload'lardan biri içeriğe gömülü
+    responses = [build_content(4000, seed) + scanner.xss_payloads[seed % len(scanner.xss_payloads)] for seed in range(200)]
+    # Tarayıcı yanıtları scan_response_for_markers ile aynı LiteralMatcher'la akışlı tarar; burada tüm payload'lar tek matcher'da
+    payload_markers = LiteralMatcher(scanner.xss_payloads)
+
+    cases = {
+        "dom_rules": (
+            lambda: [match for pattern in scanner.dom_xss_patterns for match in re.findall(pattern, content, re.IGNORECASE)],
+            lambda: [match.text for matches in scanner.dom_xss_rules.findall(content).values() for match in matches]
+        ),
+        "script_rules": (
+            lambda: [[pattern for pattern in scanner.xss_patterns if re.search(pattern, script, re.IGNORECASE)] for script in scripts],
+            lambda: [list(scanner.xss_rules.findall(script)) for script in scripts]
+        ),
+        "payload_markers": (
+            lambda: [[payload for payload in scanner.xss_payloads if payload in response] for response in responses],
+            lambda: [list(payload_markers.first_matches(response)) for response in responses]
+        )
+    }
+
+    results = []
+    for name, (baseline, matcher) in cases.items():
+        baseline_time, baseline_result = timed(baseline, args.repeat)
+        matcher_time, matcher_result = timed(matcher, args.repeat)
+        same = (
+            [sorted(item) for item in baseline_result] == [sorted(item) for item in matcher_result]
+            if name == "payload_markers" else baseline_result == matcher_result
+        )
+        results.append({
+            "case": name,
+            "per_pattern_ms": round(baseline_time * 1000, 2),
+            "single_pass_ms": round(matcher_time * 1000, 2),
+            "speedup": round(baseline_time / matcher_time, 2) if matcher_time else None,
+            "same_result": same
+        })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"İçerik: {len(content) / 1_000_000:.1f} MB, {len(scripts)} script, {len(responses)} yanıt")
+    for result in results:
+        print(f"{result['case']:>16}: " + ", ".join(f"{key}={value}" for key, value in result.items() if key != "case"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Çok kalıplı eşleştirme mikro karşılaştırması")
+    parser.add_argument("--size", type=int, default=2_000_000, help="Taranan sayfa boyutu (karakter)")
+    parser.add_argument("--repeat", type=int, default=5, help="Her ölçümün tekrar sayısı")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    main(parser.parse_args())
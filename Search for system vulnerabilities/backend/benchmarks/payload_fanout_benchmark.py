@@ -0,0 +1,102 @@
+"""
+XSS payload paralel gönderim karşılaştırması
+Gecikmeli bir test sunucusuna karşı payload isteklerini sırayla (eşzamanlılık 1) ve paralel göndermeyi karşılaştırır
+
+Kullanım (backend dizininden):
+    python benchmarks/payload_fanout_benchmark.py --fields 20 --latency 0.05 --concurrency 1 5 10 20
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_client_benchmark import MockTarget
+from scanners.http_client import ScannerHTTPClient
+from scanners.xss_scanner import XSSScanner
+
+
+class SlowTarget(MockTarget):
+    """Her yansıtma isteğini sabit gecikmeyle yanıtlayan, çok alanlı form sunan test sunucusu"""
+
+    def __init__(self, fields: int, latency: float):
+        super().__init__()
+        self.latency = latency
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        inputs = "".join(f'<input name="f{index}">' for index in range(fields))
+        self.page = (
+            f'<html><body><form action="/search" method="get">{inputs}</form>'
+            f'<form action="/comment" method="post">{inputs}</form></body></html>'
+        )
+
+    async def _page(self, request: web.Request):
+        self._track(request)
+        return web.Response(text=self.page, content_type="text/html")
+
+    async def _reflect(self, request: web.Request):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            return await super()._reflect(request)
+        finally:
+            self.in_flight -= 1
+
+    def reset(self):
+        super().reset()
+        self.peak_in_flight = 0
+
+
+async def bench_concurrency(target: SlowTarget, concurrency: int, rps: float) -> dict:
+    """Verilen eşzamanlılık sınırıyla tam XSS taraması"""
+    client = ScannerHTTPClient(pool_per_host=max(concurrency, 1))
+    scanner = XSSScanner({"payload_concurrency": concurrency, "payload_rps": rps}, http_client=client)
+    target.reset()
+    try:
+        started = time.perf_counter()
+        result = await scanner.scan(f"{target.url}/?q=1&page=2")
+        elapsed = time.perf_counter() - started
+        return {
+            "concurrency": concurrency,
+            "rps_limit": rps,
+            "elapsed": round(elapsed, 3),
+            "server_requests": target.requests,
+            "peak_in_flight": target.peak_in_flight,
+            "requests_per_second": round(target.requests / elapsed, 1),
+            "findings": len(result.vulnerabilities)
+        }
+    finally:
+        await client.close()
+
+
+async def main(args):
+    target = SlowTarget(args.fields, args.latency)
+    await target.start()
+    try:
+        results = [await bench_concurrency(target, concurrency, args.rps) for concurrency in args.concurrency]
+    finally:
+        await target.stop()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for result in results:
+        print(", ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="XSS payload paralel gönderim karşılaştırması")
+    parser.add_argument("--fields", type=int, default=20, help="Her formdaki alan sayısı")
+    parser.add_argument("--latency", type=float, default=0.05, help="Sunucunun yanıt gecikmesi (saniye)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 10, 20], help="Denenecek eşzamanlılık sınırları")
+    parser.add_argument("--rps", type=float, default=0, help="Saniyedeki istek sınırı (0: sınırsız)")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,137 @@
+"""
+Yansıma kontrolü bellek karşılaştırması
+Büyük yanıtlarda tüm gövdeyi response.text() ile okumak ile akışlı, boyut sınırlı okuyucuyu karşılaştırır
+
+Kullanım (backend dizininden):
+    python benchmarks/reflection_reader_benchmark.py --size 8000000 --probes 40 --concurrency 10
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tracemalloc
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scanners.http_client import ScannerHTTPClient
+from scanners.pattern_matcher import LiteralMatcher
+from scanners.response_reader import scan_response_for_markers, SCANNER_REFLECTION_MAX_BYTES
+
+
+PAYLOAD = "<script>alert('XSS')</script>"
+
+
+class LargeResponseTarget:
+    """Payload'ı büyük bir sayfanın başına, ortasına veya hiçbir yerine koyan test sunucusu"""
+
+    def __init__(self, size: int):
+        filler = ("<div class=\"row\"><p>lorem ipsum dolor sit amet</p></div>" * (size // 56 + 1))[:size]
+        self.bodies = {
+            "start": (PAYLOAD + filler).encode(),
+            "middle": (filler[:size // 2] + PAYLOAD + filler[size // 2:]).encode(),
+            "absent": filler.encode()
+        }
+        self.runner = None
+        self.url = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/{position}", self._respond)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def _respond(self, request: web.Request):
+        body = self.bodies[request.match_info["position"]]
+        response = web.StreamResponse(headers={"Content-Type": "text/html; charset=utf-8"})
+        await response.prepare(request)
+        try:
+            for offset in range(0, len(body), 256 * 1024):
+                await response.write(body[offset:offset + 256 * 1024])
+            await response.write_eof()
+        except (ConnectionResetError, ConnectionError):
+            pass  # İstemci okumayı erken bıraktı
+        return response
+
+
+async def _full_text(client: ScannerHTTPClient, url: str) -> bool:
+    async with client.get(url) as response:
+        return PAYLOAD in await response.text()
+
+
+async def _streaming(client: ScannerHTTPClient, url: str, max_bytes: int) -> bool:
+    async with client.get(url) as response:
+        scan = await scan_response_for_markers(response, LiteralMatcher([PAYLOAD]), max_bytes)
+        return PAYLOAD in scan.matches
+
+
+async def bench_mode(target: LargeResponseTarget, mode: str, position: str, probes: int, concurrency: int,
+                     max_bytes: int) -> dict:
+    client = ScannerHTTPClient()
+    semaphore = asyncio.Semaphore(concurrency)
+    url = f"{target.url}/{position}"
+
+    async def probe():
+        async with semaphore:
+            if mode == "full_text":
+                return await _full_text(client, url)
+            return await _streaming(client, url, max_bytes)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        found = await asyncio.gather(*(probe() for _ in range(probes)))
+    finally:
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        await client.close()
+
+    return {
+        "mode": mode,
+        "payload": position,
+        "elapsed": round(elapsed, 3),
+        "peak_memory_mb": round(peak / 1_000_000, 1),
+        "reflected": sum(found)
+    }
+
+
+async def main(args):
+    target = LargeResponseTarget(args.size)
+    await target.start()
+    try:
+        results = []
+        for position in ("start", "middle", "absent"):
+            for mode in ("full_text", "streaming"):
+                results.append(await bench_mode(target, mode, position, args.probes, args.concurrency, args.max_bytes))
+    finally:
+        await target.stop()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"Yanıt boyutu: {args.size / 1_000_000:.1f} MB, {args.probes} istek, eşzamanlılık {args.concurrency}, "
+          f"okuma sınırı {args.max_bytes / 1_000_000:.1f} MB")
+    for result in results:
+        print(", ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yansıma kontrolü bellek karşılaştırması")
+    parser.add_argument("--size", type=int, default=8_000_000, help="Yanıt gövdesi boyutu (bayt)")
+    parser.add_argument("--probes", type=int, default=40, help="Toplam istek sayısı")
+    parser.add_argument("--concurrency", type=int, default=10, help="Aynı anda gönderilen istek sayısı")
+    parser.add_argument("--max-bytes", type=int, default=SCANNER_REFLECTION_MAX_BYTES, help="Akışlı okuma bayt sınırı")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,267 @@
+"""
+Tarayıcı verimlilik karşılaştırma paketi
+Yerel test sunucularına karşı XSS tarayıcısını (tek sayfa ve keşif envanteriyle), ZAP ve Shodan tarayıcılarının
+HTTP kısımlarını çalıştırır; saniyedeki istek, p50/p99 gecikme, en yüksek bellek ve bulgu sayısını raporlar.
+Sonuçlar commit'e göre kaydedilip önceki bir commit'in sonuçlarıyla karşılaştırılabilir.
+
+Kullanım (backend dizininden):
+    python benchmarks/scanner_benchmark.py --repeat 3 --save
+    python benchmarks/scanner_benchmark.py --latency-ms 5 --response-bytes 200000 --compare benchmarks/results/<commit>.json
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import subprocess
+import statistics
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from mock_target import TargetProfile, VulnerableTarget, ZAPStandIn, ShodanStandIn
+from scanners.http_client import ScannerHTTPClient
+from scanners.crawler import Crawler
+from scanners.xss_scanner import XSSScanner
+from scanners.zap_scanner import ZAPScanner
+from scanners.shodan_scanner import ShodanScanner
+
+
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+SCENARIOS = ["xss", "xss_crawl", "zap", "shodan"]
+# Karşılaştırmada gösterilen ölçümler ve daha iyi olan yön
+COMPARED_METRICS = {
+    "requests": "lower",
+    "requests_per_second": "higher",
+    "latency_p50_ms": "lower",
+    "latency_p99_ms": "lower",
+    "peak_memory_mb": "lower",
+    "findings": "same"
+}
+
+
+class LatencyRecorder:
+    """İstemci tarafında istek başlangıcından yanıt başlıklarının gelişine kadar geçen süreyi kaydeder"""
+
+    def __init__(self):
+        self.samples: List[float] = []
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_start)
+        trace_config.on_request_end.append(self._on_end)
+        trace_config.on_request_exception.append(self._on_end)
+        return trace_config
+
+    async def _on_start(self, session, context, params):
+        context.started = time.perf_counter()
+
+    async def _on_end(self, session, context, params):
+        self.samples.append(time.perf_counter() - context.started)
+
+    def percentile(self, fraction: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+class BenchmarkEnvironment:
+    """Hedef site ile ZAP ve Shodan yerine geçen sunucular"""
+
+    def __init__(self, profile: TargetProfile):
+        self.profile = profile
+        self.target = VulnerableTarget(profile)
+        self.zap = ZAPStandIn(profile.zap_alerts, profile.latency_ms)
+        self.shodan = ShodanStandIn(profile.shodan_ports, profile.latency_ms)
+        self.servers = [self.target, self.zap, self.shodan]
+
+    async def start(self):
+        for server in self.servers:
+            await server.start()
+
+    async def stop(self):
+        for server in self.servers:
+            await server.stop()
+
+    def reset(self):
+        for server in self.servers:
+            server.reset()
+
+    @property
+    def requests(self) -> int:
+        return sum(server.requests for server in self.servers)
+
+
+async def run_scenario(name: str, env: BenchmarkEnvironment, client: ScannerHTTPClient) -> int:
+    """Senaryoyu bir kez çalıştırır, bulgu sayısını döndürür"""
+    if name == "xss":
+        result = await XSSScanner(http_client=client).scan(f"{env.target.url}/page/0")
+    elif name == "xss_crawl":
+        inventory = await Crawler(http_client=client).crawl(f"{env.target.url}/")
+        result = await XSSScanner(http_client=client).scan(f"{env.target.url}/", {"inventory": inventory})
+    elif name == "zap":
+        scanner = ZAPScanner({"zap_host": "127.0.0.1", "zap_port": env.zap.port}, http_client=client)
+        result = await scanner.scan(f"{env.target.url}/", {"scan_type": "full"})
+    elif name == "shodan":
+        scanner = ShodanScanner({"shodan_api_key": "benchmark", "shodan_api_url": env.shodan.url}, http_client=client)
+        result = await scanner.scan(f"{env.target.url}/")
+    else:
+        raise ValueError(f"Bilinmeyen senaryo: {name}")
+
+    if result.status != "completed":
+        raise RuntimeError(f"{name} taraması tamamlanamadı: {result.error_message}")
+    return len(result.vulnerabilities)
+
+
+async def measure(name: str, env: BenchmarkEnvironment, repeat: int) -> Dict[str, Any]:
+    """Zamanlama turları tracemalloc olmadan, bellek turu ayrıca çalıştırılır"""
+    recorder = LatencyRecorder()
+    elapsed: List[float] = []
+    requests = findings = 0
+
+    for _ in range(repeat):
+        client = ScannerHTTPClient(trace_configs=[recorder.trace_config()])
+        env.reset()
+        try:
+            started = time.perf_counter()
+            findings = await run_scenario(name, env, client)
+            elapsed.append(time.perf_counter() - started)
+        finally:
+            await client.close()
+        requests = env.requests
+
+    client = ScannerHTTPClient()
+    tracemalloc.start()
+    try:
+        await run_scenario(name, env, client)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        await client.close()
+
+    median = statistics.median(elapsed)
+    return {
+        "requests": requests,
+        "elapsed": round(median, 4),
+        "requests_per_second": round(requests / median, 1) if median else 0.0,
+        "latency_p50_ms": round(recorder.percentile(0.50) * 1000, 2),
+        "latency_p99_ms": round(recorder.percentile(0.99) * 1000, 2),
+        "peak_memory_mb": round(peak / 1_000_000, 2),
+        "findings": findings
+    }
+
+
+def git_revision() -> Dict[str, Any]:
+    """Çalışılan commit ve çalışma ağacında commit edilmemiş değişiklik olup olmadığı"""
+    def git(*args) -> Optional[str]:
+        try:
+            completed = subprocess.run(["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=30)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        return completed.stdout.strip() if completed.returncode == 0 else None
+
+    return {
+        "commit": git("rev-parse", "--short", "HEAD") or "unknown",
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """İki çalıştırmanın ortak senaryolarındaki ölçümleri karşılaştırır"""
+    lines = [f"Karşılaştırma: {baseline.get('commit')} -> {current.get('commit')}"]
+    if baseline.get("profile") != current.get("profile"):
+        lines.append("UYARI: hedef profilleri farklı, sonuçlar doğrudan karşılaştırılamaz")
+
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        parts = []
+        for metric, better in COMPARED_METRICS.items():
+            old, new = before.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+            flag = ""
+            if better == "same" and old != new:
+                flag = " !"
+            elif (better == "lower" and new > old * 1.1) or (better == "higher" and new < old * 0.9):
+                flag = " (gerileme?)"
+            parts.append(f"{metric}={old}->{new} ({change}){flag}")
+        lines.append(f"{name:>10}: " + ", ".join(parts))
+    return lines
+
+
+async def main(args):
+    profile = TargetProfile(
+        pages=args.pages,
+        forms_per_page=args.forms,
+        fields_per_form=args.fields,
+        reflecting_fields=args.reflecting,
+        latency_ms=args.latency_ms,
+        response_bytes=args.response_bytes,
+        zap_alerts=args.zap_alerts,
+        shodan_ports=args.shodan_ports
+    )
+    env = BenchmarkEnvironment(profile)
+    await env.start()
+    try:
+        results = {name: await measure(name, env, args.repeat) for name in args.scenarios}
+    finally:
+        await env.stop()
+
+    report = {
+        **git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "profile": profile.to_dict(),
+        "results": results
+    }
+
+    if args.save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{report['commit']}{'-dirty' if report['dirty'] else ''}.json")
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"Sonuçlar kaydedildi: {path}", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Commit {report['commit']}{' (değişiklikler commit edilmemiş)' if report['dirty'] else ''}, profil: {profile.to_dict()}")
+        for name, result in results.items():
+            print(f"{name:>10}: " + ", ".join(f"{key}={value}" for key, value in result.items()))
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        print("\n".join(compare(baseline, report)))
+
+
+if __name__ == "__main__":
+    defaults = TargetProfile()
+    parser = argparse.ArgumentParser(description="Tarayıcı verimlilik karşılaştırma paketi")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS, help="Çalıştırılacak senaryolar")
+    parser.add_argument("--repeat", type=int, default=3, help="Senaryo başına zamanlama turu")
+    parser.add_argument("--pages", type=int, default=defaults.pages, help="Hedef sitedeki sayfa sayısı")
+    parser.add_argument("--forms", type=int, default=defaults.forms_per_page, help="Sayfa başına form sayısı")
+    parser.add_argument("--fields", type=int, default=defaults.fields_per_form, help="Form başına alan sayısı")
+    parser.add_argument("--reflecting", type=int, default=defaults.reflecting_fields, help="Form başına kaçışsız yansıyan alan sayısı")
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms, help="Her yanıttan önceki gecikme (ms)")
+    parser.add_argument("--response-bytes", type=int, default=defaults.response_bytes, help="HTML yanıtlarına eklenen dolgu (bayt)")
+    parser.add_argument("--zap-alerts", type=int, default=defaults.zap_alerts, help="ZAP taklidinin döndürdüğü alert sayısı")
+    parser.add_argument("--shodan-ports", type=int, default=defaults.shodan_ports, help="Shodan taklidinin döndürdüğü port sayısı")
+    parser.add_argument("--save", action="store_true", help="Sonuçları benchmarks/results/<commit>.json dosyasına kaydet")
+    parser.add_argument("--compare", help="Karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,153 @@
+"""
+GuardMesh Tarama Sonuç Önbelleği
+Aynı hedefte tekrarlanan tarayıcı çalıştırmaları için süreli (TTL) ve LRU tahliyeli önbellek
+"""
+
+import os
+import json
+import time
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple
+
+from scanners.base_scanner import ScanEvent, ScanResult
+from scanners.crawler import normalize_url
+
+
+logger = logging.getLogger("guardmesh-cache")
+
+# Önbellek açık/kapalı ve en fazla kayıt sayısı (süreç başına)
+SCAN_CACHE_ENABLED = os.getenv("SCAN_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+SCAN_CACHE_MAX_ENTRIES = int(os.getenv("SCAN_CACHE_MAX_ENTRIES", "256"))
+
+# Tarayıcı başına sonuçların geçerli kalma süresi (saniye), ör. "nmap=3600,xss=600"
+# Port/servis ve Shodan verisi yavaş değişir; uygulama katmanı bulguları daha kısa tutulur
+DEFAULT_CACHE_TTLS = {
+    "nmap": 3600,
+    "nikto": 3600,
+    "shodan": 86400,
+    "nuclei": 1800,
+    "zap": 1800,
+    "sqlmap": 1800,
+    "xss": 900
+}
+DEFAULT_CACHE_TTL = int(os.getenv("SCAN_CACHE_DEFAULT_TTL", "900"))
+
+# Tarayıcı sonucunu etkilemeyen, önbellek anahtarına katılmayan seçenekler
+CACHE_IGNORED_OPTIONS = ("force_fresh", "execution_mode", "max_concurrency")
+
+
+def _parse_cache_ttls(value: str) -> Dict[str, int]:
+    """"nmap=3600,xss=600" biçimindeki ayarı varsayılanların üzerine uygular"""
+    ttls = dict(DEFAULT_CACHE_TTLS)
+    for item in value.split(","):
+        name, _, ttl = item.partition("=")
+        if name.strip() and ttl.strip():
+            ttls[name.strip().lower()] = int(ttl)
+    return ttls
+
+
+SCAN_CACHE_TTLS = _parse_cache_ttls(os.getenv("SCAN_CACHE_TTLS", ""))
+
+
+def normalize_target(url: str) -> str:
+    """Aynı hedefi gösteren URL'leri tek biçime getirir (küçük harf host, varsayılan port, sıralı sorgu)"""
+    return normalize_url(url) or url.strip()
+
+
+def cache_key(scanner_name: str, url: str, scan_type: str, options: Optional[Dict[str, Any]] = None) -> Tuple[str, ...]:
+    """Önbellek anahtarı: (tarayıcı, normalize hedef, tarama türü, seçenekler)"""
+    relevant_options = {
+        key: value for key, value in (options or {}).items()
+        if key not in CACHE_IGNORED_OPTIONS
+    }
+    return (
+        scanner_name,
+        normalize_target(url),
+        scan_type,
+        json.dumps(relevant_options, sort_keys=True, default=str)
+    )
+
+
+def is_cacheable(result: ScanResult) -> bool:
+    """Yalnızca hatasız tamamlanan çalıştırmalar önbelleğe alınır - hedefe ulaşılamayan tarayıcılar da "completed"
+    dönebildiğinden ERROR seviyesinde log içeren sonuç (ör. sayfa indirilemedi) temiz sonuç sayılmaz"""
+    return result.status == "completed" and not any("[ERROR]" in log for log in result.scan_logs)
+
+
+@dataclass
+class CachedScan:
+    """Önbellekteki tarayıcı çıktısı - olaylar bulundukları sırayla yeniden oynatılır"""
+    events: List[ScanEvent]
+    result: ScanResult
+    stored_at: float
+    expires_at: float
+
+
+class ScanResultCache:
+    """Tarayıcı sonuçları için TTL + LRU önbellek"""
+
+    def __init__(self, max_entries: int = SCAN_CACHE_MAX_ENTRIES, ttls: Optional[Dict[str, int]] = None,
+                 enabled: bool = SCAN_CACHE_ENABLED):
+        self.max_entries = max_entries
+        self.ttls = SCAN_CACHE_TTLS if ttls is None else ttls
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, ...], CachedScan]" = OrderedDict()
+
+    def get(self, key: Tuple[str, ...]) -> Optional[CachedScan]:
+        """Geçerli kaydı döndürür; süresi dolmuş kayıt silinir"""
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Tuple[str, ...], events: List[ScanEvent], result: ScanResult) -> bool:
+        """Hatasız tamamlanan tarayıcı çıktısını saklar; kapasite aşılırsa en eski kullanılan kayıt çıkarılır.
+        Saklandıysa True döner"""
+        ttl = self.ttls.get(key[0], DEFAULT_CACHE_TTL)
+        if not self.enabled or ttl <= 0 or self.max_entries <= 0 or not is_cacheable(result):
+            return False
+
+        now = time.monotonic()
+        self._entries[key] = CachedScan(events=list(events), result=result, stored_at=now, expires_at=now + ttl)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            evicted_key, _ = self._entries.popitem(last=False)
+            logger.debug(f"Önbellekten çıkarıldı: {evicted_key[0]} {evicted_key[1]}")
+        return True
+
+    def invalidate(self, scanner_name: Optional[str] = None):
+        """Kayıtları siler - tarayıcı verilirse yalnızca onun kayıtları"""
+        if scanner_name is None:
+            self._entries.clear()
+            return
+
+        for key in [key for key in self._entries if key[0] == scanner_name]:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Önbellek istatistikleri"""
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+# Uygulama genelinde paylaşılan sonuç önbelleği
+scan_cache = ScanResultCache()
@@ -0,0 +1,678 @@
+"""
+GuardMesh Veritabanı Katmanı
+Tarama durumları, logları ve güvenlik açıkları için SQLAlchemy tabanlı kalıcı depolama
+"""
+
+import os
+import json
+import time
+import atexit
+import shutil
+import asyncio
+import hashlib
+import logging
+import tempfile
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlparse
+
+from dotenv import load_dotenv
+from sqlalchemy import (
+    create_engine, event, select, delete, insert, update, func,
+    String, Integer, Float, Boolean, Text, DateTime, JSON, ForeignKey, Index
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from scanners.base_scanner import Vulnerability
+
+
+# Ortam değişkenlerini yükle
+load_dotenv()
+
+logger = logging.getLogger("guardmesh-database")
+
+# Veritabanı bağlantısı - tanımlı değilse yerel SQLite dosyası kullanılır
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./guardmesh.db")
+
+# Sık okunan sonuçlanmış taramalar için bellek içi önbellek: toplam boyut (bayt) ve süre (saniye) sınırı
+SCAN_RESULT_CACHE_BYTES = int(os.getenv("SCAN_RESULT_CACHE_BYTES", str(64 * 1024 * 1024)))
+SCAN_RESULT_CACHE_TTL = float(os.getenv("SCAN_RESULT_CACHE_TTL", "3600"))
+# Bellekten çıkan sonuçlar yerel diske taşınır (toplam boyut sınırı, 0: kapalı) - veritabanı uzak bir sunucu olsa da
+# tekrar istenen sonuç sorgu yerine yerel dosyadan okunur. Dizin tanımlı değilse sistemin geçici dizini kullanılır
+SCAN_RESULT_SPILL_BYTES = int(os.getenv("SCAN_RESULT_SPILL_BYTES", str(512 * 1024 * 1024)))
+SCAN_RESULT_SPILL_DIR = os.getenv("SCAN_RESULT_SPILL_DIR", "")
+
+# Olay döngüsünden yapılan veritabanı çağrılarını çalıştıran iş parçacığı sayısı (0: otomatik)
+# SQLite aynı anda tek yazara izin verdiği için otomatik değer SQLite'ta 1, diğer veritabanlarında 8'dir
+SCAN_STORE_THREADS = int(os.getenv("SCAN_STORE_THREADS", "0"))
+
+# Zamanlayıcının süreçler arası kilitleri - satırlar tablo oluşturulurken eklenir
+SCHEDULER_LOCKS = ("scan_admission", "scanner_leases")
+
+# Sonucu bir daha değişmeyen tarama durumları (başarısız taramalar yeniden denenebilir)
+FINAL_SCAN_STATUSES = ("completed", "cancelled")
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class ScanRecord(Base):
+    """Tarama kaydı"""
+    __tablename__ = "scans"
+
+    scan_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # Taramayı çalıştıran grup (kuyruk görevi) - tekil taramalarda tarama kimliğinin kendisi
+    group_id: Mapped[str] = mapped_column(String(128), index=True)
+    url: Mapped[str] = mapped_column(String(2048), index=True)
+    target_host: Mapped[str] = mapped_column(String(255), index=True)
+    scan_type: Mapped[str] = mapped_column(String(16))
+    scanners: Mapped[List[str]] = mapped_column(JSON, default=list)
+    status: Mapped[str] = mapped_column(String(16), index=True)
+    progress: Mapped[int] = mapped_column(Integer, default=0)
+    message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, default=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    start_time: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    end_time: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    # Taramayı bekleten veya çalıştıran sürecin son canlılık sinyali - sinyali kesilen süreç (çöken worker)
+    # kuyrukta ve genel tarama sınırında yer tutmaz
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+
+class ScannerLeaseRecord(Base):
+    """Tarayıcı türü sınırı için verilen (veya beklenen) çalışma izni - tüm süreçler arasında paylaşılır"""
+    __tablename__ = "scanner_leases"
+
+    lease_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    scanner_name: Mapped[str] = mapped_column(String(64), index=True)
+    priority: Mapped[int] = mapped_column(Integer)
+    granted: Mapped[bool] = mapped_column(Boolean, default=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    heartbeat_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+
+
+class SchedulerLockRecord(Base):
+    """Zamanlayıcı kararlarını süreçler arasında sıraya sokan kilit satırı"""
+    __tablename__ = "scheduler_locks"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class ScanLogRecord(Base):
+    """Tarama log satırı"""
+    __tablename__ = "scan_logs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    scan_id: Mapped[str] = mapped_column(String(64), ForeignKey("scans.scan_id", ondelete="CASCADE"), index=True)
+    message: Mapped[str] = mapped_column(Text)
+
+
+class VulnerabilityRecord(Base):
+    """Tespit edilen güvenlik açığı"""
+    __tablename__ = "vulnerabilities"
+    __table_args__ = (
+        Index("ix_vulnerabilities_scan_severity", "scan_id", "severity"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    scan_id: Mapped[str] = mapped_column(String(64), ForeignKey("scans.scan_id", ondelete="CASCADE"), index=True)
+    title: Mapped[str] = mapped_column(Text)
+    description: Mapped[str] = mapped_column(Text)
+    severity: Mapped[str] = mapped_column(String(16), index=True)
+    cve_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    cvss_score: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    scanner_name: Mapped[str] = mapped_column(String(64))
+    payload: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    location: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    evidence: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+
+
+def _extract_host(url: str) -> str:
+    """URL'den hostname'i çıkarır"""
+    parsed = urlparse(url)
+    return (parsed.hostname or parsed.path or url)[:255]
+
+
+def _estimate_result_size(result: Dict[str, Any]) -> int:
+    """Sonuç sözlüğünün bellekte kapladığı yaklaşık boyut (bayt)"""
+    size = 1024
+    for vuln in result["vulnerabilities"]:
+        size += 512 + sum(len(value) for value in vuln.values() if isinstance(value, str))
+    for line in result["scan_logs"]:
+        size += 64 + len(line)
+    return size
+
+
+def _encode_spill_value(value):
+    """Sonuçtaki tarih alanlarını JSON'da işaretli biçimde saklar"""
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"JSON'a çevrilemeyen değer: {type(value).__name__}")
+
+
+def _decode_spill_object(obj: Dict[str, Any]):
+    if len(obj) == 1 and "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+class ResultSpill:
+    """Bellekten çıkarılan sonuçlar için yerel diskte boyut sınırlı, LRU ve TTL tahliyeli ikinci önbellek katmanı
+    Her süreç kendi geçici dizinini kullanır; dizin süreç kapanırken silinir"""
+
+    def __init__(self, max_bytes: int = SCAN_RESULT_SPILL_BYTES, base_dir: str = SCAN_RESULT_SPILL_DIR):
+        self.max_bytes = max_bytes
+        self.base_dir = base_dir or None
+        self.total_bytes = 0
+        self._directory: Optional[str] = None
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, scan_id: str) -> str:
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix="guardmesh-results-", dir=self.base_dir)
+            atexit.register(shutil.rmtree, self._directory, True)
+        return os.path.join(self._directory, hashlib.sha1(scan_id.encode()).hexdigest() + ".json")
+
+    def write(self, scan_id: str, result: Dict[str, Any], expires_at: float):
+        """Sonucu diske yazar; disk sınırı aşılırsa en uzun süredir kullanılmayan dosyalar silinir"""
+        if self.max_bytes <= 0:
+            return
+
+        data = json.dumps(result, default=_encode_spill_value).encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            self._remove(scan_id)
+            try:
+                path = self._path(scan_id)
+                with open(path, "wb") as spill_file:
+                    spill_file.write(data)
+            except OSError as e:
+                logger.warning(f"Sonuç diske taşınamadı ({scan_id}): {e}")
+                return
+
+            self._entries[scan_id] = (path, len(data), expires_at)
+            self.total_bytes += len(data)
+            while self.total_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def read(self, scan_id: str) -> Optional[tuple]:
+        """Diskteki sonucu ve geçerlilik süresini döndürür; süresi dolmuşsa siler"""
+        with self._lock:
+            entry = self._entries.get(scan_id)
+            if entry is None:
+                return None
+
+            path, size, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(scan_id)
+                return None
+
+            try:
+                with open(path, "rb") as spill_file:
+                    result = json.loads(spill_file.read(), object_hook=_decode_spill_object)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Diskteki sonuç okunamadı ({scan_id}): {e}")
+                self._remove(scan_id)
+                return None
+
+            self._entries.move_to_end(scan_id)
+            return result, expires_at
+
+    def remove(self, scan_id: str):
+        """Taramanın diskteki sonucunu siler"""
+        with self._lock:
+            self._remove(scan_id)
+
+    def _remove(self, scan_id: str):
+        entry = self._entries.pop(scan_id, None)
+        if entry is None:
+            return
+
+        self.total_bytes -= entry[1]
+        try:
+            os.remove(entry[0])
+        except OSError:
+            pass
+
+
+class ResultCache:
+    """Sonuçlanmış taramalar için boyut sınırlı, LRU ve TTL tahliyeli bellek içi önbellek
+    Bellekten çıkan (veya belleğe sığmayan) sonuçlar disk katmanına taşınır, veritabanına ancak orada da yoksa gidilir"""
+
+    def __init__(self, max_bytes: int = SCAN_RESULT_CACHE_BYTES, ttl: float = SCAN_RESULT_CACHE_TTL,
+                 spill: Optional[ResultSpill] = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.spill = spill if spill is not None else ResultSpill()
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        """Önbellekteki sonucu döndürür; bellekte yoksa disk katmanından okuyup belleğe geri alır"""
+        with self._lock:
+            entry = self._entries.get(scan_id)
+            if entry is not None:
+                result, size, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(scan_id)
+                    return result
+                self._remove(scan_id)
+
+        spilled = self.spill.read(scan_id)
+        if spilled is None:
+            return None
+
+        result, expires_at = spilled
+        self._store(scan_id, result, expires_at)
+        return result
+
+    def put(self, scan_id: str, result: Dict[str, Any]):
+        """Sonucu ekler; bellek sınırı aşılırsa en uzun süredir kullanılmayan sonuçlar diske taşınır"""
+        self._store(scan_id, result, time.monotonic() + self.ttl)
+
+    def _store(self, scan_id: str, result: Dict[str, Any], expires_at: float):
+        size = _estimate_result_size(result)
+        if size > self.max_bytes:
+            self.spill.write(scan_id, result, expires_at)
+            return
+
+        evicted = []
+        with self._lock:
+            self._remove(scan_id)
+            self._entries[scan_id] = (result, size, expires_at)
+            self.total_bytes += size
+
+            while self.total_bytes > self.max_bytes:
+                evicted_id = next(iter(self._entries))
+                evicted.append((evicted_id, self._entries[evicted_id]))
+                self._remove(evicted_id)
+
+        # Disk yazımı bellek kilidi dışında yapılır - okuyucular yazımı beklemez
+        for evicted_id, (evicted_result, _, evicted_expires_at) in evicted:
+            if evicted_expires_at > time.monotonic():
+                self.spill.write(evicted_id, evicted_result, evicted_expires_at)
+
+    def invalidate(self, scan_id: str):
+        """Taramanın önbellekteki (bellek ve disk) sonucunu siler"""
+        with self._lock:
+            self._remove(scan_id)
+        self.spill.remove(scan_id)
+
+    def _remove(self, scan_id: str):
+        entry = self._entries.pop(scan_id, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+
+def _vulnerability_record_to_dict(record: VulnerabilityRecord) -> Dict[str, Any]:
+    """Veritabanı kaydını API formatına çevirir"""
+    return {
+        "id": record.id,
+        "title": record.title,
+        "description": record.description,
+        "severity": record.severity,
+        "cve_id": record.cve_id,
+        "cvss_score": record.cvss_score,
+        "scanner_name": record.scanner_name,
+        "location": record.location,
+        "timestamp": record.timestamp
+    }
+
+
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    """SQLite dosya veritabanı için eşzamanlı okuma/yazma ayarları"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+class ScanStore:
+    """Tarama sonuçları için veritabanı deposu - API ve worker süreçleri arasında paylaşılır"""
+
+    def __init__(self, database_url: str = DATABASE_URL):
+        self.database_url = database_url
+        engine_options = {}
+
+        if database_url.startswith("sqlite"):
+            engine_options["connect_args"] = {"check_same_thread": False}
+            # Bellek içi SQLite her bağlantıda ayrı veritabanı açar, tek bağlantı paylaşılmalı
+            if ":memory:" in database_url or database_url in ("sqlite://", "sqlite:///"):
+                engine_options["poolclass"] = StaticPool
+        else:
+            engine_options["pool_pre_ping"] = True
+
+        self.engine = create_engine(database_url, **engine_options)
+        if database_url.startswith("sqlite") and "poolclass" not in engine_options:
+            # WAL: okuyucular yazarı beklemez, her kayıtta tam disk senkronu yapılmaz (yoğun tarama girişi için)
+            event.listen(self.engine, "connect", _configure_sqlite_connection)
+
+        self.result_cache = ResultCache()
+        self.session_factory = sessionmaker(bind=self.engine, expire_on_commit=False)
+        self._tables_ready = False
+        self._lock = threading.Lock()
+
+        threads = SCAN_STORE_THREADS or (1 if database_url.startswith("sqlite") else 8)
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="guardmesh-store")
+
+    async def run(self, method, *args, **kwargs):
+        """Depo metodunu olay döngüsünü bloklamadan ayrı iş parçacığında çalıştırır - async koddaki tüm
+        veritabanı çağrıları bunun üzerinden yapılır, yavaş bir yazım diğer taramaları ve abonelikleri bekletmez"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+
+    def create_tables(self):
+        """Tabloları oluşturur (varsa dokunmaz)"""
+        with self._lock:
+            if not self._tables_ready:
+                Base.metadata.create_all(self.engine)
+                self._create_lock_rows()
+                self._tables_ready = True
+
+    def _create_lock_rows(self):
+        """Eksik zamanlayıcı kilit satırlarını ekler - aynı anda ekleyen başka bir süreç varsa onunki kullanılır"""
+        try:
+            with self.session_factory() as session:
+                with session.begin():
+                    existing = set(session.scalars(select(SchedulerLockRecord.name)))
+                    missing = [{"name": name, "version": 0} for name in SCHEDULER_LOCKS if name not in existing]
+                    if missing:
+                        session.execute(insert(SchedulerLockRecord), missing)
+        except IntegrityError:
+            pass
+
+    @contextmanager
+    def session(self):
+        """İşlem (transaction) kapsamında oturum açar"""
+        self.create_tables()
+        with self.session_factory() as session:
+            with session.begin():
+                yield session
+
+    @contextmanager
+    def locked_session(self, name: str):
+        """Adlandırılmış kilidi tutan işlem açar - aynı kilidi isteyen diğer süreçler işlem bitene kadar bekler
+        İşlem kilit satırına yazarak başlar (SQLite'ta yazma kilidi, diğer veritabanlarında satır kilidi alınır),
+        böylece işlem içindeki okumalar diğer süreçlerin son kararlarını görür"""
+        self.create_tables()
+        with self.session_factory() as session:
+            with session.begin():
+                locked = session.execute(
+                    update(SchedulerLockRecord).where(SchedulerLockRecord.name == name)
+                    .values(version=SchedulerLockRecord.version + 1)
+                ).rowcount
+                if not locked:
+                    raise ValueError(f"Bilinmeyen zamanlayıcı kilidi: {name}")
+                yield session
+
+    def create_scan(self, scan_id: str, url: str, scan_type: str, scanner_names: List[str], status: str = "queued"):
+        """Yeni tarama kaydı oluşturur"""
+        with self.session() as session:
+            session.add(ScanRecord(
+                scan_id=scan_id,
+                group_id=scan_id,
+                url=url,
+                target_host=_extract_host(url),
+                scan_type=scan_type,
+                scanners=list(scanner_names),
+                status=status,
+                progress=0
+            ))
+
+    def create_scans(self, scans: List[Dict[str, str]], scan_type: str, scanner_names: List[str], status: str = "queued"):
+        """Birden çok tarama kaydını tek seferde (bulk) oluşturur - kayıtlar group_id ile çalışacakları gruba bağlanır"""
+        if not scans:
+            return
+
+        now = datetime.now()
+        with self.session() as session:
+            session.execute(insert(ScanRecord), [
+                {
+                    "scan_id": scan["scan_id"],
+                    "group_id": scan.get("group_id", scan["scan_id"]),
+                    "url": scan["url"],
+                    "target_host": _extract_host(scan["url"]),
+                    "scan_type": scan_type,
+                    "scanners": list(scanner_names),
+                    "status": status,
+                    "progress": 0,
+                    "cancel_requested": False,
+                    "created_at": now
+                }
+                for scan in scans
+            ])
+
+    def begin_scan(self, scan_id: str, url: str, scan_type: str, scanner_names: List[str], group_id: Optional[str] = None):
+        """Taramayı çalışıyor olarak işaretler; yeniden denemelerde önceki kısmi sonuçları temizler"""
+        self.result_cache.invalidate(scan_id)
+        with self.session() as session:
+            record = session.get(ScanRecord, scan_id)
+            if record is None:
+                record = ScanRecord(
+                    scan_id=scan_id,
+                    group_id=group_id or scan_id,
+                    url=url,
+                    target_host=_extract_host(url),
+                    scan_type=scan_type,
+                    scanners=list(scanner_names)
+                )
+                session.add(record)
+            else:
+                session.execute(delete(VulnerabilityRecord).where(VulnerabilityRecord.scan_id == scan_id))
+                session.execute(delete(ScanLogRecord).where(ScanLogRecord.scan_id == scan_id))
+
+            record.status = "running"
+            record.progress = 0
+            record.message = None
+            record.start_time = datetime.now()
+            record.end_time = None
+
+    def update_status(self, scan_id: str, status: str, progress: Optional[int] = None, message: Optional[str] = None):
+        """Tarama durumunu günceller"""
+        with self.session() as session:
+            record = session.get(ScanRecord, scan_id)
+            if record is None:
+                return
+
+            record.status = status
+            if progress is not None:
+                record.progress = progress
+            if message is not None:
+                record.message = message
+            if status in ("completed", "failed", "cancelled"):
+                record.end_time = datetime.now()
+
+    def request_cancel(self, scan_id: str) -> bool:
+        """Tarama için iptal isteği kaydeder - taramayı çalıştıran süreç bu bayrağı izler"""
+        with self.session() as session:
+            record = session.get(ScanRecord, scan_id)
+            if record is None:
+                return False
+
+            record.cancel_requested = True
+            return True
+
+    def is_cancel_requested(self, scan_id: str) -> bool:
+        """Tarama için iptal istenip istenmediğini döndürür"""
+        with self.session() as session:
+            cancel_requested = session.scalar(
+                select(ScanRecord.cancel_requested).where(ScanRecord.scan_id == scan_id)
+            )
+            return bool(cancel_requested)
+
+    def cancel_requested_ids(self, scan_ids: List[str]) -> List[str]:
+        """Verilen taramalardan iptal istenenleri tek sorguda döndürür"""
+        if not scan_ids:
+            return []
+
+        with self.session() as session:
+            return list(session.scalars(
+                select(ScanRecord.scan_id).where(ScanRecord.scan_id.in_(scan_ids), ScanRecord.cancel_requested.is_(True))
+            ))
+
+    def revocable_group(self, scan_id: str) -> Optional[str]:
+        """Taramanın grubundaki tüm taramalar iptal istendiyse veya sonlandıysa grubun kimliğini (kuyruk görevi) döndürür"""
+        with self.session() as session:
+            group_id = session.scalar(select(ScanRecord.group_id).where(ScanRecord.scan_id == scan_id))
+            if group_id is None:
+                return None
+
+            # Grupta çalışmaya devam edecek bir tarama varsa görev kuyruktan düşürülmez
+            live_members = session.scalar(
+                select(func.count()).select_from(ScanRecord).where(
+                    ScanRecord.group_id == group_id,
+                    ScanRecord.cancel_requested.is_(False),
+                    ScanRecord.status.notin_(FINAL_SCAN_STATUSES)
+                )
+            )
+            return None if live_members else group_id
+
+    def add_vulnerabilities(self, scan_id: str, vulnerabilities: List[Vulnerability]) -> List[Dict[str, Any]]:
+        """Bir tarayıcının bulduğu güvenlik açıklarını tek seferde (bulk) ekler"""
+        if not vulnerabilities:
+            return []
+
+        rows = [
+            {
+                "scan_id": scan_id,
+                "title": vuln.title,
+                "description": vuln.description,
+                "severity": vuln.severity,
+                "cve_id": vuln.cve_id,
+                "cvss_score": vuln.cvss_score,
+                "scanner_name": vuln.scanner_name,
+                "payload": vuln.payload,
+                "location": vuln.location,
+                "evidence": vuln.evidence,
+                "timestamp": vuln.timestamp
+            }
+            for vuln in vulnerabilities
+        ]
+
+        with self.session() as session:
+            records = session.scalars(insert(VulnerabilityRecord).returning(VulnerabilityRecord), rows).all()
+            return [_vulnerability_record_to_dict(record) for record in records]
+
+    def add_logs(self, scan_id: str, messages: List[str]):
+        """Tarama loglarını tek seferde (bulk) ekler"""
+        if not messages:
+            return
+
+        with self.session() as session:
+            session.execute(insert(ScanLogRecord), [{"scan_id": scan_id, "message": message} for message in messages])
+
+    def get_status(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        """Tarama durumunu döndürür"""
+        with self.session() as session:
+            record = session.get(ScanRecord, scan_id)
+            if record is None:
+                return None
+
+            scan_info = {"status": record.status, "progress": record.progress}
+            if record.message:
+                scan_info["error"] = record.message
+            return scan_info
+
+    def get_result(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        """Tamamlanmış taramanın sonuçlarını döndürür"""
+        cached = self.result_cache.get(scan_id)
+        if cached is not None:
+            return cached
+
+        with self.session() as session:
+            record = session.get(ScanRecord, scan_id)
+            if record is None or record.status not in ("completed", "failed", "cancelled"):
+                return None
+
+            vulnerabilities = session.scalars(
+                select(VulnerabilityRecord)
+                .where(VulnerabilityRecord.scan_id == scan_id)
+                .order_by(VulnerabilityRecord.id)
+            ).all()
+            logs = session.scalars(
+                select(ScanLogRecord.message)
+                .where(ScanLogRecord.scan_id == scan_id)
+                .order_by(ScanLogRecord.id)
+            ).all()
+
+            result = {
+                "scan_id": record.scan_id,
+                "url": record.url,
+                "status": record.status,
+                "start_time": record.start_time or record.created_at,
+                "end_time": record.end_time,
+                "vulnerabilities": [_vulnerability_record_to_dict(vuln) for vuln in vulnerabilities],
+                "scan_logs": list(logs)
+            }
+
+        if result["status"] in FINAL_SCAN_STATUSES:
+            self.result_cache.put(scan_id, result)
+        return result
+
+    def find_scans(self, target: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Taramaları hedefe (URL veya hostname) ve duruma göre listeler"""
+        with self.session() as session:
+            query = select(ScanRecord, func.count(VulnerabilityRecord.id)).outerjoin(
+                VulnerabilityRecord, VulnerabilityRecord.scan_id == ScanRecord.scan_id
+            ).group_by(ScanRecord.scan_id)
+
+            if target:
+                if "://" in target:
+                    query = query.where(ScanRecord.url == target)
+                else:
+                    query = query.where(ScanRecord.target_host == target)
+            if status:
+                query = query.where(ScanRecord.status == status)
+
+            rows = session.execute(query.order_by(ScanRecord.created_at.desc()).limit(limit)).all()
+            return [
+                {
+                    "scan_id": record.scan_id,
+                    "url": record.url,
+                    "scan_type": record.scan_type,
+                    "status": record.status,
+                    "progress": record.progress,
+                    "start_time": record.start_time,
+                    "end_time": record.end_time,
+                    "vulnerability_count": vuln_count
+                }
+                for record, vuln_count in rows
+            ]
+
+    def find_vulnerabilities(self, scan_id: Optional[str] = None, severity: Optional[str] = None,
+                             target: Optional[str] = None, limit: int = 200) -> List[Dict[str, Any]]:
+        """Güvenlik açıklarını tarama, severity ve hedefe göre listeler"""
+        with self.session() as session:
+            query = select(VulnerabilityRecord)
+
+            if scan_id:
+                query = query.where(VulnerabilityRecord.scan_id == scan_id)
+            if severity:
+                query = query.where(VulnerabilityRecord.severity == severity.lower())
+            if target:
+                query = query.join(ScanRecord, ScanRecord.scan_id == VulnerabilityRecord.scan_id)
+                if "://" in target:
+                    query = query.where(ScanRecord.url == target)
+                else:
+                    query = query.where(ScanRecord.target_host == target)
+
+            records = session.scalars(query.order_by(VulnerabilityRecord.id.desc()).limit(limit)).all()
+            return [_vulnerability_record_to_dict(record) for record in records]
+
+
+# Uygulama genelinde paylaşılan depo
+scan_store = ScanStore()
@@ -0,0 +1,117 @@
+"""
+GuardMesh Tarama Olay Yayını
+Tarama ilerlemesi, log satırları ve yeni güvenlik açıkları için süreç içi yayın/abone (pub/sub) altyapısı
+"""
+
+import os
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, Any, Optional, Set
+
+
+logger = logging.getLogger("guardmesh-events")
+
+# Abone başına tutulacak en fazla bekleyen olay sayısı
+EVENT_QUEUE_SIZE = int(os.getenv("SCAN_EVENT_QUEUE_SIZE", "256"))
+
+# Kuyruk dolduğunda yerine yenisi konabilen (birleştirilebilen) olay türleri
+COALESCED_EVENTS = ("progress", "status")
+# Kuyruk dolduğunda ilk düşürülecek olay türleri
+DROPPABLE_EVENTS = ("log",)
+
+
+class ScanSubscription:
+    """Tek bir istemcinin (SSE/WebSocket) olay kuyruğu - yavaş istemciler diğerlerini bekletmez"""
+
+    def __init__(self, scan_id: str, max_size: int = EVENT_QUEUE_SIZE):
+        self.scan_id = scan_id
+        self.max_size = max_size
+        self.dropped = 0
+        self._events = deque()
+        self._ready = asyncio.Event()
+
+    def push(self, event: Dict[str, Any]):
+        """Olayı kuyruğa ekler; kuyruk doluysa bekletmeden eski olayları eler"""
+        event_type = event["type"]
+
+        # İlerleme/durum olayları birikmez, kuyruktaki son aynı tür olayın yerine geçer
+        if event_type in COALESCED_EVENTS and self._events and self._events[-1]["type"] == event_type:
+            self._events[-1] = event
+            self._ready.set()
+            return
+
+        if len(self._events) >= self.max_size:
+            self._evict()
+
+        self._events.append(event)
+        self._ready.set()
+
+    def _evict(self):
+        """Kuyruk doluyken yer açar: önce log satırları, sonra en eski olay düşürülür"""
+        for index, queued in enumerate(self._events):
+            if queued["type"] in DROPPABLE_EVENTS:
+                del self._events[index]
+                self.dropped += 1
+                return
+
+        self._events.popleft()
+        self.dropped += 1
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Sıradaki olayı döndürür; zaman aşımında None döner"""
+        if not self._events:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return None
+
+        # Düşürülen olaylar varsa istemciye önce bunu bildir (sonuçları yeniden çekebilmesi için)
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            return {"type": "lagged", "scan_id": self.scan_id, "dropped": dropped}
+
+        return self._events.popleft()
+
+
+class ScanEventBus:
+    """Tarama olaylarını ilgili tüm abonelere dağıtır"""
+
+    def __init__(self, queue_size: int = EVENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[ScanSubscription]] = {}
+
+    def subscribe(self, scan_id: str) -> ScanSubscription:
+        """Taramaya yeni abone ekler"""
+        subscription = ScanSubscription(scan_id, self.queue_size)
+        self._subscribers.setdefault(scan_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: ScanSubscription):
+        """Aboneliği sonlandırır"""
+        subscribers = self._subscribers.get(subscription.scan_id)
+        if subscribers is None:
+            return
+
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.scan_id]
+
+    def publish(self, scan_id: str, event_type: str, data: Dict[str, Any]):
+        """Olayı yayınlar - abone yoksa hiçbir iş yapmaz, hiçbir zaman bloklamaz"""
+        subscribers = self._subscribers.get(scan_id)
+        if not subscribers:
+            return
+
+        event = {"type": event_type, "scan_id": scan_id, **data}
+        for subscription in subscribers:
+            subscription.push(event)
+
+    def subscriber_count(self, scan_id: str) -> int:
+        """Taramayı izleyen istemci sayısını döndürür"""
+        return len(self._subscribers.get(scan_id, ()))
+
+
+# Uygulama genelinde paylaşılan olay yayıncısı
+scan_events = ScanEventBus()
@@ -4,28 +4,42 @@
 
 
 import os
+import json
+import uuid
+import time
 import asyncio
 import logging
 from contextlib import asynccontextmanager
-from typing import List, Optional
+from typing import Awaitable, Callable, Dict, List, Optional
 from datetime import datetime
+from urllib.parse import urlparse
 from dotenv import load_dotenv
 
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 
 
-from scanners.base_scanner import BaseScanner
+from scanners.base_scanner import BaseScanner, ScanEvent
+from scanners.http_client import shared_http_client
+from scanners.process_supervisor import process_supervisor
+from scanners.crawler import Crawler, EndpointInventory
 from scanners.xss_scanner import XSSScanner
-from scanners.nmap_scanner import NmapScanner
+from scanners.nmap_scanner import NmapScanner, SCANNER_NMAP_BATCH_SIZE
 from scanners.nuclei_scanner import NucleiScanner
 from scanners.zap_scanner import ZAPScanner
 from scanners.sqlmap_scanner import SQLMapScanner
 from scanners.nikto_scanner import NiktoScanner
 from scanners.shodan_scanner import ShodanScanner
+from tasks import celery_app, enqueue_scan, enqueue_scan_group, USE_LOCAL_QUEUE
+from database import scan_store
+from events import scan_events
+from scheduler import scan_scheduler
+from cache import scan_cache, cache_key, is_cacheable
 
 
 # Ortam değişkenlerini yükle
@@ -40,8 +54,11 @@ logger = logging.getLogger("guardmesh-backend")
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("GuardMesh Backend başlatılıyor...")
+    await scan_store.run(scan_store.create_tables)
     yield
     logger.info("GuardMesh Backend kapatılıyor...")
+    shared_http_client.log_stats()
+    await shared_http_client.close()
 
 
 # FastAPI uygulaması oluştur
@@ -68,12 +85,21 @@ class ScanRequest(BaseModel):
     url: str
     scan_type: str = "quick"  # quick, standard, full
     options: Optional[dict] = None
+    force_fresh: bool = False  # önbellekteki sonuçları kullanma, tüm tarayıcıları yeniden çalıştır
+
+class BatchScanRequest(BaseModel):
+    targets: List[str]
+    scan_type: str = "quick"  # quick, standard, full
+    options: Optional[dict] = None
+    force_fresh: bool = False
 
 class ScanStatus(BaseModel):
     scan_id: str
     status: str
     progress: int
     message: str
+    queue_position: Optional[int] = None
+    estimated_wait: Optional[float] = None
 
 class VulnerabilityResponse(BaseModel):
     id: int
@@ -96,11 +122,6 @@ class ScanResultResponse(BaseModel):
     scan_logs: List[str]
 
 
-# Geçici bellek (ileride veritabanı ile değiştirilebilir)
-scan_results = {}
-active_scans = {}
-
-
 # Tarayıcı eşlemesi
 SCANNERS = {
     "xss": XSSScanner,
@@ -130,61 +151,481 @@ def get_scanner(scan_type: str, scanner_name: str):
     return scanner_class(config=config)
 
 
-# Arka planda güvenlik taraması başlat
-async def run_scan(scan_id: str, url: str, scan_type: str, scanner_names: List[str]):
-    try:
-        active_scans[scan_id] = {"status": "running", "progress": 0}
+# Tarayıcı yürütme ayarları
+# concurrent: bağımsız tarayıcılar aynı anda çalışır, sequential: sırayla
+SCAN_EXECUTION_MODE = os.getenv("SCAN_EXECUTION_MODE", "concurrent")
+SCAN_MAX_CONCURRENCY = int(os.getenv("SCAN_MAX_CONCURRENCY", "4"))
+
+# Tarama türüne göre çalışacak tarayıcılar
+SCAN_TYPE_SCANNERS = {
+    "quick": ["nmap", "xss"],
+    "standard": ["nmap", "xss", "nuclei", "nikto"],
+    "full": ["nmap", "xss", "nuclei", "zap", "sqlmap", "nikto", "shodan"]
+}
 
-        all_vulnerabilities = []
-        all_logs = []
+# Sonucu yalnızca hosta bağlı olan tarayıcılar - toplu taramada her host için bir kez çalışır
+HOST_LEVEL_SCANNERS = ("nmap", "nikto", "shodan")
 
-        total_scanners = len(scanner_names)
-        for i, scanner_name in enumerate(scanner_names):
-            try:
-                scanner = get_scanner(scan_type, scanner_name)
-                result = await scanner.scan(url)
-
-                # Güvenlik açıklarını uygun formata çevir
-                for vuln in result.vulnerabilities:
-                    vuln_dict = {
-                        "id": len(all_vulnerabilities) + 1,
-                        "title": vuln.title,
-                        "description": vuln.description,
-                        "severity": vuln.severity,
-                        "cve_id": vuln.cve_id,
-                        "cvss_score": vuln.cvss_score,
-                        "scanner_name": vuln.scanner_name,
-                        "location": vuln.location,
-                        "timestamp": vuln.timestamp
-                    }
-                    all_vulnerabilities.append(vuln_dict)
-
-                all_logs.extend(result.scan_logs)
-
-                # İlerleme güncelle
-                progress = int((i + 1) / total_scanners * 100)
-                active_scans[scan_id] = {"status": "running", "progress": progress}
-
-            except Exception as e:
-                logger.error(f"{scanner_name} tarayıcısı başarısız: {e}")
-                all_logs.append(f"HATA: {scanner_name} tarayıcısı başarısız: {str(e)}")
-
-        # Sonuçları kaydet
-        scan_results[scan_id] = {
-            "scan_id": scan_id,
-            "url": url,
-            "status": "completed",
-            "start_time": datetime.now(),
-            "end_time": datetime.now(),
-            "vulnerabilities": all_vulnerabilities,
-            "scan_logs": all_logs
+# Toplu taramada birden çok hostun tek nmap çalıştırmasında (-iL) taranması
+# Açıkken host grupları SCANNER_NMAP_BATCH_SIZE'lık işlerde birleştirilir; istekte "nmap_batch": true/false ezer
+SCAN_NMAP_BATCH = os.getenv("SCAN_NMAP_BATCH", "true").lower() == "true"
+# Aynı işteki birden çok hedefin tek nuclei sürecinde (-l) taranması - template'ler bir kez yüklenir
+# İstekte "nuclei_batch": true/false ezer
+SCAN_NUCLEI_BATCH = os.getenv("SCAN_NUCLEI_BATCH", "true").lower() == "true"
+
+# İstek seçeneklerinden tarayıcıya iletilen ayarlar: istek anahtarı -> tarayıcı seçeneği
+# nuclei_bulk_size: template başına paralel taranan hedef (-bulk-size), nuclei_concurrency: paralel template (-c)
+SCANNER_REQUEST_OPTIONS = {
+    "nuclei": {"nuclei_bulk_size": "bulk_size", "nuclei_concurrency": "concurrency"}
+}
+
+# Keşif (crawl) envanterini kullanan tarayıcılar ve tarama türüne göre keşfin varsayılan durumu
+# İstekte "crawl": true/false seçeneği varsayılanı ezer
+INVENTORY_SCANNERS = ("xss", "sqlmap")
+SCAN_TYPE_CRAWL = {"quick": False, "standard": True, "full": True}
+
+
+# Canlı akış ayarları
+TERMINAL_SCAN_STATUSES = ("completed", "failed", "cancelled")
+# Olay gelmediğinde durumun veritabanından kontrol edilme aralığı (worker'da çalışan taramalar için)
+SCAN_STREAM_POLL_INTERVAL = float(os.getenv("SCAN_STREAM_POLL_INTERVAL", "5"))
+# Akan log satırlarının veritabanına toplu yazılma eşiği
+SCAN_LOG_FLUSH_SIZE = int(os.getenv("SCAN_LOG_FLUSH_SIZE", "20"))
+
+
+# İptal ayarları
+# Çalışan taramanın iptal isteğini veritabanından kontrol etme aralığı (worker'da çalışan taramalar için)
+SCAN_CANCEL_POLL_INTERVAL = float(os.getenv("SCAN_CANCEL_POLL_INTERVAL", "3"))
+
+# API sürecinde (yerel kuyruk) çalışan grup görevleri - grup kimliğine göre referansları tutulur
+running_scan_tasks: Dict[str, asyncio.Task] = {}
+# Bu süreçte çalışan (veya sıra bekleyen) taramaların iptal işleyicileri - tarama kimliğine göre; toplu taramalarda
+# üyenin kendi tarayıcı görevleri doğrudan iptal edilir, paylaşılan görevler grubun diğer taramaları için sürer
+scan_cancel_handlers: Dict[str, Callable[[str], Awaitable[None]]] = {}
+
+
+# Tarama durumunu kaydet ve izleyen istemcilere yayınla
+async def _set_scan_status(scan_id: str, status: str, progress: Optional[int] = None, message: Optional[str] = None):
+    await scan_store.run(scan_store.update_status, scan_id, status, progress=progress, message=message)
+
+    if status == "running" and progress is not None:
+        scan_events.publish(scan_id, "progress", {"progress": progress})
+    else:
+        event = {"status": status, "progress": progress or 0}
+        if message:
+            event["error"] = message
+        scan_events.publish(scan_id, "status", event)
+
+
+class ScannerOutputRecorder:
+    """Akan tarayıcı çıktısını anında yayınlar, veritabanına küçük gruplar halinde (olay döngüsü dışında) yazar"""
+
+    def __init__(self, scan_ids: List[str]):
+        # Host düzeyindeki tarayıcıların çıktısı gruptaki tüm taramalara yazılır
+        # Liste paylaşımlıdır; iptal edilen taramalar listeden çıkarılınca yazım durur
+        self.scan_ids = scan_ids
+        self.pending_logs: List[str] = []
+
+    async def add_log(self, message: str):
+        for scan_id in self.scan_ids:
+            scan_events.publish(scan_id, "log", {"message": message})
+        self.pending_logs.append(message)
+        if len(self.pending_logs) >= SCAN_LOG_FLUSH_SIZE:
+            await self.flush()
+
+    async def add_vulnerabilities(self, vulnerabilities: list):
+        # Log sırası korunsun diye bekleyen loglar önce yazılır
+        await self.flush()
+        for scan_id in list(self.scan_ids):
+            for vuln_dict in await scan_store.run(scan_store.add_vulnerabilities, scan_id, vulnerabilities):
+                scan_events.publish(scan_id, "vulnerability", {"vulnerability": vuln_dict})
+
+    async def flush(self):
+        if self.pending_logs:
+            # Yazım sürerken gelen loglar bir sonraki gruba kalır
+            messages, self.pending_logs = self.pending_logs, []
+            for scan_id in list(self.scan_ids):
+                await scan_store.run(scan_store.add_logs, scan_id, messages)
+
+
+# Önbellekten yeniden oynatılan log satırlarının öneki - taze çalıştırmadan ayırt edilebilsin diye
+CACHED_LOG_PREFIX = "[ÖNBELLEK] "
+
+
+# Önbelleğe yazmayı dener; hata logu içeren sonuç saklanmaz ve bu durum loglanır
+async def _store_in_cache(recorder: ScannerOutputRecorder, key: tuple, scanner_name: str, events: list, result):
+    if scan_cache.put(key, events, result):
+        return
+    if result.status == "completed" and not is_cacheable(result):
+        await recorder.add_log(f"ÖNBELLEK: {scanner_name} çalıştırması hata logu içerdiği için önbelleğe alınmadı")
+
+
+# Tarayıcı olaylarını (canlı veya önbellekten) taramalara yaz
+# Ardışık bulgular tek add_vulnerabilities çağrısıyla (tek toplu INSERT) yazılır, loglarla sıraları korunur
+# Önbellekten yeniden oynatılan loglar CACHED_LOG_PREFIX ile işaretlenir
+async def _record_scanner_events(recorder: ScannerOutputRecorder, events: list, cached: bool = False):
+    vulnerabilities = []
+    for event in events:
+        if event.type == "vulnerability":
+            vulnerabilities.append(event.vulnerability)
+            continue
+
+        if vulnerabilities:
+            await recorder.add_vulnerabilities(vulnerabilities)
+            vulnerabilities = []
+        if event.type == "log":
+            await recorder.add_log(f"{CACHED_LOG_PREFIX}{event.message}" if cached else event.message)
+
+    if vulnerabilities:
+        await recorder.add_vulnerabilities(vulnerabilities)
+
+
+# Tek bir tarayıcıyı izole şekilde çalıştır - hata diğer tarayıcıları etkilemez
+# Bulgular ve loglar tarayıcı bitmeden, bulundukları anda kaydedilir
+async def _run_single_scanner(scan_ids: List[str], scan_type: str, scanner_name: str, url: str, semaphore: asyncio.Semaphore,
+                              options: Optional[dict] = None, inventory: Optional[EndpointInventory] = None):
+    options = options or {}
+    key = cache_key(scanner_name, url, scan_type, options)
+
+    # Aynı hedefte yakın zamanda tamamlanmış çalıştırma varsa tarayıcı yeniden çalıştırılmaz
+    if not options.get("force_fresh"):
+        cached = scan_cache.get(key)
+        if cached is not None:
+            recorder = ScannerOutputRecorder(scan_ids)
+            age = int(time.monotonic() - cached.stored_at)
+            await recorder.add_log(f"ÖNBELLEK: {scanner_name} sonucu önbellekten alındı ({age} sn önce tamamlanan tarama)")
+            await _record_scanner_events(recorder, cached.events, cached=True)
+            await recorder.flush()
+            return scanner_name, cached.result, None
+
+    async with semaphore, scan_scheduler.scanner_slot(scanner_name, scan_type):
+        recorder = ScannerOutputRecorder(scan_ids)
+        if options.get("force_fresh"):
+            await recorder.add_log(f"ÖNBELLEK: {scanner_name} için önbellek atlandı (force_fresh), tarayıcı çalıştırılıyor")
+        else:
+            await recorder.add_log(f"ÖNBELLEK: {scanner_name} için geçerli sonuç yok, tarayıcı çalıştırılıyor")
+
+        try:
+            scanner = get_scanner(scan_type, scanner_name)
+            result = None
+            events = []
+
+            # Keşif envanteri varsa tarayıcı yalnızca hedef URL'yi değil bulunan tüm uç noktaları test eder
+            scanner_options = _scanner_options(scanner_name, options)
+            if inventory is not None:
+                scanner_options["inventory"] = inventory
+            async for event in scanner.scan_stream(url, scanner_options or None):
+                if event.type == "result":
+                    result = event.result
+                    continue
+
+                events.append(event)
+                await _record_scanner_events(recorder, [event])
+
+            # Yalnızca hatasız tamamlanan çalıştırmalar önbelleğe alınır
+            if result is not None:
+                await _store_in_cache(recorder, key, scanner_name, events, result)
+
+            return scanner_name, result, None
+        except Exception as e:
+            logger.error(f"{scanner_name} tarayıcısı başarısız: {e}")
+            await recorder.add_log(f"HATA: {scanner_name} tarayıcısı başarısız: {str(e)}")
+            return scanner_name, None, e
+        finally:
+            await recorder.flush()
+
+
+# İsteğin tarayıcıya ait seçeneklerini tarayıcının beklediği adlarla döndür
+def _scanner_options(scanner_name: str, options: dict) -> dict:
+    return {
+        scanner_key: options[request_key]
+        for request_key, scanner_key in SCANNER_REQUEST_OPTIONS.get(scanner_name, {}).items()
+        if options.get(request_key) is not None
+    }
+
+
+# Birden çok hedefi tarayıcının tek sürecinde (scan_batch) tara ve her hedefin sonucunu yalnızca o hedefin taramalarına yaz
+# nmap için hedefler hostlar, nuclei için URL'lerdir. scan_ids paylaşımlı üye listesidir; iptal edilen taramalar
+# listeden çıkarıldığında onlara yazılmaz
+async def _run_batched_scanner(scan_ids: List[str], target_members: Dict[str, List[str]], scan_type: str, scanner_name: str,
+                               semaphore: asyncio.Semaphore, options: Optional[dict] = None):
+    options = options or {}
+
+    def recorder_for(url: str) -> ScannerOutputRecorder:
+        return ScannerOutputRecorder([scan_id for scan_id in target_members[url] if scan_id in scan_ids])
+
+    # Önbellekte geçerli sonucu olan hedefler tarayıcıya verilmez
+    pending = []
+    for url in target_members:
+        cached = None if options.get("force_fresh") else scan_cache.get(cache_key(scanner_name, url, scan_type, options))
+        if cached is None:
+            pending.append(url)
+            continue
+        recorder = recorder_for(url)
+        age = int(time.monotonic() - cached.stored_at)
+        await recorder.add_log(f"ÖNBELLEK: {scanner_name} sonucu önbellekten alındı ({age} sn önce tamamlanan tarama)")
+        await _record_scanner_events(recorder, cached.events, cached=True)
+        await recorder.flush()
+
+    if not pending:
+        return scanner_name, None, None
+
+    async with semaphore, scan_scheduler.scanner_slot(scanner_name, scan_type):
+        for url in pending:
+            recorder = recorder_for(url)
+            await recorder.add_log(f"TOPLU: {scanner_name} {len(pending)} hedefi tek çalıştırmada tarıyor")
+            await recorder.flush()
+
+        try:
+            scanner = get_scanner(scan_type, scanner_name)
+            results = await scanner.scan_batch(pending, _scanner_options(scanner_name, options) or None)
+        except Exception as e:
+            logger.error(f"{scanner_name} toplu taraması başarısız: {e}")
+            for url in pending:
+                recorder = recorder_for(url)
+                await recorder.add_log(f"HATA: {scanner_name} tarayıcısı başarısız: {str(e)}")
+                await recorder.flush()
+            return scanner_name, None, e
+
+        for url, result in results.items():
+            events = [ScanEvent(type="log", scanner_name=result.scanner_name, message=message)
+                      for message in result.scan_logs]
+            events += [ScanEvent(type="vulnerability", scanner_name=result.scanner_name, vulnerability=vuln)
+                       for vuln in result.vulnerabilities]
+
+            recorder = recorder_for(url)
+            await _record_scanner_events(recorder, events)
+            await _store_in_cache(recorder, cache_key(scanner_name, url, scan_type, options), scanner_name, events, result)
+            await recorder.flush()
+
+    return scanner_name, None, None
+
+
+# İptal isteklerini izle - iptal istenen her tarama için on_cancel beklenir
+async def _watch_scan_cancellation(scan_ids: List[str], on_cancel):
+    while True:
+        await asyncio.sleep(SCAN_CANCEL_POLL_INTERVAL)
+        for scan_id in await scan_store.run(scan_store.cancel_requested_ids, list(scan_ids)):
+            logger.info(f"Tarama {scan_id} için iptal isteği alındı")
+            await on_cancel(scan_id)
+
+
+# Hedeflerdeki sayfaları, formları ve parametreleri keşfet - her URL bir kez taranır, envanter tarayıcılarca paylaşılır
+async def _discover_endpoints(targets: Dict[str, str], scan_type: str, scanner_names: List[str],
+                              options: dict) -> Dict[str, EndpointInventory]:
+    if not options.get("crawl", SCAN_TYPE_CRAWL.get(scan_type, False)):
+        return {}
+    if not any(scanner_name in INVENTORY_SCANNERS for scanner_name in scanner_names):
+        return {}
+
+    urls = list(dict.fromkeys(targets.values()))
+    results = await asyncio.gather(*(Crawler().crawl(url) for url in urls), return_exceptions=True)
+
+    inventories = {}
+    for url, inventory in zip(urls, results):
+        if isinstance(inventory, Exception):
+            logger.warning(f"Keşif başarısız ({url}): {inventory}")
+            continue
+        inventories[url] = inventory
+
+    for scan_id, url in targets.items():
+        recorder = ScannerOutputRecorder([scan_id])
+        if url in inventories:
+            await recorder.add_log(f"KEŞİF: {inventories[url].summary()} bulundu")
+        else:
+            await recorder.add_log("KEŞİF: başarısız, yalnızca hedef URL taranacak")
+        await recorder.flush()
+
+    return inventories
+
+
+# Hedefleri hosta göre grupla - toplu taramada host düzeyindeki tarayıcılar her grup için bir kez çalışır
+def _group_by_host(targets: Dict[str, str]) -> Dict[str, List[str]]:
+    groups: Dict[str, List[str]] = {}
+    for scan_id, url in targets.items():
+        groups.setdefault(urlparse(url).hostname or url, []).append(scan_id)
+    return groups
+
+
+# Host düzeyindeki tarayıcıların çalışacağı adres: tek hedefte hedefin kendisi, grupta hostun kökü
+def _host_scan_url(urls: List[str]) -> str:
+    if len(urls) == 1:
+        return urls[0]
+
+    parsed = urlparse(urls[0])
+    return f"{parsed.scheme}://{parsed.netloc}/"
+
+
+# Arka planda güvenlik taraması başlat
+async def run_scan(scan_id: str, url: str, scan_type: str, scanner_names: List[str], options: Optional[dict] = None):
+    await run_scan_group(scan_id, [{"scan_id": scan_id, "url": url}], scan_type, scanner_names, options)
+
+
+# Aynı hostu (veya toplu nmap taramasında birden çok hostu) hedefleyen taramaları birlikte çalıştır
+# Host düzeyindeki tarayıcılar (nmap, nikto, shodan) her host için bir kez çalışır ve bulguları o hostun taramalarına
+# yazılır; birden çok host varsa nmap tüm hostları tek süreçte tarar. URL düzeyindeki tarayıcılar her hedef için ayrı,
+# nuclei ise birden çok hedef varsa tüm hedefler için tek süreçte çalışır
+async def run_scan_group(group_id: str, targets: List[Dict[str, str]], scan_type: str, scanner_names: List[str],
+                         options: Optional[dict] = None):
+    options = options or {}
+
+    # Kuyrukta beklerken iptal edilen taramalar hiç başlatılmaz
+    cancelled = set(await scan_store.run(scan_store.cancel_requested_ids, [target["scan_id"] for target in targets]))
+    active = {target["scan_id"]: target["url"] for target in targets if target["scan_id"] not in cancelled}
+    if not active:
+        logger.info(f"Tarama {group_id} başlamadan iptal edildi")
+        return
+
+    task_members: Dict[asyncio.Task, List[str]] = {}
+    group_task = asyncio.current_task()
+    waiting_for_slot = True
+    status_writes: List[asyncio.Task] = []
+
+    async def cancel_member(scan_id: str):
+        # Taramanın kendi görevleri iptal edilir, paylaşılan görevler diğer taramalar için sürer
+        if active.pop(scan_id, None) is None:
+            return
+
+        for task, members in task_members.items():
+            if scan_id in members:
+                members.remove(scan_id)
+                if not members:
+                    task.cancel()
+
+        # Sıra beklerken tüm taramaları iptal edilen grup beklemeyi bırakır
+        if not active and waiting_for_slot:
+            group_task.cancel()
+
+        # Durum ayrı bir görevde yazılır: grup biterken izleyici iptal edilse de yazım yarıda kalmaz
+        status_write = asyncio.create_task(
+            _set_scan_status(scan_id, "cancelled", message="Tarama kullanıcı tarafından iptal edildi")
+        )
+        status_writes.append(status_write)
+        await asyncio.shield(status_write)
+
+    for scan_id in active:
+        scan_cancel_handlers[scan_id] = cancel_member
+    cancel_watcher = asyncio.create_task(_watch_scan_cancellation(list(active), cancel_member))
+    try:
+        # Genel eşzamanlı tarama sınırı - sıra gelene kadar taramalar "queued" durumunda bekler
+        await scan_scheduler.acquire(group_id, scan_type, list(active))
+        waiting_for_slot = False
+
+        # Sıra beklerken iptal edilen taramalar başlatılmaz
+        for scan_id in await scan_store.run(scan_store.cancel_requested_ids, list(active)):
+            active.pop(scan_id, None)
+
+        for scan_id, url in list(active.items()):
+            await scan_store.run(scan_store.begin_scan, scan_id, url, scan_type, scanner_names, group_id)
+            scan_events.publish(scan_id, "status", {"status": "running", "progress": 0})
+
+        # Yürütme modu ve eşzamanlılık sınırı (istek seçenekleri ortam ayarlarını ezer)
+        execution_mode = options.get("execution_mode", SCAN_EXECUTION_MODE)
+        max_concurrency = int(options.get("max_concurrency", SCAN_MAX_CONCURRENCY))
+        if execution_mode == "sequential":
+            max_concurrency = 1
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        inventories = await _discover_endpoints(active, scan_type, scanner_names, options)
+
+        host_members = {
+            _host_scan_url([active[scan_id] for scan_id in scan_ids]): scan_ids
+            for scan_ids in _group_by_host(active).values()
         }
+        for scanner_name in scanner_names:
+            if scanner_name == "nmap" and len(host_members) > 1:
+                members = list(active)
+                task = asyncio.create_task(
+                    _run_batched_scanner(members, host_members, scan_type, scanner_name, semaphore, options)
+                )
+                task_members[task] = members
+            elif scanner_name == "nuclei" and len(active) > 1 and options.get("nuclei_batch", SCAN_NUCLEI_BATCH):
+                members = list(active)
+                url_members: Dict[str, List[str]] = {}
+                for scan_id, url in active.items():
+                    url_members.setdefault(url, []).append(scan_id)
+                task = asyncio.create_task(
+                    _run_batched_scanner(members, url_members, scan_type, scanner_name, semaphore, options)
+                )
+                task_members[task] = members
+            elif scanner_name in HOST_LEVEL_SCANNERS:
+                for host_url, scan_ids in host_members.items():
+                    members = list(scan_ids)
+                    task = asyncio.create_task(
+                        _run_single_scanner(members, scan_type, scanner_name, host_url, semaphore, options)
+                    )
+                    task_members[task] = members
+            else:
+                for scan_id, url in active.items():
+                    members = [scan_id]
+                    task = asyncio.create_task(
+                        _run_single_scanner(members, scan_type, scanner_name, url, semaphore, options,
+                                            inventories.get(url) if scanner_name in INVENTORY_SCANNERS else None)
+                    )
+                    task_members[task] = members
 
-        active_scans[scan_id] = {"status": "completed", "progress": 100}
+        total_scanners = len(scanner_names)
+        remaining = {scan_id: total_scanners for scan_id in active}
+
+        # Tarayıcılar bittikçe ilgili taramaların ilerlemesini güncelle
+        pending = set(task_members)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                for scan_id in task_members[task]:
+                    remaining[scan_id] -= 1
+                    if remaining[scan_id] == 0:
+                        active.pop(scan_id, None)
+                        await _set_scan_status(scan_id, "completed", progress=100)
+                    else:
+                        progress = int((total_scanners - remaining[scan_id]) / total_scanners * 100)
+                        await _set_scan_status(scan_id, "running", progress=progress)
+
+        # Tarayıcısı olmayan taramalar da tamamlanmış sayılır
+        for scan_id in list(active):
+            active.pop(scan_id)
+            await _set_scan_status(scan_id, "completed", progress=100)
+
+    except asyncio.CancelledError:
+        waiting_for_slot = False
+        # Tarayıcı görevleri iptal edilir; alt süreçler ve uzak taramalar kendi temizliklerini yapar
+        for task in task_members:
+            task.cancel()
+        await asyncio.gather(*task_members, return_exceptions=True)
+
+        # İptal kullanıcıdan gelmediyse (ör. uygulama kapanıyor) iptal yukarı iletilir; tüm taramaları iptal edilmiş
+        # grubun yapacak işi kalmamıştır
+        cancelled = await scan_store.run(scan_store.cancel_requested_ids, list(active))
+        if active and not cancelled:
+            raise
+
+        asyncio.current_task().uncancel()
+        for scan_id in cancelled:
+            logger.info(f"Tarama {scan_id} iptal edildi")
+            await cancel_member(scan_id)
+        for scan_id in list(active):
+            await _set_scan_status(scan_id, "failed", progress=0, message="Tarama yarıda kesildi")
 
     except Exception as e:
-        logger.error(f"Tarama {scan_id} başarısız: {e}")
-        active_scans[scan_id] = {"status": "failed", "progress": 0, "error": str(e)}
+        logger.error(f"Tarama {group_id} başarısız: {e}")
+        for scan_id in list(active):
+            await _set_scan_status(scan_id, "failed", progress=0, message=str(e))
+
+    finally:
+        cancel_watcher.cancel()
+        await asyncio.gather(*status_writes, return_exceptions=True)
+        for target in targets:
+            if scan_cancel_handlers.get(target["scan_id"]) is cancel_member:
+                del scan_cancel_handlers[target["scan_id"]]
+        await scan_scheduler.release(group_id)
+
+
+# İstek seçeneklerine force_fresh bayrağını ekle - tarayıcılara seçeneklerle birlikte iletilir
+def _scan_options(request) -> dict:
+    options = dict(request.options or {})
+    if request.force_fresh:
+        options["force_fresh"] = True
+    return options
 
 
 # Ana endpoint
@@ -196,26 +637,30 @@ async def root():
 # Sağlık kontrolü
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": datetime.now()}
+    return {"status": "healthy", "timestamp": datetime.now(), "http_client": shared_http_client.stats(),
+            "processes": process_supervisor.stats()}
 
 
 # Tarama başlatma endpoint'i
 @app.post("/scan/start", response_model=dict)
-async def start_scan(request: ScanRequest, background_tasks: BackgroundTasks):
+async def start_scan(request: ScanRequest):
     """Yeni bir güvenlik taraması başlat"""
-    scan_id = f"scan_{int(datetime.now().timestamp())}"
+    # Rastgele kimlik - aynı anda gelen istekler çakışmaz
+    scan_id = f"scan_{uuid.uuid4().hex}"
 
     # Tarama türüne göre tarayıcıları belirle
-    scanner_mapping = {
-        "quick": ["nmap", "xss"],
-        "standard": ["nmap", "xss", "nuclei", "nikto"],
-        "full": ["nmap", "xss", "nuclei", "zap", "sqlmap", "nikto", "shodan"]
-    }
-
-    scanner_names = scanner_mapping.get(request.scan_type, ["nmap", "xss"])
-
-    # Arka planda taramayı başlat
-    background_tasks.add_task(run_scan, scan_id, request.url, request.scan_type, scanner_names)
+    scanner_names = SCAN_TYPE_SCANNERS.get(request.scan_type, SCAN_TYPE_SCANNERS["quick"])
+    await scan_store.run(scan_store.create_scan, scan_id, request.url, request.scan_type, scanner_names)
+    options = _scan_options(request)
+
+    # Broker tanımlıysa taramayı worker kuyruğuna ekle, değilse API sürecinde arka planda başlat
+    # (yerel modda Celery görevi çalışmaz: onay ve başarısız taramanın yeniden denenmesi yoktur)
+    if USE_LOCAL_QUEUE:
+        scan_task = asyncio.create_task(run_scan(scan_id, request.url, request.scan_type, scanner_names, options))
+        running_scan_tasks[scan_id] = scan_task
+        scan_task.add_done_callback(lambda _: running_scan_tasks.pop(scan_id, None))
+    else:
+        enqueue_scan(scan_id, request.url, request.scan_type, scanner_names, options)
 
     return {
         "scan_id": scan_id,
@@ -224,31 +669,226 @@ async def start_scan(request: ScanRequest, background_tasks: BackgroundTasks):
     }
 
 
+# Toplu tarama başlatma endpoint'i
+@app.post("/scan/batch", response_model=dict)
+async def start_batch_scan(request: BatchScanRequest):
+    """Birden çok hedefi tara - hedefler hosta göre gruplanır, host düzeyindeki tarayıcılar her host için bir kez çalışır"""
+    # Aynı URL birden fazla verilirse tek tarama açılır
+    urls = list(dict.fromkeys(url.strip() for url in request.targets if url.strip()))
+    if not urls:
+        raise HTTPException(status_code=400, detail="En az bir hedef belirtilmeli")
+
+    batch_id = f"batch_{uuid.uuid4().hex}"
+    options = _scan_options(request)
+    scanner_names = SCAN_TYPE_SCANNERS.get(request.scan_type, SCAN_TYPE_SCANNERS["quick"])
+
+    groups: Dict[str, List[Dict[str, str]]] = {}
+    for index, url in enumerate(urls):
+        host = urlparse(url).hostname or url
+        groups.setdefault(host, []).append({"scan_id": f"{batch_id}_{index}", "url": url})
+
+    # Her host grubu ayrı bir iş olarak kuyruğa girer; gruplar farklı worker'larda çalışabilir
+    # Toplu nmap açıksa host grupları SCANNER_NMAP_BATCH_SIZE'lık işlerde birleşir, her iş için tek nmap süreci çalışır
+    jobs = [(f"{batch_id}_{host}", targets) for host, targets in groups.items()]
+    if "nmap" in scanner_names and len(groups) > 1 and options.get("nmap_batch", SCAN_NMAP_BATCH):
+        hosts = list(groups.items())
+        jobs = [
+            (f"{batch_id}_hosts{start}", [target for _, targets in hosts[start:start + SCANNER_NMAP_BATCH_SIZE] for target in targets])
+            for start in range(0, len(hosts), SCANNER_NMAP_BATCH_SIZE)
+        ]
+
+    # Kayıtlar çalışacakları gruba (kuyruk görevine) bağlanır - iptalde görev kimliği buradan bulunur
+    await scan_store.run(
+        scan_store.create_scans,
+        [{**target, "group_id": group_id} for group_id, targets in jobs for target in targets],
+        request.scan_type, scanner_names
+    )
+
+    for group_id, targets in jobs:
+        if USE_LOCAL_QUEUE:
+            group_task = asyncio.create_task(
+                run_scan_group(group_id, targets, request.scan_type, scanner_names, options)
+            )
+            running_scan_tasks[group_id] = group_task
+            group_task.add_done_callback(lambda _, group_id=group_id: running_scan_tasks.pop(group_id, None))
+        else:
+            enqueue_scan_group(group_id, targets, request.scan_type, scanner_names, options)
+
+    return {
+        "batch_id": batch_id,
+        "message": f"{len(urls)} hedef ({len(groups)} host) için toplu tarama başlatıldı",
+        "scanners": scanner_names,
+        "hosts": {host: [target["scan_id"] for target in targets] for host, targets in groups.items()},
+        "scans": [target for targets in groups.values() for target in targets]
+    }
+
+
 # Tarama durumu sorgulama
 @app.get("/scan/status/{scan_id}", response_model=ScanStatus)
 async def get_scan_status(scan_id: str):
-    if scan_id not in active_scans:
+    scan_info = await scan_store.run(scan_store.get_status, scan_id)
+    if scan_info is None:
         raise HTTPException(status_code=404, detail="Tarama bulunamadı")
 
-    scan_info = active_scans[scan_id]
+    default_message = "Tarama kuyrukta bekliyor" if scan_info["status"] == "queued" else "Tarama devam ediyor"
+
+    # Sıra ve tahmini bekleme ortak kuyruktan hesaplanır (tarama hangi süreçte beklerse beklesin)
+    queue_info = {}
+    if scan_info["status"] == "queued":
+        queue_info = await scan_store.run(scan_scheduler.queue_info, scan_id) or {}
+    if queue_info:
+        default_message = f"Tarama kuyrukta bekliyor (sıra: {queue_info['queue_position']})"
+
     return ScanStatus(
         scan_id=scan_id,
         status=scan_info["status"],
         progress=scan_info.get("progress", 0),
-        message=scan_info.get("error", "Tarama devam ediyor")
+        message=scan_info.get("error", default_message),
+        **queue_info
     )
 
 
 # Tarama sonuçlarını getir
 @app.get("/scan/results/{scan_id}", response_model=ScanResultResponse)
 async def get_scan_results(scan_id: str):
-    if scan_id not in scan_results:
+    result = await scan_store.run(scan_store.get_result, scan_id)
+    if result is None:
         raise HTTPException(status_code=404, detail="Tarama sonucu bulunamadı")
 
-    result = scan_results[scan_id]
     return ScanResultResponse(**result)
 
 
+# Taramayı iptal et
+@app.post("/scan/cancel/{scan_id}")
+async def cancel_scan(scan_id: str):
+    """Kuyrukta bekleyen veya çalışan taramayı iptal et"""
+    scan_info = await scan_store.run(scan_store.get_status, scan_id)
+    if scan_info is None:
+        raise HTTPException(status_code=404, detail="Tarama bulunamadı")
+
+    if scan_info["status"] in TERMINAL_SCAN_STATUSES:
+        return {"scan_id": scan_id, "status": scan_info["status"], "message": "Tarama zaten sonlanmış"}
+
+    # Bayrak veritabanına yazılır; taramayı başka bir worker çalıştırıyorsa oradaki izleyici bunu görür
+    await scan_store.run(scan_store.request_cancel, scan_id)
+
+    # Tarama bu süreçte çalışıyorsa (yerel kuyruk) kendi görevleri hemen iptal edilir
+    cancel_handler = scan_cancel_handlers.get(scan_id)
+    if cancel_handler is not None:
+        await cancel_handler(scan_id)
+        return {"scan_id": scan_id, "status": "cancelled", "message": "Tarama iptal edildi"}
+
+    if not USE_LOCAL_QUEUE:
+        # Henüz worker'a ulaşmamış grup görevi, gruptaki tüm taramalar iptal edildiyse kuyruktan düşürülür
+        group_id = await scan_store.run(scan_store.revocable_group, scan_id)
+        if group_id is not None:
+            celery_app.control.revoke(group_id)
+
+    if scan_info["status"] == "queued":
+        await _set_scan_status(scan_id, "cancelled", message="Tarama kullanıcı tarafından iptal edildi")
+        return {"scan_id": scan_id, "status": "cancelled", "message": "Tarama iptal edildi"}
+
+    return {"scan_id": scan_id, "status": "cancelling", "message": "Tarama iptal ediliyor"}
+
+
+# Taramanın canlı olaylarını üret - None değeri bağlantıyı canlı tutma (heartbeat) sinyalidir
+async def _scan_event_stream(scan_id: str):
+    # Abonelik anlık durum okunmadan önce açılır, böylece aradaki olaylar kaçırılmaz
+    subscription = scan_events.subscribe(scan_id)
+    try:
+        scan_info = await scan_store.run(scan_store.get_status, scan_id)
+        if scan_info is None:
+            return
+
+        yield {"type": "status", "scan_id": scan_id, **scan_info}
+        if scan_info["status"] in TERMINAL_SCAN_STATUSES:
+            return
+        last_state = (scan_info["status"], scan_info.get("progress", 0))
+
+        while True:
+            event = await subscription.get(timeout=SCAN_STREAM_POLL_INTERVAL)
+
+            if event is None:
+                # Olay gelmedi: tarama başka bir süreçte (worker) çalışıyor olabilir, veritabanını kontrol et
+                scan_info = await scan_store.run(scan_store.get_status, scan_id)
+                if scan_info is None:
+                    return
+
+                state = (scan_info["status"], scan_info.get("progress", 0))
+                if state != last_state:
+                    last_state = state
+                    yield {"type": "status", "scan_id": scan_id, **scan_info}
+                    if scan_info["status"] in TERMINAL_SCAN_STATUSES:
+                        return
+                else:
+                    yield None
+                continue
+
+            if event["type"] == "progress":
+                last_state = (last_state[0], event["progress"])
+            elif event["type"] == "status":
+                last_state = (event["status"], event.get("progress", 0))
+
+            yield event
+            if event["type"] == "status" and event["status"] in TERMINAL_SCAN_STATUSES:
+                return
+    finally:
+        scan_events.unsubscribe(subscription)
+
+
+# Tarama ilerlemesini, loglarını ve yeni bulguları Server-Sent Events ile akıt
+@app.get("/scan/stream/{scan_id}")
+async def stream_scan_events(scan_id: str, request: Request):
+    if await scan_store.run(scan_store.get_status, scan_id) is None:
+        raise HTTPException(status_code=404, detail="Tarama bulunamadı")
+
+    async def event_source():
+        async for event in _scan_event_stream(scan_id):
+            if await request.is_disconnected():
+                break
+            if event is None:
+                yield ": ping\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(jsonable_encoder(event))}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# Aynı olay akışının WebSocket karşılığı
+@app.websocket("/scan/ws/{scan_id}")
+async def scan_events_websocket(websocket: WebSocket, scan_id: str):
+    await websocket.accept()
+    if await scan_store.run(scan_store.get_status, scan_id) is None:
+        await websocket.close(code=4404, reason="Tarama bulunamadı")
+        return
+
+    try:
+        async for event in _scan_event_stream(scan_id):
+            await websocket.send_json(jsonable_encoder(event or {"type": "ping", "scan_id": scan_id}))
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
+# Taramaları hedefe ve duruma göre listele
+@app.get("/scan/list")
+async def list_scans(target: Optional[str] = None, status: Optional[str] = None, limit: int = 50):
+    return {"scans": await scan_store.run(scan_store.find_scans, target=target, status=status, limit=min(limit, 500))}
+
+
+# Güvenlik açıklarını tarama, severity ve hedefe göre listele
+@app.get("/vulnerabilities", response_model=List[VulnerabilityResponse])
+async def list_vulnerabilities(scan_id: Optional[str] = None, severity: Optional[str] = None,
+                               target: Optional[str] = None, limit: int = 200):
+    return await scan_store.run(
+        scan_store.find_vulnerabilities, scan_id=scan_id, severity=severity, target=target, limit=min(limit, 1000)
+    )
+
+
 # Desteklenen tarayıcıları listele
 @app.get("/scanners")
 async def list_scanners():
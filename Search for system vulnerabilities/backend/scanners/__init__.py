@@ -2,7 +2,9 @@
 Premium Web Security Scanner - Tarama Motorları
 """
 
-from .base_scanner import BaseScanner
+from .base_scanner import BaseScanner, ScanEvent
+from .http_client import ScannerHTTPClient, shared_http_client
+from .crawler import Crawler, EndpointInventory
 from .xss_scanner import XSSScanner
 from .nmap_scanner import NmapScanner
 from .nuclei_scanner import NucleiScanner
@@ -13,6 +15,11 @@ from .shodan_scanner import ShodanScanner
 
 __all__ = [
     "BaseScanner",
+    "ScanEvent",
+    "ScannerHTTPClient",
+    "shared_http_client",
+    "Crawler",
+    "EndpointInventory",
     "XSSScanner", 
     "NmapScanner",
     "NucleiScanner",
@@ -1,10 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 from dataclasses import dataclass
 from datetime import datetime
+from contextlib import asynccontextmanager
 import asyncio
 import logging
 
+from .http_client import ScannerHTTPClient, shared_http_client
+from .process_supervisor import process_supervisor
+
 @dataclass
 class Vulnerability:
     """Güvenlik açığı veri yapısı"""
@@ -41,20 +45,87 @@ class ScanResult:
         if self.scan_logs is None:
             self.scan_logs = []
 
+@dataclass
+class ScanEvent:
+    """Tarama sırasında üretilen olay - vulnerability, log veya result"""
+    type: str
+    scanner_name: str
+    vulnerability: Optional[Vulnerability] = None
+    message: Optional[str] = None
+    result: Optional[ScanResult] = None
+
 class BaseScanner(ABC):
     """Temel tarayıcı sınıfı - tüm tarayıcılar bu sınıftan türetilir"""
     
-    def __init__(self, name: str, config: Dict[str, Any] = None):
+    def __init__(self, name: str, config: Dict[str, Any] = None, http_client: Optional[ScannerHTTPClient] = None):
         self.name = name
         self.config = config or {}
+        # HTTP istekleri için ortak bağlantı havuzu - verilmezse süreç genelindeki istemci kullanılır
+        self.http = http_client or shared_http_client
         self.logger = logging.getLogger(f"scanner.{name}")
         self.is_running = False
+        self._event_queue: Optional[asyncio.Queue] = None
         
     @abstractmethod
     async def scan(self, target_url: str, options: Dict[str, Any] = None) -> ScanResult:
         """Ana tarama metodu - alt sınıflar tarafından implement edilmeli"""
         pass
     
+    async def scan_stream(self, target_url: str, options: Dict[str, Any] = None) -> AsyncIterator[ScanEvent]:
+        """Taramayı çalıştırır; güvenlik açıklarını ve logları bulundukları anda olay olarak üretir.
+        Son olay her zaman ScanResult içeren 'result' olayıdır."""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._event_queue = queue
+        
+        scan_task = asyncio.create_task(self.scan(target_url, options))
+        # Tarama bittiğinde akışı sonlandırmak için işaret (sentinel) gönder
+        scan_task.add_done_callback(lambda _: queue.put_nowait(None))
+        
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield event
+            
+            result = await scan_task
+            yield ScanEvent(type="result", scanner_name=self.name, result=result)
+        
+        finally:
+            self._event_queue = None
+            # Tüketici akışı erken bırakırsa (iptal, hata) tarama da durdurulur
+            if not scan_task.done():
+                scan_task.cancel()
+                try:
+                    await scan_task
+                except (asyncio.CancelledError, Exception):
+                    pass
+    
+    @asynccontextmanager
+    async def spawn_process(self, args: List[str], tool: Optional[str] = None, results: Optional[List["ScanResult"]] = None,
+                            timeout: Optional[float] = None, **kwargs):
+        """Harici aracı süreç denetleyicisi üzerinden kendi süreç grubunda başlatır. Eşzamanlılık ve kaynak sınırları
+        uygulanır; timeout (verilmezse config["timeout"]) dolarsa ya da blok iptal veya hata ile terk edilirse araç ve
+        başlattığı tüm alt süreçler sonlandırılır. Sürecin kaynak kullanımı results'taki taramaların loguna yazılır."""
+        if timeout is None:
+            timeout = self.config.get("timeout")
+        
+        process = None
+        try:
+            async with process_supervisor.spawn(args, tool=tool, timeout=timeout, **kwargs) as process:
+                yield process
+        finally:
+            if process is not None:
+                usage = process.usage
+                for result in results or ():
+                    self.add_scan_log(result, f"Süreç kaynak kullanımı: {usage.summary()}",
+                                      "warning" if usage.timed_out or usage.truncated else "info")
+    
+    def _emit_event(self, event: ScanEvent):
+        """Akış dinleniyorsa olayı kuyruğa ekler"""
+        if self._event_queue is not None:
+            self._event_queue.put_nowait(event)
+    
     @abstractmethod
     async def validate_target(self, target_url: str) -> bool:
         """Hedef URL'nin geçerli olup olmadığını kontrol eder"""
@@ -81,12 +152,14 @@ class BaseScanner(ABC):
         vuln.scanner_name = self.name
         result.vulnerabilities.append(vuln)
         self.logger.info(f"Vulnerability found: {vuln.title} ({vuln.severity})")
+        self._emit_event(ScanEvent(type="vulnerability", scanner_name=self.name, vulnerability=vuln))
     
     def add_scan_log(self, result: ScanResult, message: str, level: str = "info"):
         """Tarama logu ekler"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_entry = f"[{timestamp}] [{level.upper()}] {message}"
         result.scan_logs.append(log_entry)
+        self._emit_event(ScanEvent(type="log", scanner_name=self.name, message=log_entry))
         
         if level == "error":
             self.logger.error(message)
@@ -0,0 +1,354 @@
+"""
+Asenkron web tarayıcısı (crawler)
+Hedef sitede sayfaları, formları ve parametreleri bir kez keşfeder; çıkan envanteri tüm tarayıcılar kullanır
+"""
+
+import os
+import re
+import time
+import asyncio
+import hashlib
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+
+from .http_client import ScannerHTTPClient, shared_http_client
+from .html_analysis import get_html_parser
+
+
+# Keşif bütçeleri: bağlantı derinliği, indirilecek en fazla sayfa ve toplam süre (saniye)
+SCANNER_CRAWL_MAX_DEPTH = int(os.getenv("SCANNER_CRAWL_MAX_DEPTH", "2"))
+SCANNER_CRAWL_MAX_PAGES = int(os.getenv("SCANNER_CRAWL_MAX_PAGES", "50"))
+SCANNER_CRAWL_MAX_SECONDS = float(os.getenv("SCANNER_CRAWL_MAX_SECONDS", "60"))
+# Aynı anda indirilen sayfa sayısı
+SCANNER_CRAWL_CONCURRENCY = int(os.getenv("SCANNER_CRAWL_CONCURRENCY", "5"))
+# Sayfa başına okunan en fazla bayt - daha büyük sayfaların yalnızca başı ayrıştırılır
+SCANNER_CRAWL_MAX_PAGE_BYTES = int(os.getenv("SCANNER_CRAWL_MAX_PAGE_BYTES", str(2 * 1024 * 1024)))
+# robots.txt kurallarına uyulsun mu - güvenlik taramasında yasaklı yollar da test edilir, varsayılan kapalı
+SCANNER_CRAWL_RESPECT_ROBOTS = os.getenv("SCANNER_CRAWL_RESPECT_ROBOTS", "false").lower() in ("1", "true", "yes")
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Sayfa olmayan, indirilmeyen dosya uzantıları
+STATIC_EXTENSIONS = (
+    ".css", ".js", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico", ".webp", ".bmp",
+    ".woff", ".woff2", ".ttf", ".eot", ".pdf", ".zip", ".gz", ".tar", ".rar", ".7z",
+    ".mp3", ".mp4", ".avi", ".mov", ".webm", ".exe", ".dmg", ".iso"
+)
+
+# Sayfa adresi olmayan bağlantılar
+NON_PAGE_SCHEMES = ("javascript:", "mailto:", "tel:", "data:")
+
+# İç içe sitemap dosyalarından en fazla kaçının okunacağı
+MAX_SITEMAPS = 5
+SITEMAP_LOC_PATTERN = re.compile(r"<loc>\s*([^<\s]+)\s*</loc>", re.IGNORECASE)
+
+logger = logging.getLogger("scanner.crawler")
+
+
+def normalize_url(url: str, base: Optional[str] = None) -> Optional[str]:
+    """URL'yi tek biçime getirir (mutlak adres, küçük harf host, varsayılan port ve fragment yok, sıralı sorgu)
+    http/https dışındaki adresler için None döner"""
+    if base is not None:
+        url = urljoin(base, url.strip())
+
+    parsed = urlsplit(url.strip())
+    scheme = (parsed.scheme or "http").lower()
+    if scheme not in DEFAULT_PORTS:
+        return None
+
+    host = (parsed.hostname or "").lower()
+    try:
+        port = parsed.port
+    except ValueError:
+        return None
+
+    netloc = host
+    if port and port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{port}"
+
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, parsed.path or "/", query, ""))
+
+
+def url_origin(url: str) -> str:
+    """Normalize URL'nin kaynağı (scheme://host:port)"""
+    parsed = urlsplit(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def url_endpoint(url: str) -> str:
+    """Sorgu dizesi olmadan adres - aynı uç noktanın farklı parametre değerleri tek kayıtta toplanır"""
+    parsed = urlsplit(url)
+    return urlunsplit((parsed.scheme, parsed.netloc, parsed.path, "", ""))
+
+
+class VisitedIndex:
+    """Görülen URL'lerin kümesi - bellek için URL yerine 16 baytlık özet tutulur"""
+
+    def __init__(self):
+        self._digests: Set[bytes] = set()
+
+    @staticmethod
+    def _digest(url: str) -> bytes:
+        return hashlib.blake2b(url.encode("utf-8", "replace"), digest_size=16).digest()
+
+    def add(self, url: str) -> bool:
+        """URL daha önce görülmediyse ekler ve True döner"""
+        digest = self._digest(url)
+        if digest in self._digests:
+            return False
+        self._digests.add(digest)
+        return True
+
+    def __contains__(self, url: str) -> bool:
+        return self._digest(url) in self._digests
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+
+class CrawlFrontier:
+    """Ziyaret edilecek URL kuyruğu (genişlik öncelikli) - her URL normalize edilip bir kez eklenir"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.visited = VisitedIndex()
+        self._queue: Deque[Tuple[str, int]] = deque()
+
+    def add(self, url: str, depth: int) -> bool:
+        if len(self._queue) >= self.max_size or not self.visited.add(url):
+            return False
+        self._queue.append((url, depth))
+        return True
+
+    def take(self, count: int) -> List[Tuple[str, int]]:
+        """Kuyruğun başından en fazla `count` URL alır"""
+        return [self._queue.popleft() for _ in range(min(count, len(self._queue)))]
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+
+@dataclass
+class DiscoveredForm:
+    """Keşfedilen form - action mutlak adrestir"""
+    page_url: str
+    action: str
+    method: str
+    fields: List[str]
+
+
+@dataclass
+class EndpointInventory:
+    """Keşif sonucu: sayfalar, formlar ve parametreli uç noktalar"""
+    seed_url: str
+    pages: List[str] = field(default_factory=list)
+    forms: List[DiscoveredForm] = field(default_factory=list)
+    parameters: Dict[str, List[str]] = field(default_factory=dict)  # uç nokta -> parametre adları
+    parameterized_urls: List[str] = field(default_factory=list)
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    def add_form(self, form: DiscoveredForm):
+        key = (form.action, form.method, tuple(form.fields))
+        if all((known.action, known.method, tuple(known.fields)) != key for known in self.forms):
+            self.forms.append(form)
+
+    def add_parameterized_url(self, url: str):
+        """Sorgu parametreli URL'yi kaydeder - aynı uç nokta ve parametre adları için tek örnek tutulur"""
+        names = [name for name, _ in parse_qsl(urlsplit(url).query, keep_blank_values=True)]
+        if not names:
+            return
+
+        endpoint = url_endpoint(url)
+        known = self.parameters.setdefault(endpoint, [])
+        new_names = [name for name in names if name not in known]
+        if new_names or not known:
+            known.extend(new_names)
+            self.parameterized_urls.append(url)
+
+    def summary(self) -> str:
+        return (f"{len(self.pages)} sayfa, {len(self.forms)} form, "
+                f"{sum(len(names) for names in self.parameters.values())} parametre")
+
+
+@dataclass
+class CrawlBudget:
+    """Keşif sınırları"""
+    max_depth: int = SCANNER_CRAWL_MAX_DEPTH
+    max_pages: int = SCANNER_CRAWL_MAX_PAGES
+    max_seconds: float = SCANNER_CRAWL_MAX_SECONDS
+    concurrency: int = SCANNER_CRAWL_CONCURRENCY
+    max_page_bytes: int = SCANNER_CRAWL_MAX_PAGE_BYTES
+
+
+class Crawler:
+    """Hedefin kaynağıyla (origin) sınırlı, bütçeli, genişlik öncelikli keşif"""
+
+    def __init__(self, budget: Optional[CrawlBudget] = None, http_client: Optional[ScannerHTTPClient] = None,
+                 respect_robots: bool = SCANNER_CRAWL_RESPECT_ROBOTS):
+        self.budget = budget or CrawlBudget()
+        self.http = http_client or shared_http_client
+        self.respect_robots = respect_robots
+        self.html_parser = get_html_parser()
+        self._robots: Optional[RobotFileParser] = None
+
+    async def crawl(self, seed_url: str) -> EndpointInventory:
+        """Hedefi keşfeder ve envanteri döndürür - bütçe dolduğunda eldeki sonuçla biter"""
+        started = time.monotonic()
+        deadline = started + self.budget.max_seconds
+
+        seed = normalize_url(seed_url)
+        inventory = EndpointInventory(seed_url=seed_url)
+        if seed is None:
+            return inventory
+
+        origin = url_origin(seed)
+        frontier = CrawlFrontier(max_size=max(self.budget.max_pages * 20, 100))
+        frontier.add(seed, 0)
+        inventory.add_parameterized_url(seed)
+
+        seeded = await self._seed_from_robots(origin, frontier, inventory, deadline)
+
+        fetched = 0
+        stop_reason = "completed"
+        while len(frontier):
+            if fetched >= self.budget.max_pages:
+                stop_reason = "max_pages"
+                break
+            if time.monotonic() >= deadline:
+                stop_reason = "max_seconds"
+                break
+
+            batch = frontier.take(min(self.budget.concurrency, self.budget.max_pages - fetched))
+            pages = await asyncio.gather(*(self._fetch_page(url, deadline) for url, _ in batch))
+            fetched += len(batch)
+
+            for (url, depth), page in zip(batch, pages):
+                if page is None:
+                    continue
+
+                final_url, status, analysis = page
+                if url_origin(final_url) != origin:
+                    continue  # Başka bir kaynağa yönlendirildi
+
+                if status == 200:
+                    inventory.pages.append(final_url)
+                if final_url != url:
+                    frontier.visited.add(final_url)
+                if analysis is None:
+                    continue
+
+                for form in analysis.forms:
+                    action = normalize_url(form.action or final_url, base=final_url)
+                    if action and url_origin(action) == origin:
+                        inventory.add_form(DiscoveredForm(final_url, action, form.method, form.fields))
+
+                for link in analysis.links:
+                    self._discover(link, final_url, depth + 1, origin, frontier, inventory)
+
+        inventory.stats = {
+            "pages_fetched": fetched,
+            "urls_seen": len(frontier.visited),
+            "robots_seeds": seeded,
+            "elapsed": round(time.monotonic() - started, 2),
+            "stop_reason": stop_reason
+        }
+        logger.info(f"Keşif tamamlandı ({seed_url}): {inventory.summary()}, durma nedeni: {stop_reason}")
+        return inventory
+
+    def _discover(self, link: str, base: str, depth: int, origin: str, frontier: CrawlFrontier,
+                  inventory: EndpointInventory) -> bool:
+        """Bağlantıyı kapsam kontrolünden geçirip kuyruğa ekler; parametreleri kaydeder"""
+        if not link or link.strip().lower().startswith(NON_PAGE_SCHEMES):
+            return False
+
+        url = normalize_url(link, base=base)
+        if url is None or url_origin(url) != origin:
+            return False
+        if urlsplit(url).path.lower().endswith(STATIC_EXTENSIONS):
+            return False
+
+        inventory.add_parameterized_url(url)
+        if depth > self.budget.max_depth:
+            return False
+        if self._robots is not None and not self._robots.can_fetch("*", url):
+            return False
+        return frontier.add(url, depth)
+
+    async def _fetch_page(self, url: str, deadline: float):
+        """Sayfayı indirir; HTML ise ayrıştırır. Dönen: (son URL, durum kodu, analiz veya None)"""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+
+        try:
+            async with self.http.get(url, timeout=aiohttp.ClientTimeout(total=remaining)) as response:
+                final_url = normalize_url(str(response.url)) or url
+                if "html" not in response.headers.get("Content-Type", "").lower():
+                    return final_url, response.status, None
+                body = await response.content.read(self.budget.max_page_bytes)
+                content = body.decode(response.charset or "utf-8", errors="replace")
+        except Exception as e:
+            logger.debug(f"Keşif isteği başarısız {url}: {e}")
+            return None
+
+        # Ayrıştırma olay döngüsünü bloklamasın diye ayrı thread'de yapılır
+        analysis = await asyncio.to_thread(self.html_parser.parse, content)
+        return final_url, response.status, analysis
+
+    async def _fetch_text(self, url: str, deadline: float) -> Optional[str]:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        try:
+            async with self.http.get(url, timeout=aiohttp.ClientTimeout(total=remaining)) as response:
+                if response.status != 200:
+                    return None
+                body = await response.content.read(self.budget.max_page_bytes)
+                return body.decode(response.charset or "utf-8", errors="replace")
+        except Exception as e:
+            logger.debug(f"Keşif isteği başarısız {url}: {e}")
+            return None
+
+    async def _seed_from_robots(self, origin: str, frontier: CrawlFrontier, inventory: EndpointInventory,
+                                deadline: float) -> int:
+        """robots.txt yollarını ve sitemap adreslerini kuyruğa ekler; eklenen URL sayısını döndürür"""
+        seeded = 0
+        robots = await self._fetch_text(f"{origin}/robots.txt", deadline)
+        sitemaps = [f"{origin}/sitemap.xml"]
+
+        if robots:
+            lines = robots.splitlines()
+            if self.respect_robots:
+                self._robots = RobotFileParser()
+                self._robots.parse(lines)
+
+            for line in lines:
+                directive, _, value = line.partition(":")
+                directive, value = directive.strip().lower(), value.split("#")[0].strip()
+                if directive == "sitemap" and value:
+                    sitemaps.append(value.strip())
+                elif directive in ("allow", "disallow") and value not in ("", "/") and "*" not in value:
+                    seeded += self._discover(value.rstrip("$"), origin + "/", 1, origin, frontier, inventory)
+
+        # Sitemap dizinleri (sitemapindex) iç içe sitemap dosyalarını listeler
+        read = 0
+        while sitemaps and read < MAX_SITEMAPS:
+            sitemap_url = normalize_url(sitemaps.pop(0))
+            if sitemap_url is None or url_origin(sitemap_url) != origin:
+                continue
+            content = await self._fetch_text(sitemap_url, deadline)
+            read += 1
+            for location in SITEMAP_LOC_PATTERN.findall(content or ""):
+                if location.lower().endswith(".xml"):
+                    sitemaps.append(location)
+                else:
+                    seeded += self._discover(location, sitemap_url, 1, origin, frontier, inventory)
+
+        return seeded
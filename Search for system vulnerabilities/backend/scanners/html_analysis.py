@@ -0,0 +1,140 @@
+"""
+HTML analiz motoru
+Sayfadaki formları, script içeriklerini ve event handler'ları seçicilerle çıkarır - ayrıştırıcı altyapısı değiştirilebilir
+"""
+
+import os
+import logging
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+
+# Varsayılan ayrıştırıcı altyapısı: "lxml" (C tabanlı, hızlı) veya "bs4" (saf Python html.parser)
+SCANNER_HTML_PARSER = os.getenv("SCANNER_HTML_PARSER", "lxml").lower()
+
+logger = logging.getLogger("scanner.html")
+
+
+@dataclass
+class PageForm:
+    """Sayfadaki form - test edilecek alan adlarıyla"""
+    action: str
+    method: str
+    fields: List[str]
+
+
+@dataclass
+class HTMLAnalysis:
+    """Ayrıştırılan sayfadan çıkarılan, tarayıcıların kullandığı yapılar"""
+    forms: List[PageForm] = field(default_factory=list)
+    scripts: List[str] = field(default_factory=list)
+    event_handlers: List[Tuple[str, str, str]] = field(default_factory=list)  # (tag, attribute, değer)
+    links: List[str] = field(default_factory=list)  # a/area href ve iframe/frame src değerleri
+
+
+class LxmlHTMLParser:
+    """lxml ayrıştırıcısı - XPath seçicileriyle çıkarım yapar"""
+
+    name = "lxml"
+
+    FORMS = "//form"
+    FORM_FIELDS = ".//input[@name] | .//textarea[@name] | .//select[@name]"
+    SCRIPTS = "//script"
+    EVENT_HANDLER_TAGS = "//*[@*[starts-with(name(), 'on')]]"
+    LINKS = "//a/@href | //area/@href | //iframe/@src | //frame/@src"
+
+    def __init__(self):
+        # Metin bayt olarak verilir; <?xml encoding=...?> bildirimli sayfalar da ayrıştırılabilir
+        self._parser = lxml.html.HTMLParser(encoding="utf-8")
+
+    def parse(self, content: str) -> HTMLAnalysis:
+        analysis = HTMLAnalysis()
+        if not content.strip():
+            return analysis
+
+        try:
+            root = lxml.html.document_fromstring(content.encode("utf-8", "replace"), parser=self._parser)
+        except Exception as e:
+            logger.debug(f"lxml ayrıştırma hatası: {e}")
+            return analysis
+
+        for form in root.xpath(self.FORMS):
+            fields = [element.get("name") for element in form.xpath(self.FORM_FIELDS) if element.get("name")]
+            analysis.forms.append(PageForm(
+                action=form.get("action", ""),
+                method=form.get("method", "get").lower(),
+                fields=fields
+            ))
+
+        analysis.scripts = [script.text for script in root.xpath(self.SCRIPTS) if script.text]
+
+        for element in root.xpath(self.EVENT_HANDLER_TAGS):
+            for attr, value in element.attrib.items():
+                if attr.startswith("on"):
+                    analysis.event_handlers.append((element.tag, attr, value))
+
+        analysis.links = [str(link) for link in root.xpath(self.LINKS)]
+
+        return analysis
+
+
+class BeautifulSoupHTMLParser:
+    """BeautifulSoup ayrıştırıcısı (html.parser) - lxml kurulu değilse kullanılır"""
+
+    name = "bs4"
+
+    def parse(self, content: str) -> HTMLAnalysis:
+        analysis = HTMLAnalysis()
+        soup = BeautifulSoup(content, "html.parser")
+
+        for form in soup.find_all("form"):
+            fields = [
+                input_field.get("name")
+                for input_field in form.find_all(["input", "textarea", "select"])
+                if input_field.get("name")
+            ]
+            analysis.forms.append(PageForm(
+                action=form.get("action", ""),
+                method=form.get("method", "get").lower(),
+                fields=fields
+            ))
+
+        analysis.scripts = [script.string for script in soup.find_all("script") if script.string]
+
+        for tag in soup.find_all(lambda tag: any(attr.startswith("on") for attr in tag.attrs)):
+            for attr in tag.attrs:
+                if attr.startswith("on"):
+                    analysis.event_handlers.append((tag.name, attr, tag[attr]))
+
+        for tag in soup.find_all(["a", "area", "iframe", "frame"]):
+            link = tag.get("src" if tag.name in ("iframe", "frame") else "href")
+            if link is not None:
+                analysis.links.append(link)
+
+        return analysis
+
+
+HTML_PARSERS = {
+    "lxml": LxmlHTMLParser,
+    "bs4": BeautifulSoupHTMLParser
+}
+
+
+def get_html_parser(name: str = SCANNER_HTML_PARSER):
+    """İstenen ayrıştırıcıyı döndürür; bilinmiyorsa lxml, lxml kurulu değilse BeautifulSoup kullanılır"""
+    name = (name or "lxml").lower()
+    if name not in HTML_PARSERS:
+        logger.warning(f"Bilinmeyen HTML ayrıştırıcı: {name}, lxml kullanılıyor")
+        name = "lxml"
+    if name == "lxml" and not LXML_AVAILABLE:
+        logger.warning("lxml kurulu değil, bs4 kullanılıyor")
+        name = "bs4"
+    return HTML_PARSERS[name]()
@@ -0,0 +1,173 @@
+"""
+Tarayıcılar için paylaşılan HTTP istemcisi
+Bağlantı havuzu, host başına bağlantı sınırı, DNS önbelleği, keep-alive ve bağlantı yeniden kullanım ölçümleri
+"""
+
+import os
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional
+
+import aiohttp
+
+
+# Havuz ayarları
+SCANNER_HTTP_POOL_SIZE = int(os.getenv("SCANNER_HTTP_POOL_SIZE", "100"))
+SCANNER_HTTP_POOL_PER_HOST = int(os.getenv("SCANNER_HTTP_POOL_PER_HOST", "10"))
+# Çözümlenen DNS kayıtlarının önbellekte tutulma süresi (saniye)
+SCANNER_HTTP_DNS_TTL = int(os.getenv("SCANNER_HTTP_DNS_TTL", "300"))
+# Boşta kalan bağlantının açık tutulma süresi (saniye)
+SCANNER_HTTP_KEEPALIVE = float(os.getenv("SCANNER_HTTP_KEEPALIVE", "30"))
+# İstek zaman aşımları (saniye)
+SCANNER_HTTP_TIMEOUT = float(os.getenv("SCANNER_HTTP_TIMEOUT", "30"))
+SCANNER_HTTP_CONNECT_TIMEOUT = float(os.getenv("SCANNER_HTTP_CONNECT_TIMEOUT", "10"))
+# Kendinden imzalı sertifika kullanan test ortamları için doğrulama kapatılabilir
+SCANNER_HTTP_VERIFY_SSL = os.getenv("SCANNER_HTTP_VERIFY_SSL", "true").lower() in ("1", "true", "yes")
+
+
+class HTTPClientMetrics:
+    """İstek, bağlantı açma/yeniden kullanma ve DNS önbelleği sayaçları"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.request_errors = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Sayaçların anlık görüntüsü"""
+        acquired = self.connections_created + self.connections_reused
+        return {
+            "requests": self.requests,
+            "request_errors": self.request_errors,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "connection_reuse_ratio": round(self.connections_reused / acquired, 3) if acquired else 0.0,
+            "dns_cache_hits": self.dns_cache_hits,
+            "dns_cache_misses": self.dns_cache_misses
+        }
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Sayaçları güncelleyen aiohttp izleme (trace) yapılandırması"""
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_request_exception.append(self._on_request_exception)
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(self._on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(self._on_dns_cache_miss)
+        return trace_config
+
+    async def _on_request_start(self, session, context, params):
+        self.requests += 1
+
+    async def _on_request_exception(self, session, context, params):
+        self.request_errors += 1
+
+    async def _on_connection_create_end(self, session, context, params):
+        self.connections_created += 1
+
+    async def _on_connection_reuseconn(self, session, context, params):
+        self.connections_reused += 1
+
+    async def _on_dns_cache_hit(self, session, context, params):
+        self.dns_cache_hits += 1
+
+    async def _on_dns_cache_miss(self, session, context, params):
+        self.dns_cache_misses += 1
+
+
+class ScannerHTTPClient:
+    """Tüm tarayıcıların ortak kullandığı havuzlu HTTP istemcisi
+
+    Oturum ilk istekte, çalışan olay döngüsüne bağlı olarak oluşturulur. Worker'da her görev ayrı
+    bir olay döngüsünde çalıştığı için döngü değiştiğinde yeni oturum açılır.
+    """
+
+    def __init__(self, pool_size: int = SCANNER_HTTP_POOL_SIZE, pool_per_host: int = SCANNER_HTTP_POOL_PER_HOST,
+                 dns_ttl: int = SCANNER_HTTP_DNS_TTL, keepalive: float = SCANNER_HTTP_KEEPALIVE,
+                 timeout: float = SCANNER_HTTP_TIMEOUT, connect_timeout: float = SCANNER_HTTP_CONNECT_TIMEOUT,
+                 verify_ssl: bool = SCANNER_HTTP_VERIFY_SSL,
+                 trace_configs: Optional[List[aiohttp.TraceConfig]] = None):
+        self.pool_size = pool_size
+        self.pool_per_host = pool_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive = keepalive
+        self.verify_ssl = verify_ssl
+        self.timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=connect_timeout)
+        self.metrics = HTTPClientMetrics()
+        # Ölçüm araçları (ör. benchmark'lar) için ek aiohttp izleme yapılandırmaları
+        self.trace_configs = list(trace_configs or [])
+        self.logger = logging.getLogger("scanner.http")
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Çalışan olay döngüsüne ait paylaşılan oturum"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = self._create_session()
+            self._loop = loop
+        return self._session
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            limit_per_host=self.pool_per_host,
+            ttl_dns_cache=self.dns_ttl,
+            use_dns_cache=True,
+            keepalive_timeout=self.keepalive,
+            ssl=None if self.verify_ssl else False
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            # Taramalar arasında çerez taşınmaması için çerezler saklanmaz
+            cookie_jar=aiohttp.DummyCookieJar(),
+            trace_configs=[self.metrics.trace_config(), *self.trace_configs]
+        )
+
+    def request(self, method: str, url: str, **kwargs):
+        """İstek gönderir - `async with client.request(...) as response` biçiminde kullanılır"""
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs):
+        return self.session.get(url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.session.post(url, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """Bağlantı havuzu ayarları ve kullanım sayaçları"""
+        return {
+            "pool_size": self.pool_size,
+            "pool_per_host": self.pool_per_host,
+            "dns_ttl": self.dns_ttl,
+            **self.metrics.snapshot()
+        }
+
+    def log_stats(self):
+        """Kullanım sayaçlarını loglar"""
+        stats = self.metrics.snapshot()
+        self.logger.info(
+            f"HTTP istemcisi: {stats['requests']} istek, {stats['connections_created']} yeni bağlantı, "
+            f"{stats['connections_reused']} yeniden kullanım (oran {stats['connection_reuse_ratio']}), "
+            f"DNS önbelleği {stats['dns_cache_hits']} isabet / {stats['dns_cache_misses']} ıska"
+        )
+
+    async def close(self):
+        """Oturumu ve havuzdaki bağlantıları kapatır"""
+        session, self._session = self._session, None
+        if session is not None and not session.closed and self._loop is asyncio.get_running_loop():
+            await session.close()
+        self._loop = None
+
+
+# Süreç genelinde paylaşılan HTTP istemcisi
+shared_http_client = ScannerHTTPClient()
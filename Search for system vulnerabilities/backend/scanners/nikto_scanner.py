@@ -11,12 +11,13 @@ from datetime import datetime
 import logging
 
 from .base_scanner import BaseScanner, ScanResult, Vulnerability
+from .http_client import ScannerHTTPClient
 
 class NiktoScanner(BaseScanner):
     """Nikto kullanarak web server güvenlik taraması yapan tarayıcı"""
     
-    def __init__(self, config: Dict[str, Any] = None):
-        super().__init__("Nikto Scanner", config)
+    def __init__(self, config: Dict[str, Any] = None, http_client: Optional[ScannerHTTPClient] = None):
+        super().__init__("Nikto Scanner", config, http_client)
         self.nikto_path = config.get("nikto_path", "nikto") if config else "nikto"
         
         # Nikto tarama seçenekleri
@@ -84,11 +85,8 @@ class NiktoScanner(BaseScanner):
             nikto_args = self._build_nikto_command(hostname, scan_type, options)
             self.add_scan_log(result, f"Nikto komutu: {' '.join(nikto_args)}")
             
-            # Nikto taramasını çalıştır
-            scan_output = await self._run_nikto_scan(nikto_args)
-            
-            # Sonuçları parse et
-            await self._parse_nikto_results(result, scan_output, hostname)
+            # Nikto taramasını çalıştır - çıktı satırları geldikçe işlenir
+            await self._run_nikto_scan(result, nikto_args, hostname)
             
             # Sonuçları sırala
             result.vulnerabilities = self.sort_vulnerabilities(result.vulnerabilities)
@@ -147,37 +145,31 @@ class NiktoScanner(BaseScanner):
         
         return base_args
     
-    async def _run_nikto_scan(self, nikto_args: List[str]) -> str:
-        """Nikto taramasını çalıştırır"""
+    async def _run_nikto_scan(self, result: ScanResult, nikto_args: List[str], hostname: str):
+        """Nikto taramasını çalıştırır ve çıktıyı satır satır işler"""
         try:
-            process = await asyncio.create_subprocess_exec(
-                *nikto_args,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
+            # Süreç iptal edildiğinde süreç grubu ile birlikte sonlandırılır
+            async with self.spawn_process(nikto_args, tool="nikto", results=[result]) as process:
+                # stderr ayrı okunur, aksi halde dolan pipe süreci bloklayabilir
+                stderr_task = asyncio.create_task(process.read_capped(process.stderr))
+                
+                try:
+                    async for raw_line in process.stdout:
+                        line = raw_line.decode(errors="replace").rstrip("\r\n")
+                        if line.strip():
+                            await self._process_nikto_line(result, line, hostname)
+                    
+                    stderr = await stderr_task
+                    await process.wait()
+                finally:
+                    stderr_task.cancel()
             
             if process.returncode != 0 and process.returncode != 1:  # Nikto başarısız taramalarda 1 döner
-                raise Exception(f"Nikto hatası: {stderr.decode()}")
-            
-            return stdout.decode()
+                raise Exception(f"Nikto hatası: {stderr.decode(errors='replace')}")
             
         except Exception as e:
             raise Exception(f"Nikto çalıştırma hatası: {e}")
     
-    async def _parse_nikto_results(self, result: ScanResult, scan_output: str, hostname: str):
-        """Nikto çıktısını parse eder ve güvenlik açıklarını tespit eder"""
-        try:
-            lines = scan_output.split('\n')
-            
-            for line in lines:
-                if line.strip():
-                    await self._process_nikto_line(result, line, hostname)
-                    
-        except Exception as e:
-            self.add_scan_log(result, f"Sonuç parse hatası: {e}", "error")
-    
     async def _process_nikto_line(self, result: ScanResult, line: str, hostname: str):
         """Tek bir Nikto satırını işler"""
         try:
@@ -3,22 +3,37 @@ Nmap Port ve Servis Tarayıcısı
 Port taraması ve servis tespiti
 """
 
+import os
 import asyncio
+import tempfile
 import subprocess
 import re
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Awaitable, Callable, Optional
 from datetime import datetime
 import logging
 
 from .base_scanner import BaseScanner, ScanResult, Vulnerability
+from .http_client import ScannerHTTPClient
+from .nmap_xml import NmapHost, NmapPort, NmapScript, NmapXMLStream
+
+# nmap'in stdout'a yazdığı XML çıktısından tek seferde okunup ayrıştırıcıya verilen en fazla bayt
+NMAP_XML_READ_CHUNK = 65536
+# NSE script çıktısının bulguya eklenen en fazla uzunluğu
+NMAP_SCRIPT_EVIDENCE_CHARS = 1000
+# Toplu taramada tek nmap sürecine (-iL) verilen en fazla host sayısı
+SCANNER_NMAP_BATCH_SIZE = int(os.getenv("SCANNER_NMAP_BATCH_SIZE", "64"))
+# Toplu taramada tek bir hosta ayrılan en fazla süre (nmap --host-timeout biçiminde, ör. 900s, 15m)
+SCANNER_NMAP_HOST_TIMEOUT = os.getenv("SCANNER_NMAP_HOST_TIMEOUT", "15m")
 
 class NmapScanner(BaseScanner):
     """Nmap kullanarak port ve servis taraması yapan tarayıcı"""
     
-    def __init__(self, config: Dict[str, Any] = None):
-        super().__init__("Nmap Scanner", config)
+    def __init__(self, config: Dict[str, Any] = None, http_client: Optional[ScannerHTTPClient] = None):
+        super().__init__("Nmap Scanner", config, http_client)
         self.nmap_path = config.get("nmap_path", "nmap") if config else "nmap"
+        self.batch_size = max(1, int(self.config.get("batch_size", SCANNER_NMAP_BATCH_SIZE)))
+        self.host_timeout = self.config.get("host_timeout", SCANNER_NMAP_HOST_TIMEOUT)
         
         # Port tarama seçenekleri
         self.scan_types = {
@@ -67,15 +82,17 @@ class NmapScanner(BaseScanner):
             hostname = self._extract_hostname(target_url)
             self.add_scan_log(result, f"Hedef hostname: {hostname}")
             
-            # Nmap komutunu oluştur
-            nmap_args = self._build_nmap_command(hostname, scan_type, options)
+            # Varsayılan çıktı stdout'a yazılan XML: hostlar nmap bitirdikçe ayrıştırılır, bulgular tarama sürerken akar
+            # options["output_xml"] False ise text çıktısı tarama bitince okunur
+            xml_output = options.get("output_xml", True)
+            nmap_args = self._build_nmap_command(hostname, scan_type, options, xml_output=xml_output)
             self.add_scan_log(result, f"Nmap komutu: {' '.join(nmap_args)}")
             
-            # Nmap taramasını çalıştır
-            scan_output = await self._run_nmap_scan(nmap_args)
-            
-            # Sonuçları parse et
-            await self._parse_nmap_results(result, scan_output, hostname)
+            if xml_output:
+                await self._parse_xml_stream(result, nmap_args, hostname)
+            else:
+                scan_output = await self._run_nmap_scan(nmap_args, [result])
+                await self._parse_nmap_results(result, scan_output, hostname)
             
             # Sonuçları sırala
             result.vulnerabilities = self.sort_vulnerabilities(result.vulnerabilities)
@@ -94,13 +111,123 @@ class NmapScanner(BaseScanner):
         
         return result
     
+    async def scan_batch(self, target_urls: List[str], options: Dict[str, Any] = None) -> Dict[str, ScanResult]:
+        """Birden çok hedefi batch_size'lık gruplar halinde tek nmap sürecine (-iL) verir; birleşik XML çıktısı
+        nmap çalışırken hostlara ayrılarak hedef URL başına ScanResult döndürülür
+
+        Nmap grup içindeki hostları kendi paralel zamanlamasıyla tarar; host_timeout süresinde bitmeyen hostlar
+        atlanır ve yalnızca o hostun sonucunda belirtilir.
+        """
+        options = options or {}
+        scan_type = options.get("scan_type", "quick")
+        loop = asyncio.get_event_loop()
+        results: Dict[str, ScanResult] = {}
+        targets: Dict[str, List[str]] = {}  # nmap hedefi -> bu hosta ait URL'ler
+        
+        self.is_running = True
+        try:
+            for target_url in dict.fromkeys(target_urls):
+                result = ScanResult(scanner_name=self.name, target_url=target_url, start_time=loop.time())
+                results[target_url] = result
+                self.add_scan_log(result, f"Nmap toplu taraması başlatıldı: {target_url}")
+                
+                if not await self.pre_scan_checks(target_url):
+                    result.status = "failed"
+                    result.error_message = "Pre-scan kontrolleri başarısız"
+                    continue
+                targets.setdefault(self._extract_batch_host(target_url), []).append(target_url)
+            
+            hosts = list(targets)
+            for start in range(0, len(hosts), self.batch_size):
+                group = {host: targets[host] for host in hosts[start:start + self.batch_size]}
+                await self._scan_host_group(group, results, scan_type, options)
+        
+        finally:
+            await self.post_scan_cleanup()
+        
+        return results
+    
+    async def _scan_host_group(self, group: Dict[str, List[str]], results: Dict[str, ScanResult],
+                               scan_type: str, options: Dict[str, Any]):
+        """Bir host grubunu tek nmap çalıştırmasıyla tarar ve her hostu kendi URL'lerinin sonucuna işler"""
+        group_results = [results[url] for urls in group.values() for url in urls]
+        targets_file = self._write_targets_file(list(group))
+        try:
+            nmap_args = self._build_nmap_command(None, scan_type, options, xml_output=True,
+                                                 targets_file=targets_file, host_timeout=self.host_timeout)
+            for result in group_results:
+                self.add_scan_log(result, f"Nmap komutu ({len(group)} host): {' '.join(nmap_args)}")
+            
+            seen = await self._demux_xml_stream(group, results, nmap_args, group_results)
+        
+        except Exception as e:
+            for result in group_results:
+                result.status = "failed"
+                result.error_message = str(e)
+                result.end_time = asyncio.get_event_loop().time()
+                self.add_scan_log(result, f"Tarama hatası: {e}", "error")
+            return
+        
+        finally:
+            if os.path.exists(targets_file):
+                os.unlink(targets_file)
+        
+        for host, urls in group.items():
+            for url in urls:
+                result = results[url]
+                if host not in seen:
+                    self.add_scan_log(result, f"Host {host} nmap çıktısında yok - çözümlenemedi veya yanıt vermedi", "warning")
+                result.vulnerabilities = self.sort_vulnerabilities(result.vulnerabilities)
+                result.status = "completed"
+                result.end_time = asyncio.get_event_loop().time()
+                self.add_scan_log(result, f"Nmap taraması tamamlandı. {len(result.vulnerabilities)} açık bulundu.")
+    
+    async def _demux_xml_stream(self, group: Dict[str, List[str]], results: Dict[str, ScanResult], nmap_args: List[str],
+                                group_results: List[ScanResult]) -> set:
+        """Birleşik XML'deki her hostu, nmap onu bitirdiği anda -iL dosyasında verilen ismine (veya IP adresine) göre
+        ilgili sonuçlara işler"""
+        seen = set()
+        
+        async def analyze(host: NmapHost):
+            target = host.target if host.target in group else host.address
+            if target not in group:
+                return
+            seen.add(target)
+            for url in group[target]:
+                if host.timed_out:
+                    self.add_scan_log(results[url], f"Host {target} --host-timeout ({self.host_timeout}) süresinde tamamlanamadı, sonuçlar eksik", "warning")
+                await self._analyze_host(results[url], host, target)
+        
+        try:
+            await self._stream_nmap_xml(nmap_args, group_results, analyze, host_count=len(group))
+        except ET.ParseError as e:
+            # Yarıda kalan çıktı: tamamlanan hostlar işlendi, kalanlar çıktıda yok olarak raporlanır
+            for urls in group.values():
+                for url in urls:
+                    self.add_scan_log(results[url], f"XML parse hatası ({len(seen)} host işlendi): {e}", "error")
+        return seen
+    
+    def _extract_batch_host(self, target_url: str) -> str:
+        """-iL dosyasına yazılacak host - port ve kullanıcı bilgisi nmap hedefi olamaz"""
+        from urllib.parse import urlparse
+        parsed = urlparse(target_url)
+        return parsed.hostname or parsed.path
+    
+    def _write_targets_file(self, hosts: List[str]) -> str:
+        """Hostları nmap'in -iL seçeneği için dosyaya yazar - çağıran silmekle sorumludur"""
+        with tempfile.NamedTemporaryFile("w", prefix="nmap_targets_", suffix=".txt", delete=False) as targets_file:
+            targets_file.write("\n".join(hosts) + "\n")
+        return targets_file.name
+    
     def _extract_hostname(self, target_url: str) -> str:
         """URL'den hostname'i çıkarır"""
         from urllib.parse import urlparse
         parsed = urlparse(target_url)
         return parsed.netloc or parsed.path
     
-    def _build_nmap_command(self, hostname: str, scan_type: str, options: Dict[str, Any]) -> List[str]:
+    def _build_nmap_command(self, hostname: Optional[str], scan_type: str, options: Dict[str, Any],
+                            xml_output: bool = False, targets_file: Optional[str] = None,
+                            host_timeout: Optional[str] = None) -> List[str]:
         """Nmap komutunu oluşturur"""
         base_args = [self.nmap_path]
         
@@ -108,64 +235,163 @@ class NmapScanner(BaseScanner):
         if scan_type in self.scan_types:
             base_args.extend(self.scan_types[scan_type].split())
         
-        # Ek seçenekler
-        if options.get("output_xml"):
+        # XML çıktısı stdout'a yazılır (normal çıktı bastırılır); nmap her host grubunu bitirince çıktıyı boşaltır
+        if xml_output:
             base_args.extend(["-oX", "-"])
         
-        # Hostname ekle
-        base_args.append(hostname)
+        if host_timeout:
+            base_args.extend(["--host-timeout", host_timeout])
+        
+        # Hedefler: toplu taramada dosyadan, aksi halde tek hostname
+        if targets_file:
+            base_args.extend(["-iL", targets_file])
+        else:
+            base_args.append(hostname)
         
         return base_args
     
-    async def _run_nmap_scan(self, nmap_args: List[str]) -> str:
-        """Nmap taramasını çalıştırır"""
+    async def _run_nmap_scan(self, nmap_args: List[str], results: List[ScanResult]) -> str:
+        """Nmap taramasını çalıştırır ve text çıktısını döndürür"""
         try:
-            process = await asyncio.create_subprocess_exec(
-                *nmap_args,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
+            # Süreç iptal edildiğinde veya süre dolduğunda süreç grubu ile birlikte sonlandırılır
+            async with self.spawn_process(nmap_args, tool="nmap", results=results, timeout=self._process_timeout(1)) as process:
+                stdout, stderr = await process.communicate()
             
             if process.returncode != 0:
                 raise Exception(f"Nmap hatası: {stderr.decode()}")
             
-            return stdout.decode()
+            return stdout.decode() if stdout else ""
             
         except Exception as e:
             raise Exception(f"Nmap çalıştırma hatası: {e}")
     
+    def _process_timeout(self, host_count: int) -> Optional[float]:
+        """Nmap sürecinin toplam süre sınırı - toplu taramada -iL dosyasındaki host sayısıyla ölçeklenir (aynı hostun
+        birden çok URL'si tek host sayılır); tek hostun süresi ayrıca --host-timeout ile sınırlıdır"""
+        timeout = self.config.get("timeout")
+        if timeout:
+            timeout *= max(1, host_count)
+        return timeout
+    
+    async def _stream_nmap_xml(self, nmap_args: List[str], results: List[ScanResult],
+                               callback: Callable[[NmapHost], Awaitable[None]], host_count: int = 1):
+        """Nmap'i XML çıktısı stdout'a (-oX -) yazacak şekilde çalıştırır; her host nmap onu bitirdiği anda ayrıştırılıp
+        callback'e verilir, böylece bulgular tarama bitmeden akışa düşer. Ayrıştırma olay döngüsünü bloklamasın diye
+        thread'de yapılır. Nmap hata verirse istisna, çıktı yarıda kesildiyse tamamlanan hostlar işlendikten sonra
+        ET.ParseError fırlatılır"""
+        stream = NmapXMLStream()
+        try:
+            # Süreç iptal edildiğinde veya süre dolduğunda süreç grubu ile birlikte sonlandırılır
+            timeout = self._process_timeout(host_count)
+            async with self.spawn_process(nmap_args, tool="nmap", results=results, timeout=timeout) as process:
+                # stderr ayrıca boşaltılır; dolan pipe nmap'i bloklamasın
+                stderr_task = asyncio.create_task(process.read_capped(process.stderr))
+                try:
+                    while True:
+                        chunk = await process.stdout.read(NMAP_XML_READ_CHUNK)
+                        if chunk:
+                            hosts = await asyncio.to_thread(stream.feed, chunk)
+                        else:
+                            hosts = await asyncio.to_thread(stream.close)
+                        for host in hosts:
+                            await callback(host)
+                        if not chunk:
+                            break
+                        if stream.error is not None:
+                            # Bozuk çıktının kalanı okunup atılır; nmap yazarken bloklanmaz
+                            await process.read_capped(process.stdout)
+                            break
+                    await process.wait()
+                    stderr = await stderr_task
+                finally:
+                    stderr_task.cancel()
+            
+            if process.returncode != 0:
+                raise Exception(f"Nmap hatası: {stderr.decode()}")
+            
+        except Exception as e:
+            raise Exception(f"Nmap çalıştırma hatası: {e}")
+        
+        if stream.error is not None:
+            raise stream.error
+    
     async def _parse_nmap_results(self, result: ScanResult, scan_output: str, hostname: str):
-        """Nmap çıktısını parse eder ve güvenlik açıklarını tespit eder"""
+        """Nmap text çıktısını parse eder ve güvenlik açıklarını tespit eder (output_xml kapalıyken)"""
         try:
-            # XML çıktısını parse et
-            if scan_output.strip().startswith("<?xml"):
-                await self._parse_xml_output(result, scan_output, hostname)
-            else:
-                await self._parse_text_output(result, scan_output, hostname)
+            await self._parse_text_output(result, scan_output, hostname)
                 
         except Exception as e:
             self.add_scan_log(result, f"Sonuç parse hatası: {e}", "error")
     
-    async def _parse_xml_output(self, result: ScanResult, xml_output: str, hostname: str):
-        """XML çıktısını parse eder"""
+    async def _parse_xml_stream(self, result: ScanResult, nmap_args: List[str], hostname: str):
+        """Nmap'i çalıştırır ve XML çıktısını host host, hostlar tamamlandıkça analiz eder"""
+        hosts_seen = 0
+        
+        async def analyze(host: NmapHost):
+            nonlocal hosts_seen
+            hosts_seen += 1
+            await self._analyze_host(result, host, hostname)
+        
         try:
-            root = ET.fromstring(xml_output)
+            await self._stream_nmap_xml(nmap_args, [result], analyze)
+        
+        except ET.ParseError as e:
+            # Yarıda kalan çıktı: o ana kadar tamamlanan hostlar işlenmiştir
+            self.add_scan_log(result, f"XML parse hatası ({hosts_seen} host işlendi): {e}", "error")
+    
+    async def _analyze_host(self, result: ScanResult, host: NmapHost, target: str):
+        """Hostun açık portlarını, servislerini, NSE script çıktılarını ve OS tahminini analiz eder"""
+        if host.status != "up":
+            return
+        
+        name = host.hostnames[0] if host.hostnames else (host.address or target)
+        open_ports = host.open_ports
+        services = ", ".join(
+            f"{port.label} {_service_name(port)}" + (f" ({port.service.banner})" if port.service.banner else "")
+            for port in open_ports[:20]
+        )
+        self.add_scan_log(result, f"Host {name} ({host.address}): {len(open_ports)} açık port" + (f" - {services}" if services else ""))
+        
+        for port in open_ports:
+            details = port.service.banner
+            if port.service.cpes:
+                details = f"{details} ({', '.join(port.service.cpes)})".strip()
+            await self._check_port_vulnerabilities(result, name, port.label, _service_name(port), details)
             
-            # Host bilgilerini bul
-            for host in root.findall(".//host"):
-                # Port bilgilerini işle
-                for port in host.findall(".//port"):
-                    await self._analyze_port(result, port, hostname)
-                
-                # OS bilgilerini işle
-                os_info = host.find(".//os")
-                if os_info is not None:
-                    await self._analyze_os_info(result, os_info, hostname)
-                    
-        except Exception as e:
-            self.add_scan_log(result, f"XML parse hatası: {e}", "error")
+            for script in port.scripts:
+                await self._check_script_output(result, name, port.label, script)
+        
+        for script in host.scripts:
+            await self._check_script_output(result, name, None, script)
+        
+        os_match = host.best_os_match
+        if os_match is not None:
+            self.add_scan_log(result, f"Host {name} OS tahmini: {os_match.name} (%{os_match.accuracy})")
+            await self._check_os_vulnerabilities(result, name, os_match.name)
+    
+    async def _check_script_output(self, result: ScanResult, hostname: str, port_info: Optional[str], script: NmapScript):
+        """NSE script'i açık bildirdiyse (State: VULNERABLE) güvenlik açığı ekler"""
+        if not script.vulnerable:
+            return
+        
+        lines = [line.strip() for line in script.output.splitlines() if line.strip()]
+        # vuln script çıktısı "VULNERABLE:" satırından sonra açığın adıyla başlar
+        if len(lines) > 1 and lines[0].rstrip(":") == "VULNERABLE":
+            name = lines[1]
+        else:
+            name = script.id
+        cve_match = re.search(r"CVE-\d{4}-\d{4,}", script.output)
+        output = script.output.strip()
+        
+        vuln = Vulnerability(
+            title=f"NSE: {name}",
+            description=f"Nmap {script.id} script'i güvenlik açığı bildirdi: {name}",
+            severity="high",
+            cve_id=cve_match.group(0) if cve_match else None,
+            location=f"{hostname}:{port_info}" if port_info else hostname,
+            evidence=output[:NMAP_SCRIPT_EVIDENCE_CHARS] + ("..." if len(output) > NMAP_SCRIPT_EVIDENCE_CHARS else "")
+        )
+        self.add_vulnerability(result, vuln)
     
     async def _parse_text_output(self, result: ScanResult, text_output: str, hostname: str):
         """Text çıktısını parse eder"""
@@ -182,33 +408,6 @@ class NmapScanner(BaseScanner):
         except Exception as e:
             self.add_scan_log(result, f"Text parse hatası: {e}", "error")
     
-    async def _analyze_port(self, result: ScanResult, port_elem, hostname: str):
-        """Port bilgisini analiz eder ve güvenlik açıklarını tespit eder"""
-        try:
-            port_id = port_elem.get("portid")
-            protocol = port_elem.get("protocol")
-            state = port_elem.find("state")
-            service = port_elem.find("service")
-            
-            if state is not None and state.get("state") == "open":
-                # Açık port tespit edildi
-                port_info = f"{port_id}/{protocol}"
-                
-                # Servis bilgisi
-                service_name = "unknown"
-                service_version = ""
-                if service is not None:
-                    service_name = service.get("name", "unknown")
-                    service_version = service.get("version", "")
-                
-                # Güvenlik açığı tespiti
-                await self._check_port_vulnerabilities(
-                    result, hostname, port_info, service_name, service_version
-                )
-                
-        except Exception as e:
-            self.add_scan_log(result, f"Port analiz hatası: {e}", "warning")
-    
     async def _analyze_text_port(self, result: ScanResult, port_num: str, protocol: str, state: str, service: str, hostname: str):
         """Text çıktısından port bilgisini analiz eder"""
         if state.lower() == "open":
@@ -221,23 +420,6 @@ class NmapScanner(BaseScanner):
                 result, hostname, port_info, service_name, ""
             )
     
-    async def _analyze_os_info(self, result: ScanResult, os_elem, hostname: str):
-        """OS bilgisini analiz eder"""
-        try:
-            os_name = os_elem.find(".//osname")
-            os_version = os_elem.find(".//osversion")
-            
-            if os_name is not None:
-                os_info = f"{os_name.text}"
-                if os_version is not None:
-                    os_info += f" {os_version.text}"
-                
-                # OS tabanlı güvenlik açıkları
-                await self._check_os_vulnerabilities(result, hostname, os_info)
-                
-        except Exception as e:
-            self.add_scan_log(result, f"OS analiz hatası: {e}", "warning")
-    
     async def _check_port_vulnerabilities(self, result: ScanResult, hostname: str, port_info: str, service_name: str, service_version: str):
         """Port tabanlı güvenlik açıklarını kontrol eder"""
         # Bilinen güvenlik açıkları
@@ -348,3 +530,11 @@ class NmapScanner(BaseScanner):
             "scan_duration": result.end_time - result.start_time if result.end_time else 0,
             "status": result.status
         }
+
+
+def _service_name(port: NmapPort) -> str:
+    """Servis adı - nmap TLS üzerindeki HTTP'yi name="http" tunnel="ssl" olarak raporlar"""
+    if port.service.name == "http" and port.service.tunnel == "ssl":
+        return "https"
+    return port.service.name
+
@@ -0,0 +1,223 @@
+"""
+Nmap XML çıktısı için akışlı ayrıştırıcı
+Host öğeleri tamamlandıkça yapılandırılmış veriye dönüştürülüp ağaçtan atılır; büyük aralık taramaları sabit bellekle ayrıştırılır.
+Çıktı dosyadan (iter_nmap_hosts) veya nmap çalışırken stdout'tan parça parça (NmapXMLStream) okunabilir
+"""
+
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+
+@dataclass
+class NmapScript:
+    """NSE script çıktısı"""
+    id: str
+    output: str
+
+    @property
+    def vulnerable(self) -> bool:
+        """vuln kategorisindeki script'ler açık bulduğunda 'State: VULNERABLE' yazar"""
+        return "VULNERABLE" in self.output and "NOT VULNERABLE" not in self.output
+
+
+@dataclass
+class NmapService:
+    """Port üzerinde tespit edilen servis"""
+    name: str = "unknown"
+    product: str = ""
+    version: str = ""
+    extrainfo: str = ""
+    tunnel: str = ""  # ssl ise servis TLS üzerinden çalışıyor
+    method: str = ""  # probed: sürüm sondasıyla, table: yalnızca port numarasından tahmin
+    confidence: int = 0
+    cpes: List[str] = field(default_factory=list)
+
+    @property
+    def banner(self) -> str:
+        """Ürün, sürüm ve ek bilgi - ör. 'OpenSSH 8.2p1 Ubuntu 4ubuntu0.5'"""
+        return " ".join(part for part in (self.product, self.version, self.extrainfo) if part)
+
+
+@dataclass
+class NmapPort:
+    """Port durumu, servis ve port script'leri"""
+    port: int
+    protocol: str
+    state: str
+    reason: str = ""
+    service: NmapService = field(default_factory=NmapService)
+    scripts: List[NmapScript] = field(default_factory=list)
+
+    @property
+    def label(self) -> str:
+        return f"{self.port}/{self.protocol}"
+
+
+@dataclass
+class NmapOSMatch:
+    """İşletim sistemi tahmini"""
+    name: str
+    accuracy: int
+    family: str = ""
+    generation: str = ""
+    cpes: List[str] = field(default_factory=list)
+
+
+@dataclass
+class NmapHost:
+    """Tek bir hostun tarama sonucu"""
+    status: str
+    addresses: Dict[str, str] = field(default_factory=dict)  # addrtype (ipv4, ipv6, mac) -> adres
+    hostnames: List[str] = field(default_factory=list)
+    target: str = ""  # Komut satırında veya -iL dosyasında verilen isim (hostname type="user")
+    timed_out: bool = False  # --host-timeout süresi doldu, sonuçlar eksik
+    ports: List[NmapPort] = field(default_factory=list)
+    os_matches: List[NmapOSMatch] = field(default_factory=list)
+    scripts: List[NmapScript] = field(default_factory=list)  # hostscript çıktıları
+
+    @property
+    def address(self) -> str:
+        return self.addresses.get("ipv4") or self.addresses.get("ipv6") or next(iter(self.addresses.values()), "")
+
+    @property
+    def open_ports(self) -> List[NmapPort]:
+        return [port for port in self.ports if port.state == "open"]
+
+    @property
+    def best_os_match(self) -> Optional[NmapOSMatch]:
+        return max(self.os_matches, key=lambda match: match.accuracy, default=None)
+
+
+def iter_nmap_hosts(source) -> Iterator[NmapHost]:
+    """XML dosyasındaki (yol veya dosya nesnesi) hostları tamamlandıkça döndürür
+
+    Her host işlendikten sonra kök öğenin çocukları temizlenir; bellekte aynı anda yalnızca bir host
+    öğesi tutulur. Dosya yarıda kesilmişse (ör. tarama iptal edildi) o ana kadarki hostlar döndürülür
+    ve ardından ET.ParseError fırlatılır.
+    """
+    context = ET.iterparse(source, events=("start", "end"))
+    root = None
+    for event, elem in context:
+        if root is None:
+            root = elem  # nmaprun
+            continue
+        if event == "end" and elem.tag == "host":
+            yield parse_host(elem)
+            root.clear()
+
+
+class NmapXMLStream:
+    """Parça parça gelen XML'i (ör. nmap -oX - stdout'u) ayrıştırır; her beslemede o ana kadar tamamlanan hostları döndürür
+
+    Bellekte aynı anda yalnızca tamamlanmamış host öğesi tutulur. Çıktı bozuksa veya yarıda kesildiyse o ana kadarki
+    hostlar döndürülür, hata error alanına yazılır ve sonraki beslemeler yok sayılır.
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root: Optional[ET.Element] = None
+        self.error: Optional[ET.ParseError] = None
+
+    def feed(self, data: bytes) -> List[NmapHost]:
+        """Veri parçasını ayrıştırıcıya verir ve tamamlanan hostları döndürür"""
+        if self.error is not None:
+            return []
+        try:
+            self._parser.feed(data)
+        except ET.ParseError as e:
+            self.error = e
+        return self._read_hosts()
+
+    def close(self) -> List[NmapHost]:
+        """Akışı sonlandırır - kök öğe kapanmadıysa (çıktı yarıda kesildi) error doldurulur"""
+        if self.error is not None:
+            return []
+        try:
+            self._parser.close()
+        except ET.ParseError as e:
+            self.error = e
+        return self._read_hosts()
+
+    def _read_hosts(self) -> List[NmapHost]:
+        hosts = []
+        try:
+            for event, elem in self._parser.read_events():
+                if self._root is None:
+                    self._root = elem  # nmaprun
+                    continue
+                if event == "end" and elem.tag == "host":
+                    hosts.append(parse_host(elem))
+                    self._root.clear()
+        except ET.ParseError as e:
+            self.error = e
+        return hosts
+
+
+def parse_host(elem: ET.Element) -> NmapHost:
+    """<host> öğesini NmapHost'a dönüştürür"""
+    status = elem.find("status")
+    host = NmapHost(
+        status=status.get("state", "unknown") if status is not None else "unknown",
+        timed_out=elem.get("timedout") == "true"
+    )
+
+    for address in elem.findall("address"):
+        host.addresses.setdefault(address.get("addrtype", "ipv4"), address.get("addr", ""))
+    for hostname in elem.findall("hostnames/hostname"):
+        name = hostname.get("name")
+        if name and name not in host.hostnames:
+            host.hostnames.append(name)
+        if name and hostname.get("type") == "user" and not host.target:
+            host.target = name
+
+    for port in elem.findall("ports/port"):
+        host.ports.append(_parse_port(port))
+
+    for match in elem.findall("os/osmatch"):
+        osclass = match.find("osclass")
+        host.os_matches.append(NmapOSMatch(
+            name=match.get("name", ""),
+            accuracy=_int(match.get("accuracy")),
+            family=osclass.get("osfamily", "") if osclass is not None else "",
+            generation=osclass.get("osgen", "") if osclass is not None else "",
+            cpes=[cpe.text for cpe in match.iter("cpe") if cpe.text]
+        ))
+
+    host.scripts = [_parse_script(script) for script in elem.findall("hostscript/script")]
+    return host
+
+
+def _parse_port(elem: ET.Element) -> NmapPort:
+    state = elem.find("state")
+    service = elem.find("service")
+    port = NmapPort(
+        port=_int(elem.get("portid")),
+        protocol=elem.get("protocol", "tcp"),
+        state=state.get("state", "unknown") if state is not None else "unknown",
+        reason=state.get("reason", "") if state is not None else ""
+    )
+    if service is not None:
+        port.service = NmapService(
+            name=service.get("name", "unknown"),
+            product=service.get("product", ""),
+            version=service.get("version", ""),
+            extrainfo=service.get("extrainfo", ""),
+            tunnel=service.get("tunnel", ""),
+            method=service.get("method", ""),
+            confidence=_int(service.get("conf")),
+            cpes=[cpe.text for cpe in service.findall("cpe") if cpe.text]
+        )
+    port.scripts = [_parse_script(script) for script in elem.findall("script")]
+    return port
+
+
+def _parse_script(elem: ET.Element) -> NmapScript:
+    return NmapScript(id=elem.get("id", ""), output=elem.get("output", ""))
+
+
+def _int(value: Optional[str]) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
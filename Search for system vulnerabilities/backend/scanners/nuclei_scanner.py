@@ -3,21 +3,31 @@ Nuclei Template Tabanlı Zafiyet Tarayıcısı
 Template tabanlı güvenlik açığı tespiti
 """
 
+import os
 import asyncio
+import tempfile
 import subprocess
 import json
 import re
+from collections import deque
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+from urllib.parse import urlparse
 import logging
 
 from .base_scanner import BaseScanner, ScanResult, Vulnerability
+from .http_client import ScannerHTTPClient
+
+# Tek bir JSONL kaydının en fazla boyutu - kayıtlar ham istek/yanıtı içerdiğinde 64KB'lık varsayılan sınır yetmez
+SCANNER_NUCLEI_MAX_LINE_BYTES = int(os.getenv("SCANNER_NUCLEI_MAX_LINE_BYTES", str(16 * 1024 * 1024)))
+# Hata mesajı için saklanan son stderr satırı sayısı
+NUCLEI_STDERR_TAIL_LINES = 20
 
 class NucleiScanner(BaseScanner):
     """Nuclei kullanarak template tabanlı güvenlik açığı taraması yapan tarayıcı"""
     
-    def __init__(self, config: Dict[str, Any] = None):
-        super().__init__("Nuclei Scanner", config)
+    def __init__(self, config: Dict[str, Any] = None, http_client: Optional[ScannerHTTPClient] = None):
+        super().__init__("Nuclei Scanner", config, http_client)
         self.nuclei_path = config.get("nuclei_path", "nuclei") if config else "nuclei"
         
         # Nuclei tarama seçenekleri
@@ -69,11 +79,8 @@ class NucleiScanner(BaseScanner):
             nuclei_args = self._build_nuclei_command(target_url, scan_type, templates, options)
             self.add_scan_log(result, f"Nuclei komutu: {' '.join(nuclei_args)}")
             
-            # Nuclei taramasını çalıştır
-            scan_output = await self._run_nuclei_scan(nuclei_args)
-            
-            # Sonuçları parse et
-            await self._parse_nuclei_results(result, scan_output, target_url)
+            # Nuclei taramasını çalıştır - bulgular çıktı okunurken eklenir
+            await self._run_nuclei_scan({target_url: result}, nuclei_args)
             
             # Sonuçları sırala
             result.vulnerabilities = self.sort_vulnerabilities(result.vulnerabilities)
@@ -92,12 +99,73 @@ class NucleiScanner(BaseScanner):
         
         return result
     
-    def _build_nuclei_command(self, target_url: str, scan_type: str, templates: List[str], options: Dict[str, Any]) -> List[str]:
+    async def scan_batch(self, target_urls: List[str], options: Dict[str, Any] = None) -> Dict[str, ScanResult]:
+        """Birden çok hedefi liste dosyasıyla (-l) tek nuclei sürecinde tarar; template'ler bir kez yüklenip derlenir.
+        Her JSONL kaydı host/matched-at alanına göre ilgili hedefin ScanResult'ına yazılır"""
+        options = options or {}
+        scan_type = options.get("scan_type", "standard")
+        templates = options.get("templates", self.template_categories)
+        loop = asyncio.get_event_loop()
+        results: Dict[str, ScanResult] = {}
+        
+        self.is_running = True
+        try:
+            for target_url in dict.fromkeys(target_urls):
+                result = ScanResult(scanner_name=self.name, target_url=target_url, start_time=loop.time())
+                results[target_url] = result
+                self.add_scan_log(result, f"Nuclei toplu taraması başlatıldı: {target_url}")
+                
+                if not await self.pre_scan_checks(target_url):
+                    result.status = "failed"
+                    result.error_message = "Pre-scan kontrolleri başarısız"
+            
+            batch = {url: result for url, result in results.items() if result.status != "failed"}
+            if not batch:
+                return results
+            
+            targets_file = self._write_targets_file(list(batch))
+            try:
+                nuclei_args = self._build_nuclei_command(None, scan_type, templates, options, targets_file=targets_file)
+                for result in batch.values():
+                    self.add_scan_log(result, f"Nuclei komutu ({len(batch)} hedef): {' '.join(nuclei_args)}")
+                
+                await self._run_nuclei_scan(batch, nuclei_args)
+            
+            except Exception as e:
+                for result in batch.values():
+                    result.status = "failed"
+                    result.error_message = str(e)
+                    result.end_time = loop.time()
+                    self.add_scan_log(result, f"Tarama hatası: {e}", "error")
+                return results
+            
+            finally:
+                os.unlink(targets_file)
+            
+            for result in batch.values():
+                result.vulnerabilities = self.sort_vulnerabilities(result.vulnerabilities)
+                result.status = "completed"
+                result.end_time = loop.time()
+                self.add_scan_log(result, f"Nuclei taraması tamamlandı. {len(result.vulnerabilities)} açık bulundu.")
+        
+        finally:
+            await self.post_scan_cleanup()
+        
+        return results
+    
+    def _write_targets_file(self, target_urls: List[str]) -> str:
+        """Hedefleri nuclei'nin -l seçeneği için dosyaya yazar - çağıran silmekle sorumludur"""
+        with tempfile.NamedTemporaryFile("w", prefix="nuclei_targets_", suffix=".txt", delete=False) as targets_file:
+            targets_file.write("\n".join(target_urls) + "\n")
+        return targets_file.name
+    
+    def _build_nuclei_command(self, target_url: Optional[str], scan_type: str, templates: List[str], options: Dict[str, Any],
+                              targets_file: Optional[str] = None) -> List[str]:
         """Nuclei komutunu oluşturur"""
         base_args = [self.nuclei_path]
         
-        # JSON output
-        base_args.extend(["-json"])
+        # JSONL output - her bulgu ayrı satırda, bulunduğu anda yazılır
+        base_args.extend(["-jsonl"])
         
         # Scan type seçenekleri
         if scan_type in self.scan_types:
@@ -115,52 +183,101 @@ class NucleiScanner(BaseScanner):
         if options.get("timeout"):
             base_args.extend(["-timeout", str(options["timeout"])])
         
-        # Concurrency
+        # Concurrency: -c paralel çalışan template sayısı, -bulk-size template başına paralel taranan hedef sayısı
         if options.get("concurrency"):
             base_args.extend(["-c", str(options["concurrency"])])
+        if options.get("bulk_size"):
+            base_args.extend(["-bulk-size", str(options["bulk_size"])])
         
-        # Target ekle
-        base_args.append(target_url)
+        # Target ekle - toplu taramada hedefler liste dosyasından okunur
+        if targets_file:
+            base_args.extend(["-l", targets_file])
+        else:
+            base_args.append(target_url)
         
         return base_args
     
-    async def _run_nuclei_scan(self, nuclei_args: List[str]) -> str:
-        """Nuclei taramasını çalıştırır"""
+    async def _run_nuclei_scan(self, results: Dict[str, ScanResult], nuclei_args: List[str]):
+        """Nuclei taramasını çalıştırır; stdout satır satır okunur ve her kayıt hemen hedefinin sonucuna
+        güvenlik açığı olarak eklenir (results: hedef URL -> ScanResult)"""
+        stderr_tail = deque(maxlen=NUCLEI_STDERR_TAIL_LINES)
         try:
-            process = await asyncio.create_subprocess_exec(
-                *nuclei_args,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
+            timeout = self._process_timeout(results)
+            # Süreç iptal edildiğinde veya süre dolduğunda süreç grubu ile birlikte sonlandırılır
+            async with self.spawn_process(nuclei_args, tool="nuclei", results=list(results.values()), timeout=timeout,
+                                          limit=SCANNER_NUCLEI_MAX_LINE_BYTES) as process:
+                # stderr ayrıca boşaltılır; dolan pipe nuclei'yi bloklamasın
+                stderr_task = asyncio.create_task(self._read_stderr_tail(process.stderr, stderr_tail))
+                try:
+                    await self._stream_nuclei_results(results, process.stdout)
+                    await process.wait()
+                    await stderr_task
+                finally:
+                    stderr_task.cancel()
             
             if process.returncode != 0 and process.returncode != 1:  # Nuclei başarısız taramalarda 1 döner
-                raise Exception(f"Nuclei hatası: {stderr.decode()}")
-            
-            return stdout.decode()
+                raise Exception(f"Nuclei hatası: {''.join(stderr_tail)}")
             
         except Exception as e:
             raise Exception(f"Nuclei çalıştırma hatası: {e}")
     
-    async def _parse_nuclei_results(self, result: ScanResult, scan_output: str, target_url: str):
-        """Nuclei JSON çıktısını parse eder ve güvenlik açıklarını tespit eder"""
+    def _process_timeout(self, results: Dict[str, ScanResult]) -> Optional[float]:
+        """Nuclei sürecinin toplam süre sınırı - toplu taramada farklı host sayısıyla ölçeklenir (aynı hostun
+        birden çok URL'si tek host sayılır)"""
+        timeout = self.config.get("timeout")
+        if timeout:
+            timeout *= max(1, len({_hostname(url) for url in results}))
+        return timeout
+    
+    async def _read_stderr_tail(self, stream: asyncio.StreamReader, tail: deque):
+        """stderr'i sonuna kadar okur, yalnızca son satırları saklar"""
+        while True:
+            try:
+                line = await stream.readline()
+            except ValueError:
+                continue  # Sınırı aşan satır atlanır
+            if not line:
+                break
+            tail.append(line.decode(errors="replace"))
+    
+    async def _stream_nuclei_results(self, results: Dict[str, ScanResult], stream: asyncio.StreamReader):
+        """Nuclei JSONL çıktısını satır satır parse eder - bellekte aynı anda tek kayıt tutulur"""
+        while True:
+            try:
+                line = await stream.readline()
+            except ValueError:
+                # Sınırı aşan kayıt okuyucudan atıldı; kalan parçası JSON olmadığı için sonraki satırda atlanır
+                for result in results.values():
+                    self.add_scan_log(result, f"{SCANNER_NUCLEI_MAX_LINE_BYTES} baytı aşan Nuclei kaydı atlandı", "warning")
+                continue
+            if not line:
+                break
+            await self._parse_nuclei_line(results, line.decode(errors="replace"))
+    
+    async def _parse_nuclei_line(self, results: Dict[str, ScanResult], line: str):
+        """Tek bir JSONL satırını parse eder ve güvenlik açığını kaydın ait olduğu hedefin sonucuna ekler"""
+        line = line.strip()
+        if not line:
+            return
+        
         try:
-            lines = scan_output.strip().split('\n')
-            
-            for line in lines:
-                if line.strip():
-                    try:
-                        vuln_data = json.loads(line)
-                        await self._process_vulnerability(result, vuln_data, target_url)
-                    except json.JSONDecodeError:
-                        # JSON olmayan satırları log'la
-                        if "error" in line.lower() or "warning" in line.lower():
-                            self.add_scan_log(result, line, "warning")
-                        continue
-                        
-        except Exception as e:
-            self.add_scan_log(result, f"Sonuç parse hatası: {e}", "error")
+            vuln_data = json.loads(line)
+        except json.JSONDecodeError:
+            # JSON olmayan satırları log'la
+            if "error" in line.lower() or "warning" in line.lower():
+                for result in results.values():
+                    self.add_scan_log(result, line, "warning")
+            return
+        
+        if not isinstance(vuln_data, dict):
+            return
+        
+        target_url = _match_target(vuln_data, list(results))
+        if target_url is None:
+            for result in results.values():
+                self.add_scan_log(result, f"Hiçbir hedefle eşleşmeyen Nuclei kaydı atlandı: {vuln_data.get('template-id', '')} - {vuln_data.get('matched-at', '')}", "warning")
+            return
+        await self._process_vulnerability(results[target_url], vuln_data, target_url)
     
     async def _process_vulnerability(self, result: ScanResult, vuln_data: Dict[str, Any], target_url: str):
         """Tek bir güvenlik açığını işler"""
@@ -239,3 +356,34 @@ class NucleiScanner(BaseScanner):
             "scan_duration": result.end_time - result.start_time if result.end_time else 0,
             "status": result.status
         }
+
+
+def _match_target(vuln_data: Dict[str, Any], targets: List[str]) -> Optional[str]:
+    """JSONL kaydının ait olduğu hedef URL - önce girdi alanları (url/host), sonra matched-at'in en uzun
+    önek eşleşmesi, son olarak aynı host[:port]"""
+    if len(targets) == 1:
+        return targets[0]
+    
+    normalized = {target.rstrip("/"): target for target in targets}
+    # Nuclei sürümüne göre girdi hedefi url veya host alanında yer alır
+    for field in ("url", "host"):
+        value = str(vuln_data.get(field) or "").rstrip("/")
+        if value in normalized:
+            return normalized[value]
+    
+    matched_at = str(vuln_data.get("matched-at") or vuln_data.get("host") or "")
+    prefixed = [target for key, target in normalized.items() if matched_at == key or matched_at.startswith(key + "/")]
+    if prefixed:
+        return max(prefixed, key=len)
+    
+    # Yönlendirme veya farklı şema/port: aynı hosttaki hedeflerden ilki
+    hostname = _hostname(matched_at)
+    for target in targets:
+        if hostname and _hostname(target) == hostname:
+            return target
+    return None
+
+
+def _hostname(value: str) -> Optional[str]:
+    """URL veya host[:port] değerinden küçük harfli hostname"""
+    return urlparse(value if "://" in value else f"//{value}").hostname
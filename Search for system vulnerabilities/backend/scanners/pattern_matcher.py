@@ -0,0 +1,129 @@
+"""
+Çok kalıplı eşleştirme motoru
+Tüm tespit kurallarını tek bir derlenmiş düzenli ifadede birleştirir ve metni tek geçişte tarar
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# İlk karakteri bu işaretlerden biri olan kuralın başlangıç karakteri bilinemez
+REGEX_SPECIAL_CHARS = ".^$*+?{}[]()|"
+
+
+@dataclass
+class PatternMatch:
+    """Eşleşen kural, metindeki konumu ve eşleşen metin"""
+    rule: str
+    start: int
+    end: int
+    text: str
+
+
+def _leading_char(pattern: str) -> Optional[str]:
+    """Kuralın her eşleşmesinin başladığı karakter; belirlenemiyorsa None"""
+    if not pattern:
+        return None
+
+    char = pattern[0]
+    length = 1
+    if char == "\\":
+        # Yalnızca noktalama kaçışları (\. \( gibi) düz karakterdir; \d, \w gibi sınıflar değildir
+        char = pattern[1:2]
+        length = 2
+        if not char or char.isalnum():
+            return None
+    elif char in REGEX_SPECIAL_CHARS:
+        return None
+
+    # İlk karakter isteğe bağlıysa (a*, a?, a{0,1}) eşleşme başka karakterle başlayabilir
+    if pattern[length:length + 1] in ("*", "?", "{"):
+        return None
+    return char
+
+
+class MultiPatternMatcher:
+    """Kuralları tek bir alternation ifadesinde birleştirip metni tek geçişte eşleştirir
+
+    Her kural ileri bakış (lookahead) içinde adlandırılmış bir gruptur; bu sayede bir kuralın eşleşmesi
+    başka bir kuralın eşleşmesini yutmaz (ör. script bloğu içindeki `javascript:`). Aynı konumda
+    başlayan eşleşmelerden listede önce gelen kural raporlanır. Tüm kuralların başlangıç karakteri
+    biliniyorsa bu karakterlerle ön eleme yapılır ve diğer konumlarda kurallar hiç denenmez.
+    """
+
+    def __init__(self, rules: Sequence[Tuple[str, str]], ignore_case: bool = False):
+        self.rules = [name for name, _ in rules]
+        self.ignore_case = ignore_case
+
+        flags = re.IGNORECASE if ignore_case else 0
+        alternation = "|".join(f"(?P<r{index}>{pattern})" for index, (_, pattern) in enumerate(rules))
+
+        leading_chars = [_leading_char(pattern) for _, pattern in rules]
+        prefilter = ""
+        if rules and all(leading_chars):
+            prefilter = "(?=[" + "".join(re.escape(char) for char in sorted(set(leading_chars))) + "])"
+
+        self.pattern = re.compile(f"{prefilter}(?=(?:{alternation}))", flags) if rules else None
+
+    def finditer(self, text: str) -> Iterator[PatternMatch]:
+        """Tüm kuralların eşleşmelerini metindeki sırayla döndürür - her kural için eşleşmeler çakışmaz"""
+        if self.pattern is None or not text:
+            return
+
+        rule_ends: Dict[int, int] = {}
+        for match in self.pattern.finditer(text):
+            group = match.lastgroup
+            index = int(group[1:])
+            start, end = match.span(group)
+
+            # re.findall gibi: aynı kuralın önceki eşleşmesiyle çakışan eşleşme atlanır
+            if start < rule_ends.get(index, 0):
+                continue
+            rule_ends[index] = end
+            yield PatternMatch(rule=self.rules[index], start=start, end=end, text=text[start:end])
+
+    def findall(self, text: str) -> Dict[str, List[PatternMatch]]:
+        """Kural adına göre gruplanmış eşleşmeler - kurallar tanımlandıkları sırayla"""
+        grouped: Dict[str, List[PatternMatch]] = {}
+        for match in self.finditer(text):
+            grouped.setdefault(match.rule, []).append(match)
+        return {rule: grouped[rule] for rule in self.rules if rule in grouped}
+
+    def first_matches(self, text: str) -> Dict[str, PatternMatch]:
+        """Her kuralın ilk eşleşmesi"""
+        found: Dict[str, PatternMatch] = {}
+        for match in self.finditer(text):
+            found.setdefault(match.rule, match)
+        return found
+
+    def search(self, text: str) -> Optional[PatternMatch]:
+        """Herhangi bir kuralın metindeki ilk eşleşmesi"""
+        return next(self.finditer(text), None)
+
+
+class LiteralMatcher:
+    """Düz metin işaretleri (ör. payload'lar) için eşleştirici - MultiPatternMatcher ile aynı sonuç biçimi
+
+    Az sayıda literal için CPython'un C seviyesindeki alt dizi araması, tüm işaretleri birleştiren
+    düzenli ifadeden belirgin biçimde hızlıdır; bu yüzden her işaret str.find ile aranır.
+    """
+
+    def __init__(self, literals: Sequence[str], ignore_case: bool = False):
+        self.rules = list(dict.fromkeys(literal for literal in literals if literal))
+        self.ignore_case = ignore_case
+        self._needles = [literal.lower() if ignore_case else literal for literal in self.rules]
+
+    def first_matches(self, text: str) -> Dict[str, PatternMatch]:
+        """Metinde geçen her işaretin ilk konumu"""
+        haystack = text.lower() if self.ignore_case else text
+        found: Dict[str, PatternMatch] = {}
+        for rule, needle in zip(self.rules, self._needles):
+            start = haystack.find(needle)
+            if start >= 0:
+                found[rule] = PatternMatch(rule=rule, start=start, end=start + len(needle), text=text[start:start + len(needle)])
+        return found
+
+    def search(self, text: str) -> Optional[PatternMatch]:
+        """Metinde en önce geçen işaret"""
+        return min(self.first_matches(text).values(), key=lambda match: match.start, default=None)
@@ -0,0 +1,147 @@
+"""
+Payload istekleri için paralel gönderim motoru
+Hedef başına eşzamanlılık sınırı, saniyedeki istek sınırı (token bucket) ve sıralı sonuç toplama
+"""
+
+import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+# Hedef (host) başına aynı anda gönderilen en fazla payload isteği
+SCANNER_PAYLOAD_CONCURRENCY = int(os.getenv("SCANNER_PAYLOAD_CONCURRENCY", "10"))
+# Hedef başına saniyede gönderilen en fazla payload isteği (0: sınırsız)
+SCANNER_PAYLOAD_RPS = float(os.getenv("SCANNER_PAYLOAD_RPS", "50"))
+# Bellekte tutulan hedef sınırlayıcısı sayısı bunu aşınca boştaki (kullanılmayan, kovası dolu) sınırlayıcılar silinir
+SCANNER_HOST_LIMITERS_MAX = int(os.getenv("SCANNER_HOST_LIMITERS_MAX", "256"))
+
+
+class TokenBucket:
+    """Saniyedeki istek sayısını sınırlar - kısa süreli patlamalara kova kapasitesi kadar izin verir"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Bir istek hakkı alır; kova boşsa yeni jeton gelene kadar bekler"""
+        if self.rate <= 0:
+            return
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def is_full(self) -> bool:
+        """Kova dolmuş mu - dolu kovayı silip yeniden oluşturmak hız sınırını değiştirmez"""
+        if self.rate <= 0:
+            return True
+        refilled = self.tokens + (time.monotonic() - self.updated) * self.rate
+        return refilled >= self.capacity
+
+
+class HostLimiter:
+    """Tek bir hedefin eşzamanlılık ve istek hızı sınırı"""
+
+    def __init__(self, concurrency: int, rate: float):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.bucket = TokenBucket(rate)
+        # Sınırı tutan veya sırada bekleyen istek sayısı
+        self.active = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        """Eşzamanlılık sınırı içinde yer ve hız sınırı içinde istek hakkı alır"""
+        self.active += 1
+        try:
+            async with self.semaphore:
+                await self.bucket.acquire()
+                yield
+        finally:
+            self.active -= 1
+
+    def is_idle(self) -> bool:
+        return self.active == 0 and self.bucket.is_full()
+
+
+class HostLimiters:
+    """Hedef başına eşzamanlılık ve istek hızı sınırlayıcıları - aynı hosta giden tüm taramalar aynı sınırı paylaşır
+
+    Sınırlayıcılar (host, eşzamanlılık, hız) anahtarıyla tutulur; farklı sınırlarla yapılandırılmış tarayıcılar
+    kendi sınırlayıcılarını alır. asyncio nesneleri olay döngüsüne bağlı olduğundan döngü değişince
+    (ör. worker'da her görev ayrı asyncio.run ile çalışır) sınırlayıcılar yeniden oluşturulur. Uzun yaşayan API
+    sürecinde taranan her host birikmesin diye sınır aşılınca boştaki sınırlayıcılar silinir.
+    """
+
+    def __init__(self, max_entries: int = SCANNER_HOST_LIMITERS_MAX):
+        self.max_entries = max_entries
+        self._limiters: Dict[Tuple[str, int, float], HostLimiter] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get(self, host: str, concurrency: int, rate: float) -> HostLimiter:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._limiters = {}
+            self._loop = loop
+
+        key = (host, concurrency, rate)
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            if len(self._limiters) >= self.max_entries:
+                self._evict_idle()
+            limiter = self._limiters[key] = HostLimiter(concurrency, rate)
+        return limiter
+
+    def _evict_idle(self):
+        """Kullanılmayan ve kovası dolu sınırlayıcıları siler - kullanımdakiler sınırı aşsa da tutulur"""
+        self._limiters = {key: limiter for key, limiter in self._limiters.items() if not limiter.is_idle()}
+
+
+# Süreç genelinde paylaşılan hedef sınırlayıcıları
+shared_host_limiters = HostLimiters()
+
+
+class PayloadFanout:
+    """Payload isteklerini sınırlı paralellikle gönderir; sonuçlar istek sırasıyla döner"""
+
+    def __init__(self, concurrency: int = SCANNER_PAYLOAD_CONCURRENCY, rate: float = SCANNER_PAYLOAD_RPS,
+                 limiters: Optional[HostLimiters] = None):
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        # Verilmezse süreç genelindeki sınırlayıcılar kullanılır - sınır tarama başına değil hedef başınadır
+        self.limiters = limiters or shared_host_limiters
+
+    def _limiter(self, url: str) -> HostLimiter:
+        return self.limiters.get(urlparse(url).netloc, self.concurrency, self.rate)
+
+    async def map(self, requests: List[Tuple[str, Callable[[], Awaitable[Any]]]]) -> List[Any]:
+        """(url, istek fonksiyonu) listesini çalıştırır - hata veren isteğin sonucu istisna nesnesidir"""
+        results: List[Any] = [None] * len(requests)
+
+        async def run_one(index: int, url: str, send: Callable[[], Awaitable[Any]]):
+            async with self._limiter(url).slot():
+                try:
+                    results[index] = await send()
+                except Exception as e:
+                    # Tek bir isteğin hatası diğer istekleri iptal etmez
+                    results[index] = e
+
+        async with asyncio.TaskGroup() as group:
+            for index, (url, send) in enumerate(requests):
+                group.create_task(run_one(index, url, send))
+
+        return results
@@ -0,0 +1,366 @@
+"""
+Harici araç süreç denetleyicisi
+Nmap, nuclei, sqlmap ve nikto süreçleri için genel ve araç başına eşzamanlılık sınırı, kaynak sınırları (rlimit),
+süre dolunca süreç grubunun sonlandırılması, çıktı boyutu sınırı ve süreç başına kaynak kullanımı ölçümü
+"""
+
+import os
+import time
+import signal
+import asyncio
+import logging
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows: rlimit desteklenmez
+    resource = None
+
+# Sınırlar başlatılan sürece prlimit ile uygulanır (Linux) - çok iş parçacıklı süreçte preexec_fn güvenli değildir
+PRLIMIT_SUPPORTED = resource is not None and hasattr(resource, "prlimit")
+
+
+logger = logging.getLogger("guardmesh-process-supervisor")
+
+# Aynı anda çalışabilecek en fazla harici süreç sayısı (süreç başına, tüm araçlar genelinde)
+SCANNER_PROCESS_MAX_TOTAL = int(os.getenv("SCANNER_PROCESS_MAX_TOTAL", "6"))
+
+# Araç başına eşzamanlı süreç sınırı - listede olmayan araçlar yalnızca genel sınıra tabidir
+DEFAULT_PROCESS_LIMITS = {"nmap": 2, "nuclei": 2, "nikto": 2, "sqlmap": 1}
+
+# Süreç başına kaynak sınırları (0: sınırsız) - hiçbiri ayarlanmazsa sınır uygulanmaz
+# CPU süresi aşılınca SIGXCPU, birkaç saniye sonra SIGKILL gelir. Bellek sınırı sanal adres alanına (RLIMIT_AS)
+# uygulanır; büyük sanal alan ayıran Go araçlarında (nuclei) düşük değerler aracın açılmasını engelleyebilir
+SCANNER_PROCESS_CPU_SECONDS = int(os.getenv("SCANNER_PROCESS_CPU_SECONDS", "0"))
+SCANNER_PROCESS_MEMORY_MB = int(os.getenv("SCANNER_PROCESS_MEMORY_MB", "0"))
+SCANNER_PROCESS_MAX_FILES = int(os.getenv("SCANNER_PROCESS_MAX_FILES", "0"))
+
+# communicate() ile toplanan stdout ve stderr için ayrı ayrı tutulan en fazla bayt - fazlası okunup atılır
+SCANNER_PROCESS_OUTPUT_MAX_BYTES = int(os.getenv("SCANNER_PROCESS_OUTPUT_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Kaynak kullanımının /proc üzerinden örneklenme aralığı (saniye)
+SCANNER_PROCESS_SAMPLE_INTERVAL = float(os.getenv("SCANNER_PROCESS_SAMPLE_INTERVAL", "1"))
+
+# Sonlandırılan süreçlere SIGTERM sonrası SIGKILL öncesi tanınan süre (saniye)
+PROCESS_KILL_GRACE_PERIOD = 5
+# CPU sınırında SIGXCPU ile SIGKILL arasındaki süre (saniye)
+CPU_LIMIT_GRACE_SECONDS = 5
+
+READ_CHUNK_SIZE = 65536
+
+
+def _parse_process_limits(value: str) -> Dict[str, int]:
+    """"nmap=2,sqlmap=1" biçimindeki ayarı varsayılanların üzerine uygular"""
+    limits = dict(DEFAULT_PROCESS_LIMITS)
+    for item in value.split(","):
+        name, _, limit = item.partition("=")
+        if name.strip() and limit.strip():
+            limits[name.strip().lower()] = int(limit)
+    return limits
+
+
+SCANNER_PROCESS_LIMITS = _parse_process_limits(os.getenv("SCANNER_PROCESS_LIMITS", ""))
+
+
+class ProcessTimeoutError(Exception):
+    """Süreç süre sınırını aştı ve sonlandırıldı"""
+
+
+@dataclass
+class ResourceLimits:
+    """Başlatılan sürece uygulanan rlimit değerleri - sürecin sonradan başlattığı alt süreçler de devralır"""
+    cpu_seconds: int = SCANNER_PROCESS_CPU_SECONDS
+    memory_mb: int = SCANNER_PROCESS_MEMORY_MB
+    max_files: int = SCANNER_PROCESS_MAX_FILES
+
+    @property
+    def enabled(self) -> bool:
+        return any(value > 0 for value in (self.cpu_seconds, self.memory_mb, self.max_files))
+
+    def apply(self, pid: int):
+        """Sınırları başlatılmış sürece prlimit ile uygular"""
+        if self.cpu_seconds > 0:
+            resource.prlimit(pid, resource.RLIMIT_CPU, (self.cpu_seconds, self.cpu_seconds + CPU_LIMIT_GRACE_SECONDS))
+        if self.memory_mb > 0:
+            limit = self.memory_mb * 1024 * 1024
+            resource.prlimit(pid, resource.RLIMIT_AS, (limit, limit))
+        if self.max_files > 0:
+            _, hard = resource.prlimit(pid, resource.RLIMIT_NOFILE)
+            soft = self.max_files if hard == resource.RLIM_INFINITY else min(self.max_files, hard)
+            resource.prlimit(pid, resource.RLIMIT_NOFILE, (soft, hard))
+
+
+@dataclass
+class ProcessUsage:
+    """Sürecin kaynak kullanımı - CPU ve bellek /proc'tan alınan son örnektir"""
+    tool: str
+    pid: int = 0
+    wait_seconds: float = 0.0  # Eşzamanlılık sınırı için beklenen süre
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0  # Kullanıcı + sistem süresi (beklenmiş alt süreçler dahil)
+    peak_rss_mb: float = 0.0  # VmHWM
+    output_bytes: int = 0  # communicate()/read_capped() ile okunan toplam bayt
+    truncated: bool = False
+    timed_out: bool = False
+    returncode: Optional[int] = None
+
+    def summary(self) -> str:
+        parts = [f"{self.wall_seconds:.1f} sn", f"CPU {self.cpu_seconds:.1f} sn", f"en yüksek bellek {self.peak_rss_mb:.1f} MB"]
+        if self.wait_seconds >= 0.1:
+            parts.append(f"sıra bekleme {self.wait_seconds:.1f} sn")
+        if self.output_bytes:
+            parts.append(f"çıktı {self.output_bytes} bayt" + (" (sınırda kesildi)" if self.truncated else ""))
+        if self.returncode is not None and self.returncode < 0:
+            try:
+                parts.append(f"sinyal {signal.Signals(-self.returncode).name}")
+            except ValueError:
+                parts.append(f"sinyal {-self.returncode}")
+        else:
+            parts.append(f"çıkış kodu {self.returncode}")
+        if self.timed_out:
+            parts.append("süre sınırı aşıldı")
+        return f"{self.tool} (pid={self.pid}): " + ", ".join(parts)
+
+
+class SupervisedProcess:
+    """asyncio süreci üzerinde çıktı sınırlı okuma yapan ince sarmalayıcı"""
+
+    def __init__(self, process: asyncio.subprocess.Process, usage: ProcessUsage, max_output_bytes: int):
+        self.process = process
+        self.usage = usage
+        self.max_output_bytes = max_output_bytes
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    @property
+    def returncode(self) -> Optional[int]:
+        return self.process.returncode
+
+    @property
+    def stdout(self) -> Optional[asyncio.StreamReader]:
+        return self.process.stdout
+
+    @property
+    def stderr(self) -> Optional[asyncio.StreamReader]:
+        return self.process.stderr
+
+    async def wait(self) -> int:
+        return await self.process.wait()
+
+    async def communicate(self) -> Tuple[bytes, bytes]:
+        """stdout ve stderr'i sonuna kadar okur - her biri en fazla max_output_bytes tutulur"""
+        stdout, stderr = await asyncio.gather(self.read_capped(self.stdout), self.read_capped(self.stderr))
+        await self.process.wait()
+        return stdout, stderr
+
+    async def read_capped(self, stream: Optional[asyncio.StreamReader]) -> bytes:
+        """Akışı sonuna kadar okur; sınırı aşan kısım okunup atılır, pipe dolup süreci bloklamaz"""
+        if stream is None:
+            return b""
+
+        chunks: List[bytes] = []
+        kept = 0
+        while True:
+            chunk = await stream.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            self.usage.output_bytes += len(chunk)
+            room = self.max_output_bytes - kept
+            if len(chunk) > room:
+                self.usage.truncated = True
+            if room > 0:
+                chunks.append(chunk[:room])
+                kept += min(room, len(chunk))
+        return b"".join(chunks)
+
+
+class ProcessSupervisor:
+    """Harici araçları sınırlar içinde, kendi süreç gruplarında başlatır ve izler"""
+
+    def __init__(self, max_total: int = SCANNER_PROCESS_MAX_TOTAL, tool_limits: Optional[Dict[str, int]] = None,
+                 limits: Optional[ResourceLimits] = None, max_output_bytes: int = SCANNER_PROCESS_OUTPUT_MAX_BYTES):
+        self.max_total = max(1, max_total)
+        self.tool_limits = SCANNER_PROCESS_LIMITS if tool_limits is None else tool_limits
+        self.limits = limits or ResourceLimits()
+        self.max_output_bytes = max_output_bytes
+        self._running: Counter = Counter()
+        self._waiters: List[Tuple[str, asyncio.Future]] = []
+        if self.limits.enabled and not PRLIMIT_SUPPORTED:
+            logger.warning("Bu platformda prlimit desteklenmiyor, süreç kaynak sınırları uygulanmayacak")
+
+    @asynccontextmanager
+    async def spawn(self, args: List[str], tool: Optional[str] = None, timeout: Optional[float] = None, **kwargs):
+        """Sınır içinde yer açılınca aracı başlatır. timeout saniye dolarsa veya blok iptal/hata ile terk edilirse
+        araç ve başlattığı tüm alt süreçler sonlandırılır; süre aşımında blok bitince ProcessTimeoutError fırlatılır"""
+        tool = (tool or os.path.basename(args[0])).lower()
+        usage = ProcessUsage(tool=tool)
+
+        queued_at = time.monotonic()
+        await self._acquire(tool)
+        usage.wait_seconds = time.monotonic() - queued_at
+
+        process = None
+        watchers: List[asyncio.Task] = []
+        started_at = time.monotonic()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *args,
+                stdout=kwargs.pop("stdout", asyncio.subprocess.PIPE),
+                stderr=kwargs.pop("stderr", asyncio.subprocess.PIPE),
+                start_new_session=True,
+                **kwargs
+            )
+            usage.pid = process.pid
+            if self.limits.enabled:
+                self._apply_limits(process, tool)
+
+            watchers.append(asyncio.create_task(self._sample_usage(process, usage)))
+            if timeout:
+                watchers.append(asyncio.create_task(self._enforce_deadline(process, usage, timeout)))
+
+            try:
+                yield SupervisedProcess(process, usage, self.max_output_bytes)
+            except Exception as e:
+                if usage.timed_out:
+                    raise ProcessTimeoutError(f"{tool} {timeout} sn süre sınırını aştı, süreç sonlandırıldı") from e
+                raise
+
+        finally:
+            for watcher in watchers:
+                watcher.cancel()
+            await asyncio.gather(*watchers, return_exceptions=True)
+            if process is not None:
+                if process.returncode is None:
+                    await self._terminate_process_group(process, tool)
+                usage.returncode = process.returncode
+            usage.wall_seconds = time.monotonic() - started_at
+            self._release(tool)
+
+        if usage.timed_out:
+            raise ProcessTimeoutError(f"{tool} {timeout} sn süre sınırını aştı, süreç sonlandırıldı")
+
+    def stats(self) -> Dict[str, object]:
+        """Çalışan ve sıra bekleyen süreç sayıları"""
+        return {
+            "running": sum(self._running.values()),
+            "waiting": len(self._waiters),
+            "max_total": self.max_total,
+            "by_tool": dict(self._running)
+        }
+
+    def _can_start(self, tool: str) -> bool:
+        limit = self.tool_limits.get(tool)
+        return sum(self._running.values()) < self.max_total and (limit is None or self._running[tool] < limit)
+
+    async def _acquire(self, tool: str):
+        """Genel ve araç sınırı içinde yer bekler - sırası gelen aracın sınırı doluysa arkasındakiler öne geçebilir"""
+        waiter = (tool, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        self._dispatch()
+
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter[1].done() and not waiter[1].cancelled():
+                self._release(tool)
+            raise
+
+    def _release(self, tool: str):
+        self._running[tool] -= 1
+        if self._running[tool] <= 0:
+            del self._running[tool]
+        self._dispatch()
+
+    def _dispatch(self):
+        """Bekleyenlerden sınırı uygun olanları geliş sırasıyla başlatır"""
+        for waiter in list(self._waiters):
+            tool, future = waiter
+            if future.done():
+                self._waiters.remove(waiter)
+                continue
+            if self._can_start(tool):
+                self._waiters.remove(waiter)
+                self._running[tool] += 1
+                future.set_result(None)
+
+    def _apply_limits(self, process: asyncio.subprocess.Process, tool: str):
+        """Kaynak sınırlarını başlatılan sürece uygular - süreç çoktan çıkmışsa veya izin yoksa yalnızca loglanır"""
+        if not PRLIMIT_SUPPORTED:
+            return
+        try:
+            self.limits.apply(process.pid)
+        except (OSError, ValueError) as e:
+            logger.warning(f"{tool} (pid={process.pid}) kaynak sınırları uygulanamadı: {e}")
+
+    async def _enforce_deadline(self, process: asyncio.subprocess.Process, usage: ProcessUsage, timeout: float):
+        await asyncio.sleep(timeout)
+        if process.returncode is None:
+            usage.timed_out = True
+            logger.warning(f"{usage.tool} (pid={process.pid}) {timeout} sn süre sınırını aştı")
+            await self._terminate_process_group(process, usage.tool)
+
+    async def _sample_usage(self, process: asyncio.subprocess.Process, usage: ProcessUsage):
+        """Süreç çalıştıkça CPU süresini ve en yüksek belleği /proc'tan okur (Linux dışında ölçüm yapılmaz)"""
+        while process.returncode is None:
+            sample = _read_proc_usage(process.pid)
+            if sample is None:
+                return
+            usage.cpu_seconds, peak_rss_mb = sample
+            usage.peak_rss_mb = max(usage.peak_rss_mb, peak_rss_mb)
+            await asyncio.sleep(SCANNER_PROCESS_SAMPLE_INTERVAL)
+
+    async def _terminate_process_group(self, process: asyncio.subprocess.Process, tool: str):
+        """Süreç grubuna önce SIGTERM, süre dolarsa SIGKILL gönderir"""
+        logger.warning(f"{tool}: harici süreç sonlandırılıyor (pid={process.pid})")
+
+        def _signal_group(sig):
+            try:
+                if hasattr(os, "killpg"):
+                    os.killpg(process.pid, sig)
+                else:
+                    process.send_signal(sig)
+            except ProcessLookupError:
+                pass
+
+        _signal_group(signal.SIGTERM)
+        try:
+            await asyncio.wait_for(process.wait(), timeout=PROCESS_KILL_GRACE_PERIOD)
+        except asyncio.TimeoutError:
+            pass
+
+        # Lider süreç çıkmış olsa bile gruptaki artakalan alt süreçleri de temizle
+        _signal_group(getattr(signal, "SIGKILL", signal.SIGTERM))
+        await process.wait()
+
+
+def _read_proc_usage(pid: int) -> Optional[Tuple[float, float]]:
+    """/proc/<pid> üzerinden (CPU süresi sn, en yüksek RSS MB); okunamazsa None"""
+    try:
+        with open(f"/proc/{pid}/stat") as stat_file:
+            # Süreç adı boşluk içerebilir; alanlar son ')' karakterinden sonra başlar
+            fields = stat_file.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/status") as status_file:
+            status = status_file.read()
+    except (OSError, IndexError):
+        return None
+
+    ticks = os.sysconf("SC_CLK_TCK")
+    # utime, stime, cutime, cstime: stat dosyasının 14-17. alanları
+    cpu_seconds = sum(int(value) for value in fields[11:15]) / ticks
+    peak_rss_mb = 0.0
+    for line in status.splitlines():
+        if line.startswith("VmHWM:"):
+            peak_rss_mb = int(line.split()[1]) / 1024
+            break
+    return cpu_seconds, peak_rss_mb
+
+
+# Süreç genelinde paylaşılan denetleyici - sınırlar tüm tarayıcılar için ortaktır
+process_supervisor = ProcessSupervisor()
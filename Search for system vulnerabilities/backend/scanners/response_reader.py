@@ -0,0 +1,111 @@
+"""
+Akışlı yanıt okuyucu
+Yanıt gövdesini parça parça okuyup yansıyan işaretleri arar; işaret bulunduğunda veya bayt sınırına gelindiğinde okumayı bırakır
+"""
+
+import os
+import codecs
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import aiohttp
+
+from .pattern_matcher import LiteralMatcher
+
+
+# Yansıma kontrolünde yanıt başına okunan en fazla bayt ve okuma parçası boyutu
+SCANNER_REFLECTION_MAX_BYTES = int(os.getenv("SCANNER_REFLECTION_MAX_BYTES", str(1024 * 1024)))
+SCANNER_REFLECTION_CHUNK_SIZE = int(os.getenv("SCANNER_REFLECTION_CHUNK_SIZE", str(64 * 1024)))
+# İşaret başına kaydedilen en fazla yansıma bağlamı
+MAX_MARKER_CONTEXTS = 5
+
+
+@dataclass
+class ReflectionScan:
+    """Akışlı arama sonucu - bulunan işaretler ve gövdedeki karakter konumları"""
+    matches: Dict[str, int] = field(default_factory=dict)
+    bytes_read: int = 0
+    truncated: bool = False  # Bayt sınırına gelindi, gövdenin geri kalanı okunmadı
+    # context_chars verildiyse her yansımadan önceki metin (işaret başına en fazla MAX_MARKER_CONTEXTS)
+    contexts: Dict[str, List[str]] = field(default_factory=dict)
+
+
+async def scan_response_for_markers(response: aiohttp.ClientResponse, matcher: LiteralMatcher,
+                                    max_bytes: int = SCANNER_REFLECTION_MAX_BYTES,
+                                    chunk_size: int = SCANNER_REFLECTION_CHUNK_SIZE,
+                                    find_all: bool = False, context_chars: int = 0) -> ReflectionScan:
+    """Yanıt gövdesinde işaretleri parça parça arar
+
+    Parça sınırına denk gelen işaretleri kaçırmamak için önceki parçanın son (en uzun işaret - 1)
+    karakteri bir sonraki parçanın başına eklenir. Bellekte aynı anda en fazla bir parça ve bu örtüşme
+    tutulur. find_all False ise ilk işaret bulununca, True ise tüm işaretler bulununca okuma biter.
+    context_chars verilirse her yansımanın önündeki en fazla o kadar karakter de kaydedilir; bu durumda
+    ilk eşleşmede durulmaz, gövde (bayt sınırına kadar) sonuna dek okunur.
+    """
+    scan = ReflectionScan()
+    if not matcher.rules:
+        return scan
+
+    # Parça sınırındaki işaretler ve bağlam için bir önceki pencereden taşınan karakter sayısı
+    overlap = max(max(len(rule) for rule in matcher.rules) - 1, context_chars)
+    seen_until: Dict[str, int] = {}
+    decoder = codecs.getincrementaldecoder(_response_charset(response))(errors="replace")
+    tail = ""
+    tail_offset = 0  # tail'in gövdedeki karakter konumu
+
+    async for chunk in response.content.iter_chunked(chunk_size):
+        if scan.bytes_read + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - scan.bytes_read]
+            scan.truncated = True
+        scan.bytes_read += len(chunk)
+
+        window = tail + decoder.decode(chunk, final=scan.truncated)
+        for rule, match in matcher.first_matches(window).items():
+            scan.matches.setdefault(rule, tail_offset + match.start)
+        if context_chars:
+            _collect_contexts(scan, window, tail_offset, seen_until, context_chars)
+
+        if not context_chars and scan.matches and (not find_all or len(scan.matches) == len(matcher.rules)):
+            break
+        if context_chars and all(len(scan.contexts.get(rule, ())) >= MAX_MARKER_CONTEXTS for rule in matcher.rules):
+            break
+        if scan.truncated:
+            break
+
+        keep = min(overlap, len(window))
+        tail_offset += len(window) - keep
+        tail = window[len(window) - keep:] if keep else ""
+    else:
+        # Gövde bitti: kod çözücüde kalan eksik bayt dizisi de değerlendirilir
+        window = tail + decoder.decode(b"", final=True)
+        for rule, match in matcher.first_matches(window).items():
+            scan.matches.setdefault(rule, tail_offset + match.start)
+        if context_chars:
+            _collect_contexts(scan, window, tail_offset, seen_until, context_chars)
+
+    return scan
+
+
+def _collect_contexts(scan: ReflectionScan, window: str, window_offset: int, seen_until: Dict[str, int],
+                      context_chars: int):
+    """Penceredeki yeni yansımaların önündeki metni kaydeder - örtüşmede tekrar görülenler atlanır"""
+    for rule in scan.matches:
+        contexts = scan.contexts.setdefault(rule, [])
+        start = max(0, seen_until.get(rule, 0) - window_offset)
+        while len(contexts) < MAX_MARKER_CONTEXTS:
+            position = window.find(rule, start)
+            if position < 0:
+                break
+            contexts.append(window[max(0, position - context_chars):position])
+            start = position + len(rule)
+            seen_until[rule] = window_offset + start
+
+
+def _response_charset(response: aiohttp.ClientResponse) -> str:
+    """Yanıtın karakter kodlaması - bilinmiyor veya geçersizse utf-8"""
+    charset = response.charset or "utf-8"
+    try:
+        codecs.lookup(charset)
+    except LookupError:
+        return "utf-8"
+    return charset
@@ -12,16 +12,17 @@ import logging
 import re
 
 from .base_scanner import BaseScanner, ScanResult, Vulnerability
+from .http_client import ScannerHTTPClient
 
 class ShodanScanner(BaseScanner):
     """Shodan API kullanarak internet intelligence taraması yapan tarayıcı"""
     
-    def __init__(self, config: Dict[str, Any] = None):
-        super().__init__("Shodan Scanner", config)
+    def __init__(self, config: Dict[str, Any] = None, http_client: Optional[ScannerHTTPClient] = None):
+        super().__init__("Shodan Scanner", config, http_client)
         
         # Shodan API konfigürasyonu
         self.api_key = config.get("shodan_api_key", "") if config else ""
-        self.api_base_url = "https://api.shodan.io"
+        self.api_base_url = config.get("shodan_api_url", "https://api.shodan.io") if config else "https://api.shodan.io"
         
         # API endpoint'leri
         self.endpoints = {
@@ -115,38 +116,36 @@ class ShodanScanner(BaseScanner):
     async def _get_host_information(self, result: ScanResult, hostname: str):
         """Shodan'dan host bilgilerini alır"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.api_base_url}{self.endpoints['host'].format(hostname)}"
-                params = {"key": self.api_key}
-                
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        host_data = await response.json()
-                        await self._process_host_data(result, host_data, hostname)
-                    else:
-                        self.add_scan_log(result, f"Host bilgisi alınamadı: HTTP {response.status}", "warning")
-                        
+            url = f"{self.api_base_url}{self.endpoints['host'].format(hostname)}"
+            params = {"key": self.api_key}
+            
+            async with self.http.get(url, params=params) as response:
+                if response.status == 200:
+                    host_data = await response.json()
+                    await self._process_host_data(result, host_data, hostname)
+                else:
+                    self.add_scan_log(result, f"Host bilgisi alınamadı: HTTP {response.status}", "warning")
+                    
         except Exception as e:
             self.add_scan_log(result, f"Host bilgisi alma hatası: {e}", "error")
     
     async def _search_host_information(self, result: ScanResult, hostname: str):
         """Shodan'da host araması yapar"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.api_base_url}{self.endpoints['search']}"
-                params = {
-                    "key": self.api_key,
-                    "query": f"hostname:{hostname}",
-                    "facets": "port,product,os"
-                }
-                
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        search_data = await response.json()
-                        await self._process_search_data(result, search_data, hostname)
-                    else:
-                        self.add_scan_log(result, f"Search sonucu alınamadı: HTTP {response.status}", "warning")
-                        
+            url = f"{self.api_base_url}{self.endpoints['search']}"
+            params = {
+                "key": self.api_key,
+                "query": f"hostname:{hostname}",
+                "facets": "port,product,os"
+            }
+            
+            async with self.http.get(url, params=params) as response:
+                if response.status == 200:
+                    search_data = await response.json()
+                    await self._process_search_data(result, search_data, hostname)
+                else:
+                    self.add_scan_log(result, f"Search sonucu alınamadı: HTTP {response.status}", "warning")
+                    
         except Exception as e:
             self.add_scan_log(result, f"Search hatası: {e}", "error")
     
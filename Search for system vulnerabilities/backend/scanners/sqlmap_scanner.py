@@ -3,7 +3,9 @@ SQLMap SQL Injection Tarayıcısı
 SQL Injection güvenlik açıklarını tespit eder
 """
 
+import os
 import asyncio
+import tempfile
 import subprocess
 import json
 import re
@@ -12,12 +14,13 @@ from datetime import datetime
 import logging
 
 from .base_scanner import BaseScanner, ScanResult, Vulnerability
+from .http_client import ScannerHTTPClient
 
 class SQLMapScanner(BaseScanner):
     """SQLMap kullanarak SQL Injection güvenlik açıklarını tespit eden tarayıcı"""
     
-    def __init__(self, config: Dict[str, Any] = None):
-        super().__init__("SQLMap Scanner", config)
+    def __init__(self, config: Dict[str, Any] = None, http_client: Optional[ScannerHTTPClient] = None):
+        super().__init__("SQLMap Scanner", config, http_client)
         self.sqlmap_path = config.get("sqlmap_path", "sqlmap") if config else "sqlmap"
         
         # SQLMap tarama seçenekleri
@@ -70,12 +73,18 @@ class SQLMapScanner(BaseScanner):
                 result.error_message = "Pre-scan kontrolleri başarısız"
                 return result
             
-            # SQLMap komutunu oluştur
-            sqlmap_args = self._build_sqlmap_command(target_url, scan_type, techniques, options)
-            self.add_scan_log(result, f"SQLMap komutu: {' '.join(sqlmap_args)}")
-            
-            # SQLMap taramasını çalıştır
-            scan_output = await self._run_sqlmap_scan(sqlmap_args)
+            # Keşif envanteri varsa parametreli URL'ler ve formlu sayfalar tek çalıştırmada test edilir (-m)
+            targets_file = self._write_targets_file(target_url, options.get("inventory"))
+            try:
+                # SQLMap komutunu oluştur
+                sqlmap_args = self._build_sqlmap_command(target_url, scan_type, techniques, options, targets_file)
+                self.add_scan_log(result, f"SQLMap komutu: {' '.join(sqlmap_args)}")
+                
+                # SQLMap taramasını çalıştır
+                scan_output = await self._run_sqlmap_scan(sqlmap_args, result)
+            finally:
+                if targets_file:
+                    os.unlink(targets_file)
             
             # Sonuçları parse et
             await self._parse_sqlmap_results(result, scan_output, target_url)
@@ -97,12 +106,30 @@ class SQLMapScanner(BaseScanner):
         
         return result
     
-    def _build_sqlmap_command(self, target_url: str, scan_type: str, techniques: List[str], options: Dict[str, Any]) -> List[str]:
+    def _write_targets_file(self, target_url: str, inventory) -> Optional[str]:
+        """Envanterdeki test edilecek URL'leri sqlmap'in -m seçeneği için dosyaya yazar; tek hedef varsa None"""
+        if inventory is None:
+            return None
+        
+        urls = [target_url] + inventory.parameterized_urls + [form.page_url for form in inventory.forms]
+        urls = list(dict.fromkeys(urls))
+        if len(urls) <= 1:
+            return None
+        
+        with tempfile.NamedTemporaryFile("w", prefix="sqlmap_targets_", suffix=".txt", delete=False) as targets_file:
+            targets_file.write("\n".join(urls) + "\n")
+        return targets_file.name
+    
+    def _build_sqlmap_command(self, target_url: str, scan_type: str, techniques: List[str], options: Dict[str, Any],
+                              targets_file: Optional[str] = None) -> List[str]:
         """SQLMap komutunu oluşturur"""
         base_args = [self.sqlmap_path]
         
-        # Target URL
-        base_args.extend(["-u", target_url])
+        # Target URL (keşif envanteri varsa hedef listesi)
+        if targets_file:
+            base_args.extend(["-m", targets_file])
+        else:
+            base_args.extend(["-u", target_url])
         
         # Scan type seçenekleri
         if scan_type in self.scan_types:
@@ -112,8 +139,9 @@ class SQLMapScanner(BaseScanner):
         if techniques:
             base_args.extend(["--technique", "".join(techniques)])
         
-        # Form alanları
-        if options.get("forms"):
+        # Form alanları (keşifte form bulunduysa formlar da test edilir)
+        inventory = options.get("inventory")
+        if options.get("forms") or (inventory is not None and inventory.forms):
             base_args.append("--forms")
         
         # Crawl
@@ -132,16 +160,12 @@ class SQLMapScanner(BaseScanner):
         
         return base_args
     
-    async def _run_sqlmap_scan(self, sqlmap_args: List[str]) -> str:
+    async def _run_sqlmap_scan(self, sqlmap_args: List[str], result: ScanResult) -> str:
         """SQLMap taramasını çalıştırır"""
         try:
-            process = await asyncio.create_subprocess_exec(
-                *sqlmap_args,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
+            # Süreç iptal edildiğinde süreç grubu ile birlikte sonlandırılır
+            async with self.spawn_process(sqlmap_args, tool="sqlmap", results=[result]) as process:
+                stdout, stderr = await process.communicate()
             
             if process.returncode != 0 and process.returncode != 1:  # SQLMap başarısız taramalarda 1 döner
                 raise Exception(f"SQLMap hatası: {stderr.decode()}")
@@ -3,21 +3,153 @@ XSS (Cross-Site Scripting) Tarayıcısı
 Manuel payload testleri ve otomatik tespit
 """
 
+import os
 import asyncio
-import aiohttp
-import re
-from typing import List, Dict, Any, Optional
+import secrets
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Set, Tuple, Union
 from urllib.parse import urljoin, urlparse, parse_qs, urlencode
-from bs4 import BeautifulSoup
 import logging
 
 from .base_scanner import BaseScanner, ScanResult, Vulnerability
+from .http_client import ScannerHTTPClient
+from .html_analysis import PageForm, get_html_parser, SCANNER_HTML_PARSER
+from .crawler import EndpointInventory
+from .pattern_matcher import LiteralMatcher, MultiPatternMatcher
+from .response_reader import scan_response_for_markers, SCANNER_REFLECTION_MAX_BYTES
+from .payload_fanout import PayloadFanout, SCANNER_PAYLOAD_CONCURRENCY, SCANNER_PAYLOAD_RPS
+
+# Payload göndermeden önce her parametreye zararsız bir canary gönderilir; yalnızca yansıyan parametreler test edilir
+SCANNER_XSS_CANARY = os.getenv("SCANNER_XSS_CANARY", "true").lower() in ("1", "true", "yes")
+# Yansıma bağlamı belirlenirken canary'nin önünde incelenen karakter sayısı
+REFLECTION_CONTEXT_CHARS = 2048
+# Aynı form/URL'deki parametreler tek istekte, her birine ayrı etiketli değer yerleştirilerek test edilir
+SCANNER_XSS_PROBE_PACKING = os.getenv("SCANNER_XSS_PROBE_PACKING", "true").lower() in ("1", "true", "yes")
+SCANNER_XSS_PACK_SIZE = int(os.getenv("SCANNER_XSS_PACK_SIZE", "20"))  # İstek başına en fazla parametre
+# Paketlenmiş payload'larda yansımanın hangi parametreye ait olduğunu ayırt etmek için etiketle değiştirilen metin
+PAYLOAD_TAG_PLACEHOLDER = "XSS"
+
+@dataclass
+class PageSnapshot:
+    """Tarama boyunca bir kez indirilip bir kez ayrıştırılan sayfa - tüm analiz aşamaları bunu kullanır"""
+    url: str
+    status: int
+    headers: Dict[str, str]
+    content: str
+    parsed: bool = False
+    forms: List[PageForm] = field(default_factory=list)
+    scripts: List[str] = field(default_factory=list)
+    event_handlers: List[Tuple[str, str, str]] = field(default_factory=list)  # (tag, attribute, değer)
+
+@dataclass
+class XSSProbe:
+    """Tek bir payload isteği ve yansıtılırsa oluşturulacak bulgunun bilgileri"""
+    method: str
+    url: str
+    payload: str
+    title: str
+    description: str
+    evidence: str
+    data: Optional[Dict[str, str]] = None
+
+@dataclass
+class InjectionPoint:
+    """Payload yerleştirilecek tek parametre - form alanı veya URL parametresi"""
+    method: str
+    url: str  # GET'te sorgu dizesi olmadan adres, POST'ta form adresi
+    name: str
+    title: str
+    description: str
+    evidence_label: str
+    params: Dict[str, List[str]] = field(default_factory=dict)  # GET'te korunan diğer parametreler
+    max_payloads: int = 3  # Canary ön elemesi kapalıyken gönderilecek payload sayısı
+    
+    def probe(self, payload: str, context: Optional[str] = None) -> XSSProbe:
+        """Değeri bu parametreye yerleştiren istek"""
+        if self.method == "post":
+            url, data = self.url, {self.name: payload}
+        else:
+            params = dict(self.params)
+            params[self.name] = [payload]
+            url, data = f"{self.url}?{urlencode(params, doseq=True)}", None
+        
+        evidence = f"{self.evidence_label}: {self.name}, Payload: {payload}"
+        if context:
+            evidence += f", Context: {context}"
+        return XSSProbe(method=self.method, url=url, payload=payload, data=data, title=self.title,
+                        description=self.description, evidence=evidence)
+    
+    @property
+    def pack_key(self) -> Tuple[str, str, str, str]:
+        """Aynı isteğe paketlenebilecek noktaları gruplayan anahtar - yöntem, adres ve korunan parametreler"""
+        return (self.method, self.url, self.title, urlencode(self.params, doseq=True))
+
+@dataclass
+class PackedProbe:
+    """Birden fazla parametreye aynı anda, her birine ayrı değer yerleştiren tek istek"""
+    method: str
+    url: str
+    values: List[str]
+    data: Optional[Dict[str, str]] = None
+    
+    @classmethod
+    def build(cls, points: List[InjectionPoint], values: List[str]) -> "PackedProbe":
+        """Her noktaya kendi değerini yerleştirir - noktalar aynı pack_key'e sahip olmalıdır"""
+        first = points[0]
+        if first.method == "post":
+            return cls(method="post", url=first.url, values=values,
+                       data={point.name: value for point, value in zip(points, values)})
+        
+        params = dict(first.params)
+        for point, value in zip(points, values):
+            params[point.name] = [value]
+        return cls(method="get", url=f"{first.url}?{urlencode(params, doseq=True)}", values=values)
+
+@dataclass
+class PackedEntry:
+    """Paketlenmiş istekteki tek parametrenin payload'ı ve yansımayı ona atfeden etiket"""
+    point: InjectionPoint
+    probe: XSSProbe  # Pakette gönderilen etiketli payload
+    canonical: XSSProbe  # Etiketsiz payload - bulguda kaydedilir, paket başarısızsa tek başına bu gönderilir
+    tag: str
+
+def tag_payload(payload: str, tag: str) -> Optional[str]:
+    """Payload'daki yer tutucuyu parametreye özgü etiketle değiştirir - yer tutucu yoksa None"""
+    if PAYLOAD_TAG_PLACEHOLDER not in payload:
+        return None
+    return payload.replace(PAYLOAD_TAG_PLACEHOLDER, tag)
+
+def reflection_context(prefix: str) -> str:
+    """Yansımanın önündeki metne göre bağlam: script, attribute veya html"""
+    lower = prefix.lower()
+    if lower.rfind("<script") > lower.rfind("</script"):
+        return "script"
+    if prefix.rfind("<") > prefix.rfind(">"):
+        return "attribute"
+    return "html"
 
 class XSSScanner(BaseScanner):
     """XSS güvenlik açıklarını tespit eden tarayıcı"""
     
-    def __init__(self, config: Dict[str, Any] = None):
-        super().__init__("XSS Scanner", config)
+    def __init__(self, config: Dict[str, Any] = None, http_client: Optional[ScannerHTTPClient] = None):
+        super().__init__("XSS Scanner", config, http_client)
+        
+        # Payload istekleri hedef başına sınırlı paralellik ve saniyedeki istek sınırıyla gönderilir;
+        # sınırlar süreç genelinde paylaşılır, aynı hosta giden eşzamanlı taramalar toplamda sınırı aşmaz
+        self.payload_concurrency = int(self.config.get("payload_concurrency", SCANNER_PAYLOAD_CONCURRENCY))
+        self.payload_rps = float(self.config.get("payload_rps", SCANNER_PAYLOAD_RPS))
+        self.fanout = PayloadFanout(self.payload_concurrency, self.payload_rps)
+        
+        # Yansıma kontrolünde yanıt başına okunan en fazla bayt - büyük yanıtlar belleğe tamamen alınmaz
+        self.reflection_max_bytes = int(self.config.get("reflection_max_bytes", SCANNER_REFLECTION_MAX_BYTES))
+        
+        # Canary ön elemesi ve çok parametreli istek paketleme
+        self.canary_prefilter = bool(self.config.get("canary_prefilter", SCANNER_XSS_CANARY))
+        self.probe_packing = bool(self.config.get("probe_packing", SCANNER_XSS_PROBE_PACKING))
+        self.pack_size = max(1, int(self.config.get("pack_size", SCANNER_XSS_PACK_SIZE)))
+        
+        # Sayfa ayrıştırıcısı (lxml veya bs4)
+        self.html_parser = get_html_parser(self.config.get("html_parser", SCANNER_HTML_PARSER))
         
         # XSS payload'ları
         self.xss_payloads = [
@@ -41,9 +173,36 @@ class XSSScanner(BaseScanner):
             
             # DOM XSS
             "javascript:alert(document.cookie)",
-            "data:text/html,<script>alert('XSS')</script>"
+            "data:text/html,<script>alert('XSS')</script>",
+            
+            # Context breakout
+            "\"><svg onload=alert('XSS')>",
+            "';alert('XSS');//",
+            "\";alert('XSS');//",
+            "</script><script>alert('XSS')</script>"
         ]
         
+        # Canary'nin yansıdığı bağlama göre gönderilecek payload'lar
+        self.context_payloads = {
+            "html": [
+                "<script>alert('XSS')</script>",
+                "<img src=x onerror=alert('XSS')>",
+                "<svg onload=alert('XSS')>",
+                "<ScRiPt>alert('XSS')</ScRiPt>"
+            ],
+            "attribute": [
+                "\" onfocus=\"alert('XSS')\" \"",
+                "' onmouseover='alert(\"XSS\")' '",
+                "\"><svg onload=alert('XSS')>",
+                "javascript:alert('XSS')"
+            ],
+            "script": [
+                "';alert('XSS');//",
+                "\";alert('XSS');//",
+                "</script><script>alert('XSS')</script>"
+            ]
+        }
+        
         # Form field patterns
         self.form_patterns = [
             r'<input[^>]*name=["\']([^"\']+)["\'][^>]*>',
@@ -60,6 +219,21 @@ class XSSScanner(BaseScanner):
             r'<object[^>]*>',
             r'<embed[^>]*>'
         ]
+        
+        # DOM manipülasyonu kalıpları
+        self.dom_xss_patterns = [
+            r'document\.write\s*\([^)]*\)',
+            r'document\.writeln\s*\([^)]*\)',
+            r'innerHTML\s*=',
+            r'outerHTML\s*=',
+            r'eval\s*\([^)]*\)',
+            r'setTimeout\s*\([^)]*\)',
+            r'setInterval\s*\([^)]*\)'
+        ]
+        
+        # Kalıplar bir kez derlenir; her içerik tek geçişte taranır
+        self.xss_rules = MultiPatternMatcher([(pattern, pattern) for pattern in self.xss_patterns], ignore_case=True)
+        self.dom_xss_rules = MultiPatternMatcher([(pattern, pattern) for pattern in self.dom_xss_patterns], ignore_case=True)
     
     async def validate_target(self, target_url: str) -> bool:
         """Hedef URL'nin geçerli olup olmadığını kontrol eder"""
@@ -90,20 +264,29 @@ class XSSScanner(BaseScanner):
                 result.error_message = "Pre-scan kontrolleri başarısız"
                 return result
             
+            # Sayfayı bir kez indir ve ayrıştır - tüm aşamalar aynı görüntüyü kullanır
+            page = await self._fetch_page_snapshot(result, target_url)
+            
             # Ana sayfayı analiz et
-            await self._analyze_main_page(result, target_url)
+            await self._analyze_main_page(result, page)
+            
+            # Keşif envanteri varsa sitedeki tüm formlar ve parametreli URL'ler test edilir
+            inventory = options.get("inventory")
+            if inventory is not None:
+                self.add_scan_log(result, f"Keşif envanteri kullanılıyor: {inventory.summary()}")
             
             # Form alanlarını bul ve test et
-            await self._test_form_fields(result, target_url)
+            await self._test_form_fields(result, page, inventory)
             
             # URL parametrelerini test et
-            await self._test_url_parameters(result, target_url)
+            target_urls = inventory.parameterized_urls if inventory is not None else [target_url]
+            await self._test_url_parameters(result, target_urls)
             
             # Reflected XSS testleri
             await self._test_reflected_xss(result, target_url)
             
             # DOM XSS testleri
-            await self._test_dom_xss(result, target_url)
+            await self._test_dom_xss(result, page)
             
             # Sonuçları sırala
             result.vulnerabilities = self.sort_vulnerabilities(result.vulnerabilities)
@@ -122,155 +305,360 @@ class XSSScanner(BaseScanner):
         
         return result
     
-    async def _analyze_main_page(self, result: ScanResult, target_url: str):
+    async def _fetch_page_snapshot(self, result: ScanResult, target_url: str) -> Optional[PageSnapshot]:
+        """Hedef sayfayı indirir; başarılıysa formları, script'leri ve event handler'ları tek ayrıştırmada çıkarır"""
+        try:
+            async with self.http.get(target_url) as response:
+                page = PageSnapshot(
+                    url=target_url,
+                    status=response.status,
+                    headers=dict(response.headers),
+                    content=await response.text()
+                )
+        except Exception as e:
+            self.add_scan_log(result, f"Ana sayfa indirme hatası: {e}", "error")
+            return None
+        
+        if page.status != 200:
+            self.add_scan_log(result, f"Ana sayfa yüklenemedi: HTTP {page.status}", "warning")
+            return page
+        
+        # Büyük sayfalarda ayrıştırma olay döngüsünü bloklamasın diye ayrı thread'de yapılır
+        analysis = await asyncio.to_thread(self.html_parser.parse, page.content)
+        page.forms = analysis.forms
+        page.scripts = analysis.scripts
+        page.event_handlers = analysis.event_handlers
+        page.parsed = True
+        
+        return page
+    
+    async def _analyze_main_page(self, result: ScanResult, page: Optional[PageSnapshot]):
         """Ana sayfayı analiz eder ve potansiyel XSS açıklarını arar"""
+        if page is None or not page.parsed:
+            return
+        
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(target_url) as response:
-                    if response.status == 200:
-                        content = await response.text()
-                        await self._check_content_for_xss(result, content, target_url)
-                    else:
-                        self.add_scan_log(result, f"Ana sayfa yüklenemedi: HTTP {response.status}", "warning")
+            await self._check_content_for_xss(result, page)
         except Exception as e:
             self.add_scan_log(result, f"Ana sayfa analizi hatası: {e}", "error")
     
-    async def _check_content_for_xss(self, result: ScanResult, content: str, url: str):
+    async def _check_content_for_xss(self, result: ScanResult, page: PageSnapshot):
         """HTML içeriğinde XSS açıkları arar"""
-        soup = BeautifulSoup(content, 'html.parser')
-        
         # Script tag'leri kontrol et
-        scripts = soup.find_all('script')
-        for script in scripts:
-            if script.string:
-                for pattern in self.xss_patterns:
-                    if re.search(pattern, script.string, re.IGNORECASE):
-                        vuln = Vulnerability(
-                            title="Potansiyel XSS - Script Tag",
-                            description=f"Script tag içinde potansiyel XSS kodu tespit edildi",
-                            severity="medium",
-                            location=url,
-                            evidence=script.string[:100] + "..." if len(script.string) > 100 else script.string
-                        )
-                        self.add_vulnerability(result, vuln)
-        
-        # Event handler'ları kontrol et
-        for tag in soup.find_all(attrs=lambda x: any(attr.startswith('on') for attr in x.keys())):
-            event_attrs = [attr for attr in tag.attrs.keys() if attr.startswith('on')]
-            for attr in event_attrs:
+        for script in page.scripts:
+            for rule in self.xss_rules.findall(script):
                 vuln = Vulnerability(
-                    title="Potansiyel XSS - Event Handler",
-                    description=f"HTML tag'inde event handler tespit edildi: {attr}",
+                    title="Potansiyel XSS - Script Tag",
+                    description=f"Script tag içinde potansiyel XSS kodu tespit edildi",
                     severity="medium",
-                    location=url,
-                    evidence=f"<{tag.name} {attr}=\"{tag[attr]}\">"
+                    location=page.url,
+                    evidence=script[:100] + "..." if len(script) > 100 else script
                 )
                 self.add_vulnerability(result, vuln)
+        
+        # Event handler'ları kontrol et
+        for tag_name, attr, value in page.event_handlers:
+            vuln = Vulnerability(
+                title="Potansiyel XSS - Event Handler",
+                description=f"HTML tag'inde event handler tespit edildi: {attr}",
+                severity="medium",
+                location=page.url,
+                evidence=f"<{tag_name} {attr}=\"{value}\">"
+            )
+            self.add_vulnerability(result, vuln)
     
-    async def _test_form_fields(self, result: ScanResult, target_url: str):
-        """Form alanlarını bulur ve XSS payload'ları ile test eder"""
+    async def _test_form_fields(self, result: ScanResult, page: Optional[PageSnapshot], inventory: Optional[EndpointInventory] = None):
+        """Sayfadaki (envanter varsa sitedeki) form alanlarını XSS payload'ları ile test eder"""
+        if inventory is not None and inventory.pages:
+            forms = [(form.page_url, form) for form in inventory.forms]
+        elif page is not None and page.parsed:
+            forms = [(page.url, form) for form in page.forms]
+        else:
+            return
+        
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(target_url) as response:
-                    if response.status == 200:
-                        content = await response.text()
-                        soup = BeautifulSoup(content, 'html.parser')
-                        
-                        forms = soup.find_all('form')
-                        for form in forms:
-                            action = form.get('action', '')
-                            method = form.get('method', 'get').lower()
-                            
-                            # Form alanlarını bul
-                            inputs = form.find_all(['input', 'textarea', 'select'])
-                            for input_field in inputs:
-                                field_name = input_field.get('name')
-                                if field_name:
-                                    await self._test_form_field_xss(
-                                        result, target_url, action, method, field_name, input_field
-                                    )
+            points = []
+            for base_url, form in forms:
+                for field_name in form.fields:
+                    points.append(self._form_field_point(base_url, form.action, form.method, field_name))
+            
+            await self._test_injection_points(result, points, "Form field XSS test hatası")
         except Exception as e:
             self.add_scan_log(result, f"Form test hatası: {e}", "error")
     
-    async def _test_form_field_xss(self, result: ScanResult, base_url: str, action: str, method: str, field_name: str, input_field):
-        """Belirli bir form alanını XSS payload'ları ile test eder"""
-        try:
-            # Form URL'ini oluştur
-            form_url = urljoin(base_url, action) if action else base_url
-            
-            # Test payload'ları
-            for payload in self.xss_payloads[:5]:  # İlk 5 payload ile test et
-                if method == 'post':
-                    # POST form test
-                    data = {field_name: payload}
-                    async with aiohttp.ClientSession() as session:
-                        async with session.post(form_url, data=data) as response:
-                            if response.status == 200:
-                                content = await response.text()
-                                if payload in content:
-                                    vuln = Vulnerability(
-                                        title="Reflected XSS - Form Field",
-                                        description=f"Form alanında reflected XSS tespit edildi: {field_name}",
-                                        severity="high",
-                                        payload=payload,
-                                        location=form_url,
-                                        evidence=f"Field: {field_name}, Payload: {payload}"
-                                    )
-                                    self.add_vulnerability(result, vuln)
-                else:
-                    # GET form test
-                    params = {field_name: payload}
-                    test_url = f"{form_url}?{urlencode(params)}"
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(test_url) as response:
-                            if response.status == 200:
-                                content = await response.text()
-                                if payload in content:
-                                    vuln = Vulnerability(
-                                        title="Reflected XSS - Form Field (GET)",
-                                        description=f"GET form alanında reflected XSS tespit edildi: {field_name}",
-                                        severity="high",
-                                        payload=payload,
-                                        location=test_url,
-                                        evidence=f"Field: {field_name}, Payload: {payload}"
-                                    )
-                                    self.add_vulnerability(result, vuln)
-                                    
-        except Exception as e:
-            self.add_scan_log(result, f"Form field XSS test hatası: {e}", "warning")
+    def _form_field_point(self, base_url: str, action: str, method: str, field_name: str) -> InjectionPoint:
+        """Belirli bir form alanını enjeksiyon noktası olarak tanımlar"""
+        # Form URL'ini oluştur
+        form_url = urljoin(base_url, action) if action else base_url
+        
+        if method == 'post':
+            # POST form test
+            return InjectionPoint(
+                method="post",
+                url=form_url,
+                name=field_name,
+                title="Reflected XSS - Form Field",
+                description=f"Form alanında reflected XSS tespit edildi: {field_name}",
+                evidence_label="Field",
+                max_payloads=5  # Ön eleme kapalıyken ilk 5 payload ile test et
+            )
+        
+        # GET form test
+        return InjectionPoint(
+            method="get",
+            url=form_url,
+            name=field_name,
+            title="Reflected XSS - Form Field (GET)",
+            description=f"GET form alanında reflected XSS tespit edildi: {field_name}",
+            evidence_label="Field",
+            max_payloads=5
+        )
     
-    async def _test_url_parameters(self, result: ScanResult, target_url: str):
+    async def _test_url_parameters(self, result: ScanResult, target_urls: List[str]):
         """URL parametrelerini XSS payload'ları ile test eder"""
         try:
-            parsed = urlparse(target_url)
-            if parsed.query:
-                params = parse_qs(parsed.query)
+            points = []
+            for target_url in target_urls:
+                parsed = urlparse(target_url)
+                if not parsed.query:
+                    continue
+                
+                params = parse_qs(parsed.query, keep_blank_values=True)
                 base_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
                 
-                for param_name, param_values in params.items():
-                    for payload in self.xss_payloads[:3]:  # İlk 3 payload ile test et
-                        test_params = params.copy()
-                        test_params[param_name] = [payload]
-                        test_url = f"{base_url}?{urlencode(test_params, doseq=True)}"
-                        
-                        async with aiohttp.ClientSession() as session:
-                            async with session.get(test_url) as response:
-                                if response.status == 200:
-                                    content = await response.text()
-                                    if payload in content:
-                                        vuln = Vulnerability(
-                                            title="Reflected XSS - URL Parameter",
-                                            description=f"URL parametresinde reflected XSS tespit edildi: {param_name}",
-                                            severity="high",
-                                            payload=payload,
-                                            location=test_url,
-                                            evidence=f"Parameter: {param_name}, Payload: {payload}"
-                                        )
-                                        self.add_vulnerability(result, vuln)
-                                        
+                for param_name in params:
+                    points.append(InjectionPoint(
+                        method="get",
+                        url=base_url,
+                        name=param_name,
+                        params=params,
+                        title="Reflected XSS - URL Parameter",
+                        description=f"URL parametresinde reflected XSS tespit edildi: {param_name}",
+                        evidence_label="Parameter",
+                        max_payloads=3  # Ön eleme kapalıyken ilk 3 payload ile test et
+                    ))
+            
+            await self._test_injection_points(result, points, "URL parameter XSS test hatası")
+                                    
         except Exception as e:
             self.add_scan_log(result, f"URL parameter test hatası: {e}", "warning")
     
+    async def _test_injection_points(self, result: ScanResult, points: List[InjectionPoint], error_message: str):
+        """Önce her noktaya zararsız bir canary gönderir; yalnızca yansıyan noktalara, yansıdığı bağlama uygun payload'ları gönderir"""
+        if not points:
+            return
+        
+        # Her nokta için denenecek (payload, bağlam) listesi; paketli canary isteği başarısız olan noktalar paketlenmez
+        unpackable: Set[int] = set()
+        if not self.canary_prefilter:
+            plans = [[(payload, None) for payload in self.xss_payloads[:point.max_payloads]] for point in points]
+        else:
+            contexts, unpackable = await self._detect_reflection_contexts(result, points, error_message)
+            plans = []
+            for point_contexts in contexts:
+                payloads = {}
+                for context in point_contexts:
+                    for payload in self.context_payloads[context]:
+                        payloads.setdefault(payload, context)
+                plans.append(list(payloads.items()))
+            
+            reflecting = sum(1 for point_contexts in contexts if point_contexts)
+            self.add_scan_log(
+                result,
+                f"Canary ön elemesi: {len(points)} parametreden {reflecting} tanesi yansıyor, {sum(map(len, plans))} payload denenecek"
+            )
+        
+        if self.probe_packing:
+            await self._send_packed_probes(result, points, plans, error_message, unpackable)
+        else:
+            probes = [point.probe(payload, context) for point, plan in zip(points, plans) for payload, context in plan]
+            await self._send_probes(result, probes, error_message)
+    
+    def _pack_points(self, points: List[InjectionPoint]) -> List[List[int]]:
+        """Aynı isteğe yerleştirilebilecek noktaların indekslerini en fazla pack_size'lık gruplara ayırır"""
+        groups: Dict[Tuple[str, str, str, str], List[List[int]]] = {}
+        for index, point in enumerate(points):
+            packs = groups.setdefault(point.pack_key, [])
+            for pack in packs:
+                # Aynı isimli alanlar (ör. iki sayfadaki aynı form) aynı istekte çakışır
+                if len(pack) < self.pack_size and all(points[other].name != point.name for other in pack):
+                    pack.append(index)
+                    break
+            else:
+                packs.append([index])
+        return [pack for packs in groups.values() for pack in packs]
+    
+    async def _detect_reflection_contexts(self, result: ScanResult, points: List[InjectionPoint],
+                                          error_message: str) -> Tuple[List[List[str]], Set[int]]:
+        """Her noktaya benzersiz canary gönderir; yansıdığı bağlamları (html, attribute, script) döndürür
+        
+        Paketleme açıksa aynı form/URL'deki canary'ler tek istekte gönderilir; paket hata verir veya 200 dönmezse
+        o paketteki noktalar tek tek denenir ve paketlenemeyen noktalar olarak ayrıca döndürülür.
+        """
+        canaries = [f"gm{secrets.token_hex(5)}" for _ in points]
+        contexts: List[List[str]] = [[] for _ in points]
+        unpackable: Set[int] = set()
+        packs = self._pack_points(points) if self.probe_packing else [[index] for index in range(len(points))]
+        
+        while packs:
+            requests = [PackedProbe.build([points[i] for i in pack], [canaries[i] for i in pack]) for pack in packs]
+            outcomes = await self.fanout.map([(request.url, self._canary_sender(request)) for request in requests])
+            self._log_probe_errors(result, [outcome for pack, outcome in zip(packs, outcomes) if len(pack) == 1], error_message)
+            
+            retry = []
+            for pack, outcome in zip(packs, outcomes):
+                if isinstance(outcome, dict):
+                    for index in pack:
+                        contexts[index] = outcome.get(canaries[index], [])
+                elif len(pack) > 1:
+                    retry.extend([index] for index in pack)
+                    unpackable.update(pack)
+            packs = retry
+        
+        return contexts, unpackable
+    
+    def _canary_sender(self, request: PackedProbe):
+        """Canary isteğini gönderen ve her canary'nin yansıma bağlamlarını döndüren fonksiyon - 200 dışı yanıtta None"""
+        async def send() -> Optional[Dict[str, List[str]]]:
+            async with self._send_request(request) as response:
+                if response.status != 200:
+                    return None
+                scan = await scan_response_for_markers(
+                    response, LiteralMatcher(request.values), self.reflection_max_bytes,
+                    context_chars=REFLECTION_CONTEXT_CHARS
+                )
+            return {
+                canary: list(dict.fromkeys(reflection_context(prefix) for prefix in prefixes))
+                for canary, prefixes in scan.contexts.items()
+            }
+        
+        return send
+    
+    async def _send_packed_probes(self, result: ScanResult, points: List[InjectionPoint],
+                                  plans: List[List[Tuple[str, Optional[str]]]], error_message: str,
+                                  unpackable: Set[int] = frozenset()):
+        """Payload'ları turlar halinde gönderir; her turda paketteki her parametreye kendi etiketli payload'ı yerleştirilir
+        
+        Yansıyan payload etiketi sayesinde doğru parametreye atfedilir. Paket hata verirse veya canary'si yansıyan bir
+        parametrenin etiketi yanıtta hiç görünmezse (parametreler birbirini etkiliyor) o payload'lar tek tek gönderilir.
+        """
+        active = [index for index, plan in enumerate(plans) if plan and index not in unpackable]
+        rounds: List[List[PackedEntry]] = []
+        singles = [points[index].probe(payload, context)
+                   for index in sorted(unpackable) for payload, context in plans[index]]
+        
+        for pack in self._pack_points([points[index] for index in active]):
+            pack = [active[index] for index in pack]
+            for round_index in range(max(len(plans[index]) for index in pack)):
+                entries = []
+                for index in pack:
+                    if round_index >= len(plans[index]):
+                        continue
+                    payload, context = plans[index][round_index]
+                    tag = f"gm{secrets.token_hex(5)}"
+                    tagged = tag_payload(payload, tag)
+                    if tagged is None:
+                        singles.append(points[index].probe(payload, context))
+                    else:
+                        entries.append(PackedEntry(point=points[index], probe=points[index].probe(tagged, context),
+                                                   canonical=points[index].probe(payload, context), tag=tag))
+                if entries:
+                    rounds.append(entries)
+        
+        requests = [PackedProbe.build([entry.point for entry in entries], [entry.probe.payload for entry in entries])
+                    for entries in rounds]
+        outcomes = await self.fanout.map([
+            (request.url, self._packed_sender(request, [marker for entry in entries for marker in (entry.probe.payload, entry.tag)]))
+            for entries, request in zip(rounds, requests)
+        ])
+        self._log_probe_errors(result, [outcome for entries, outcome in zip(rounds, outcomes) if len(entries) == 1], error_message)
+        
+        retry = list(singles)
+        for entries, request, outcome in zip(rounds, requests, outcomes):
+            if not isinstance(outcome, dict):
+                if len(entries) > 1:
+                    retry.extend(entry.canonical for entry in entries)
+                continue
+            
+            for entry in entries:
+                if entry.probe.payload in outcome:
+                    # Bulguda etiketsiz payload kaydedilir; etiket yalnızca yansımanın hangi parametreye ait olduğunu gösterir
+                    self._add_probe_finding(result, entry.canonical, location=request.url,
+                                            evidence=f"{entry.canonical.evidence}, Paket etiketi: {entry.tag}")
+                elif self.canary_prefilter and len(entries) > 1 and entry.tag not in outcome:
+                    retry.append(entry.canonical)
+        
+        self.add_scan_log(
+            result,
+            f"Paketleme: {sum(map(len, rounds))} payload {len(requests)} istekte gönderildi, {len(retry)} payload tek tek denenecek"
+        )
+        await self._send_probes(result, retry, error_message)
+    
+    def _packed_sender(self, request: PackedProbe, markers: List[str]):
+        """Paketlenmiş isteği gönderen ve yanıtta bulunan işaretleri döndüren fonksiyon - 200 dışı yanıtta None"""
+        async def send() -> Optional[Dict[str, int]]:
+            async with self._send_request(request) as response:
+                if response.status != 200:
+                    return None
+                scan = await scan_response_for_markers(response, LiteralMatcher(markers), self.reflection_max_bytes,
+                                                       find_all=True)
+            return scan.matches
+        
+        return send
+    
+    async def _send_probes(self, result: ScanResult, probes: List[XSSProbe], error_message: str):
+        """Payload isteklerini paralel gönderir; bulgular istek sırasıyla eklenir"""
+        if not probes:
+            return
+        
+        outcomes = await self.fanout.map([(probe.url, self._probe_sender(probe)) for probe in probes])
+        self._log_probe_errors(result, outcomes, error_message)
+        
+        for probe, outcome in zip(probes, outcomes):
+            if outcome is True:
+                self._add_probe_finding(result, probe)
+    
+    def _add_probe_finding(self, result: ScanResult, probe: XSSProbe, location: Optional[str] = None,
+                           evidence: Optional[str] = None):
+        """Yansıyan payload için bulgu ekler"""
+        vuln = Vulnerability(
+            title=probe.title,
+            description=probe.description,
+            severity="high",
+            payload=probe.payload,
+            location=location or probe.url,
+            evidence=evidence or probe.evidence
+        )
+        self.add_vulnerability(result, vuln)
+    
+    def _log_probe_errors(self, result: ScanResult, outcomes: List[Any], error_message: str):
+        """Başarısız istekleri tek satırda loglar - hedef erişilemezken her istek için ayrı log yazılmaz"""
+        errors = [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+        if errors:
+            extra = f" (+{len(errors) - 1} istek daha)" if len(errors) > 1 else ""
+            self.add_scan_log(result, f"{error_message}: {errors[0]}{extra}", "warning")
+    
+    async def _is_reflected(self, response, payload: str) -> bool:
+        """Payload'ı yanıt gövdesinde akışlı arar - bulunca veya bayt sınırında okumayı bırakır"""
+        scan = await scan_response_for_markers(response, LiteralMatcher([payload]), self.reflection_max_bytes)
+        return payload in scan.matches
+    
+    def _send_request(self, probe: Union[XSSProbe, PackedProbe]):
+        """Probe isteğini gönderir - `async with` ile kullanılır"""
+        if probe.method == "post":
+            return self.http.post(probe.url, data=probe.data)
+        return self.http.get(probe.url)
+    
+    def _probe_sender(self, probe: XSSProbe):
+        """Payload isteğini gönderen ve yansıma olup olmadığını döndüren fonksiyon"""
+        async def send() -> bool:
+            async with self._send_request(probe) as response:
+                if response.status != 200:
+                    return False
+                return await self._is_reflected(response, probe.payload)
+        
+        return send
+    
     async def _test_reflected_xss(self, result: ScanResult, target_url: str):
         """Reflected XSS testleri gerçekleştirir"""
         try:
@@ -278,56 +666,40 @@ class XSSScanner(BaseScanner):
             test_payload = "<script>alert('XSS')</script>"
             test_url = f"{target_url}?test={test_payload}"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(test_url) as response:
-                    if response.status == 200:
-                        content = await response.text()
-                        if test_payload in content:
-                            vuln = Vulnerability(
-                                title="Reflected XSS - URL Parameter",
-                                description="URL parametresinde reflected XSS tespit edildi",
-                                severity="high",
-                                payload=test_payload,
-                                location=test_url,
-                                evidence=f"Payload reflected: {test_payload}"
-                            )
-                            self.add_vulnerability(result, vuln)
-                            
+            async with self.http.get(test_url) as response:
+                if response.status == 200:
+                    if await self._is_reflected(response, test_payload):
+                        vuln = Vulnerability(
+                            title="Reflected XSS - URL Parameter",
+                            description="URL parametresinde reflected XSS tespit edildi",
+                            severity="high",
+                            payload=test_payload,
+                            location=test_url,
+                            evidence=f"Payload reflected: {test_payload}"
+                        )
+                        self.add_vulnerability(result, vuln)
+                        
         except Exception as e:
             self.add_scan_log(result, f"Reflected XSS test hatası: {e}", "warning")
     
-    async def _test_dom_xss(self, result: ScanResult, target_url: str):
+    async def _test_dom_xss(self, result: ScanResult, page: Optional[PageSnapshot]):
         """DOM XSS testleri gerçekleştirir"""
+        if page is None or page.status != 200:
+            return
+        
         try:
-            # DOM XSS için JavaScript kodunu analiz et
-            async with aiohttp.ClientSession() as session:
-                async with session.get(target_url) as response:
-                    if response.status == 200:
-                        content = await response.text()
-                        
-                        # JavaScript kodunda DOM manipülasyonu ara
-                        js_patterns = [
-                            r'document\.write\s*\([^)]*\)',
-                            r'document\.writeln\s*\([^)]*\)',
-                            r'innerHTML\s*=',
-                            r'outerHTML\s*=',
-                            r'eval\s*\([^)]*\)',
-                            r'setTimeout\s*\([^)]*\)',
-                            r'setInterval\s*\([^)]*\)'
-                        ]
-                        
-                        for pattern in js_patterns:
-                            matches = re.findall(pattern, content, re.IGNORECASE)
-                            for match in matches:
-                                vuln = Vulnerability(
-                                    title="Potansiyel DOM XSS",
-                                    description="JavaScript kodunda DOM manipülasyonu tespit edildi",
-                                    severity="medium",
-                                    location=target_url,
-                                    evidence=match
-                                )
-                                self.add_vulnerability(result, vuln)
-                                
+            # JavaScript kodunda DOM manipülasyonu ara
+            for rule, matches in self.dom_xss_rules.findall(page.content).items():
+                for match in matches:
+                    vuln = Vulnerability(
+                        title="Potansiyel DOM XSS",
+                        description="JavaScript kodunda DOM manipülasyonu tespit edildi",
+                        severity="medium",
+                        location=page.url,
+                        evidence=match.text
+                    )
+                    self.add_vulnerability(result, vuln)
+                    
         except Exception as e:
             self.add_scan_log(result, f"DOM XSS test hatası: {e}", "warning")
     
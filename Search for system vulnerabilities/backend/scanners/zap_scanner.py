@@ -12,12 +12,16 @@ from datetime import datetime
 import logging
 
 from .base_scanner import BaseScanner, ScanResult, Vulnerability
+from .http_client import ScannerHTTPClient
+
+# core/view/alerts çağrısında tek seferde alınan alert sayısı (start/count sayfalama)
+ZAP_ALERT_PAGE_SIZE = 500
 
 class ZAPScanner(BaseScanner):
     """OWASP ZAP kullanarak web uygulama güvenlik taraması yapan tarayıcı"""
     
-    def __init__(self, config: Dict[str, Any] = None):
-        super().__init__("ZAP Scanner", config)
+    def __init__(self, config: Dict[str, Any] = None, http_client: Optional[ScannerHTTPClient] = None):
+        super().__init__("ZAP Scanner", config, http_client)
         
         # ZAP API konfigürasyonu
         self.zap_host = config.get("zap_host", "localhost") if config else "localhost"
@@ -35,6 +39,9 @@ class ZAPScanner(BaseScanner):
             "passive": "passive",
             "full": "full"
         }
+        
+        # İşlenmiş alert sayısı - tarama sürerken yalnızca yeni alert'ler alınır
+        self._alerts_seen = 0
     
     async def validate_target(self, target_url: str) -> bool:
         """Hedef URL'nin geçerli olup olmadığını kontrol eder"""
@@ -59,6 +66,7 @@ class ZAPScanner(BaseScanner):
         
         try:
             self.is_running = True
+            self._alerts_seen = 0
             self.add_scan_log(result, f"ZAP taraması başlatıldı: {target_url}")
             
             # Pre-scan kontrolleri
@@ -94,7 +102,7 @@ class ZAPScanner(BaseScanner):
             if scan_type in ["passive", "full"]:
                 await self._run_passive_scan(result, target_url, context_id)
             
-            # Güvenlik açıklarını topla
+            # Tarama sırasında alınmamış kalan güvenlik açıklarını topla
             await self._collect_vulnerabilities(result, target_url, context_id)
             
             # Sonuçları sırala
@@ -117,18 +125,17 @@ class ZAPScanner(BaseScanner):
     async def _check_zap_connection(self) -> bool:
         """ZAP bağlantısını kontrol eder"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.api_url}/core/view/version"
-                params = {"apikey": self.zap_api_key} if self.zap_api_key else {}
-                
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        version = data.get("version", "Unknown")
-                        self.add_scan_log(ScanResult(), f"ZAP versiyonu: {version}")
-                        return True
-                    else:
-                        return False
+            url = f"{self.api_url}/core/view/version"
+            params = {"apikey": self.zap_api_key} if self.zap_api_key else {}
+            
+            async with self.http.get(url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    version = data.get("version", "Unknown")
+                    self.logger.info(f"ZAP versiyonu: {version}")
+                    return True
+                else:
+                    return False
         except Exception as e:
             self.logger.error(f"ZAP bağlantı hatası: {e}")
             return False
@@ -136,89 +143,92 @@ class ZAPScanner(BaseScanner):
     async def _add_target_to_zap(self, target_url: str) -> Optional[str]:
         """Hedef URL'yi ZAP'a ekler"""
         try:
-            async with aiohttp.ClientSession() as session:
-                # Context oluştur
-                url = f"{self.api_url}/context/action/newContext"
-                params = {"apikey": self.zap_api_key} if self.zap_api_key else {}
-                data = {"contextName": f"scan_{int(time.time())}"}
-                
-                async with session.post(url, params=params, json=data) as response:
-                    if response.status == 200:
-                        context_data = await response.json()
-                        context_id = context_data.get("contextId")
+            # Context oluştur
+            url = f"{self.api_url}/context/action/newContext"
+            params = {"apikey": self.zap_api_key} if self.zap_api_key else {}
+            data = {"contextName": f"scan_{int(time.time())}"}
+            
+            async with self.http.post(url, params=params, json=data) as response:
+                if response.status == 200:
+                    context_data = await response.json()
+                    context_id = context_data.get("contextId")
+                    
+                    if context_id:
+                        # Hedef URL'yi context'e ekle
+                        include_url = f"{self.api_url}/context/action/includeInContext"
+                        include_data = {
+                            "contextName": data["contextName"],
+                            "regex": f".*{target_url}.*"
+                        }
                         
-                        if context_id:
-                            # Hedef URL'yi context'e ekle
-                            include_url = f"{self.api_url}/context/action/includeInContext"
-                            include_data = {
-                                "contextName": data["contextName"],
-                                "regex": f".*{target_url}.*"
-                            }
-                            
-                            async with session.post(include_url, params=params, json=include_data) as inc_response:
-                                if inc_response.status == 200:
-                                    return context_id
-                
-                return None
-                
+                        async with self.http.post(include_url, params=params, json=include_data) as inc_response:
+                            if inc_response.status == 200:
+                                return context_id
+            
+            return None
+            
         except Exception as e:
             self.logger.error(f"Hedef URL ekleme hatası: {e}")
             return None
     
     async def _run_spider_scan(self, result: ScanResult, target_url: str, context_id: str):
         """Spider taraması çalıştırır"""
+        scan_id = None
         try:
             self.add_scan_log(result, "Spider taraması başlatılıyor...")
             
-            async with aiohttp.ClientSession() as session:
-                # Spider taramasını başlat
-                url = f"{self.api_url}/spider/action/scan"
-                params = {"apikey": self.zap_api_key} if self.zap_api_key else {}
-                data = {
-                    "url": target_url,
-                    "contextName": context_id,
-                    "maxChildren": 10
-                }
-                
-                async with session.post(url, params=params, json=data) as response:
-                    if response.status == 200:
-                        scan_data = await response.json()
-                        scan_id = scan_data.get("scan")
-                        
-                        if scan_id:
-                            # Spider taramasının tamamlanmasını bekle
-                            await self._wait_for_spider_completion(result, scan_id)
-                        else:
-                            self.add_scan_log(result, "Spider taraması başlatılamadı", "warning")
-                    else:
-                        self.add_scan_log(result, "Spider taraması başlatılamadı", "warning")
-                        
+            # Spider taramasını başlat
+            url = f"{self.api_url}/spider/action/scan"
+            params = {"apikey": self.zap_api_key} if self.zap_api_key else {}
+            data = {
+                "url": target_url,
+                "contextName": context_id,
+                "maxChildren": 10
+            }
+            
+            async with self.http.post(url, params=params, json=data) as response:
+                if response.status == 200:
+                    scan_data = await response.json()
+                    scan_id = scan_data.get("scan")
+            
+            if scan_id:
+                # Spider taramasının tamamlanmasını bekle
+                await self._wait_for_spider_completion(result, scan_id, target_url)
+            else:
+                self.add_scan_log(result, "Spider taraması başlatılamadı", "warning")
+        
+        except asyncio.CancelledError:
+            # Tarama iptal edildi - iş başlatıldıysa (kimliği öğrenildiyse) ZAP tarafındaki spider işi de durdurulur
+            if scan_id:
+                await self._stop_zap_scan("spider", scan_id)
+            raise
+                    
         except Exception as e:
             self.add_scan_log(result, f"Spider tarama hatası: {e}", "error")
     
-    async def _wait_for_spider_completion(self, result: ScanResult, scan_id: str):
-        """Spider taramasının tamamlanmasını bekler"""
+    async def _wait_for_spider_completion(self, result: ScanResult, scan_id: str, target_url: str):
+        """Spider taramasının tamamlanmasını bekler - beklerken pasif taramanın ürettiği yeni alert'ler alınır"""
         try:
             max_wait = 300  # 5 dakika
             wait_time = 0
             
             while wait_time < max_wait:
-                async with aiohttp.ClientSession() as session:
-                    url = f"{self.api_url}/spider/view/status"
-                    params = {"apikey": self.zap_api_key, "scanId": scan_id} if self.zap_api_key else {"scanId": scan_id}
-                    
-                    async with session.get(url, params=params) as response:
-                        if response.status == 200:
-                            status_data = await response.json()
-                            status = status_data.get("status", "")
-                            
-                            if status == "100":
-                                self.add_scan_log(result, "Spider taraması tamamlandı")
-                                break
-                            elif "error" in status.lower():
-                                self.add_scan_log(result, f"Spider tarama hatası: {status}", "error")
-                                break
+                url = f"{self.api_url}/spider/view/status"
+                params = {"apikey": self.zap_api_key, "scanId": scan_id} if self.zap_api_key else {"scanId": scan_id}
                 
+                async with self.http.get(url, params=params) as response:
+                    if response.status == 200:
+                        status_data = await response.json()
+                        status = status_data.get("status", "")
+                        
+                        if status == "100":
+                            self.add_scan_log(result, "Spider taraması tamamlandı")
+                            break
+                        elif "error" in status.lower():
+                            self.add_scan_log(result, f"Spider tarama hatası: {status}", "error")
+                            break
+                
+                await self._poll_new_alerts(result, target_url)
                 await asyncio.sleep(5)
                 wait_time += 5
                 
@@ -233,58 +243,62 @@ class ZAPScanner(BaseScanner):
     
     async def _run_active_scan(self, result: ScanResult, target_url: str, context_id: str):
         """Active tarama çalıştırır"""
+        scan_id = None
         try:
             self.add_scan_log(result, "Active tarama başlatılıyor...")
             
-            async with aiohttp.ClientSession() as session:
-                # Active taramayı başlat
-                url = f"{self.api_url}/ascan/action/scan"
-                params = {"apikey": self.zap_api_key} if self.zap_api_key else {}
-                data = {
-                    "url": target_url,
-                    "contextName": context_id,
-                    "scanPolicyName": "Default Policy"
-                }
-                
-                async with session.post(url, params=params, json=data) as response:
-                    if response.status == 200:
-                        scan_data = await response.json()
-                        scan_id = scan_data.get("scan")
-                        
-                        if scan_id:
-                            # Active taramanın tamamlanmasını bekle
-                            await self._wait_for_active_completion(result, scan_id)
-                        else:
-                            self.add_scan_log(result, "Active tarama başlatılamadı", "warning")
-                    else:
-                        self.add_scan_log(result, "Active tarama başlatılamadı", "warning")
-                        
+            # Active taramayı başlat
+            url = f"{self.api_url}/ascan/action/scan"
+            params = {"apikey": self.zap_api_key} if self.zap_api_key else {}
+            data = {
+                "url": target_url,
+                "contextName": context_id,
+                "scanPolicyName": "Default Policy"
+            }
+            
+            async with self.http.post(url, params=params, json=data) as response:
+                if response.status == 200:
+                    scan_data = await response.json()
+                    scan_id = scan_data.get("scan")
+            
+            if scan_id:
+                # Active taramanın tamamlanmasını bekle
+                await self._wait_for_active_completion(result, scan_id, target_url)
+            else:
+                self.add_scan_log(result, "Active tarama başlatılamadı", "warning")
+        
+        except asyncio.CancelledError:
+            # Tarama iptal edildi - iş başlatıldıysa (kimliği öğrenildiyse) ZAP tarafındaki active scan işi de durdurulur
+            if scan_id:
+                await self._stop_zap_scan("ascan", scan_id)
+            raise
+                    
         except Exception as e:
             self.add_scan_log(result, f"Active tarama hatası: {e}", "error")
     
-    async def _wait_for_active_completion(self, result: ScanResult, scan_id: str):
-        """Active taramanın tamamlanmasını bekler"""
+    async def _wait_for_active_completion(self, result: ScanResult, scan_id: str, target_url: str):
+        """Active taramanın tamamlanmasını bekler - beklerken bulunan yeni alert'ler hemen bulguya dönüştürülür"""
         try:
             max_wait = 600  # 10 dakika
             wait_time = 0
             
             while wait_time < max_wait:
-                async with aiohttp.ClientSession() as session:
-                    url = f"{self.api_url}/ascan/view/status"
-                    params = {"apikey": self.zap_api_key, "scanId": scan_id} if self.zap_api_key else {"scanId": scan_id}
-                    
-                    async with session.get(url, params=params) as response:
-                        if response.status == 200:
-                            status_data = await response.json()
-                            status = status_data.get("status", "")
-                            
-                            if status == "100":
-                                self.add_scan_log(result, "Active tarama tamamlandı")
-                                break
-                            elif "error" in status.lower():
-                                self.add_scan_log(result, f"Active tarama hatası: {status}", "error")
-                                break
+                url = f"{self.api_url}/ascan/view/status"
+                params = {"apikey": self.zap_api_key, "scanId": scan_id} if self.zap_api_key else {"scanId": scan_id}
                 
+                async with self.http.get(url, params=params) as response:
+                    if response.status == 200:
+                        status_data = await response.json()
+                        status = status_data.get("status", "")
+                        
+                        if status == "100":
+                            self.add_scan_log(result, "Active tarama tamamlandı")
+                            break
+                        elif "error" in status.lower():
+                            self.add_scan_log(result, f"Active tarama hatası: {status}", "error")
+                            break
+                
+                await self._poll_new_alerts(result, target_url)
                 await asyncio.sleep(10)
                 wait_time += 10
                 
@@ -297,6 +311,17 @@ class ZAPScanner(BaseScanner):
         except Exception as e:
             self.add_scan_log(result, f"Active tamamlanma bekleme hatası: {e}", "error")
     
+    async def _stop_zap_scan(self, component: str, scan_id: str):
+        """ZAP'taki spider (spider) veya active scan (ascan) işini durdurur"""
+        try:
+            url = f"{self.api_url}/{component}/action/stop"
+            params = {"apikey": self.zap_api_key, "scanId": scan_id} if self.zap_api_key else {"scanId": scan_id}
+            
+            async with self.http.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                self.logger.info(f"ZAP {component} işi durduruldu (scanId={scan_id}, HTTP {response.status})")
+        except Exception as e:
+            self.logger.error(f"ZAP {component} durdurma hatası: {e}")
+    
     async def _run_passive_scan(self, result: ScanResult, target_url: str, context_id: str):
         """Passive tarama çalıştırır"""
         try:
@@ -310,26 +335,42 @@ class ZAPScanner(BaseScanner):
             self.add_scan_log(result, f"Passive tarama hatası: {e}", "error")
     
     async def _collect_vulnerabilities(self, result: ScanResult, target_url: str, context_id: str):
-        """Tespit edilen güvenlik açıklarını toplar"""
+        """Henüz işlenmemiş güvenlik açıklarını toplar"""
         try:
-            async with aiohttp.ClientSession() as session:
-                # Güvenlik açıklarını al
-                url = f"{self.api_url}/core/view/alerts"
-                params = {"apikey": self.zap_api_key, "baseurl": target_url} if self.zap_api_key else {"baseurl": target_url}
-                
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        alerts_data = await response.json()
-                        alerts = alerts_data.get("alerts", [])
-                        
-                        for alert in alerts:
-                            await self._process_zap_alert(result, alert, target_url)
-                    else:
-                        self.add_scan_log(result, "Güvenlik açıkları alınamadı", "warning")
-                        
+            if not await self._fetch_new_alerts(result, target_url):
+                self.add_scan_log(result, "Güvenlik açıkları alınamadı", "warning")
+                    
         except Exception as e:
             self.add_scan_log(result, f"Güvenlik açığı toplama hatası: {e}", "error")
     
+    async def _poll_new_alerts(self, result: ScanResult, target_url: str):
+        """Tarama sürerken yeni alert'leri alır - hata taramayı etkilemez, kalanlar tarama sonunda toplanır"""
+        try:
+            await self._fetch_new_alerts(result, target_url)
+        except Exception as e:
+            self.logger.warning(f"Ara alert sorgusu başarısız: {e}")
+    
+    async def _fetch_new_alerts(self, result: ScanResult, target_url: str) -> bool:
+        """Son işlenen alert'ten sonrakileri sayfa sayfa alıp bulguya dönüştürür; yanıt alınamazsa False döner"""
+        url = f"{self.api_url}/core/view/alerts"
+        while True:
+            params = {"baseurl": target_url, "start": self._alerts_seen, "count": ZAP_ALERT_PAGE_SIZE}
+            if self.zap_api_key:
+                params["apikey"] = self.zap_api_key
+            
+            async with self.http.get(url, params=params) as response:
+                if response.status != 200:
+                    return False
+                alerts_data = await response.json()
+            
+            alerts = alerts_data.get("alerts", [])
+            for alert in alerts:
+                await self._process_zap_alert(result, alert, target_url)
+            self._alerts_seen += len(alerts)
+            
+            if len(alerts) < ZAP_ALERT_PAGE_SIZE:
+                return True
+    
     async def _process_zap_alert(self, result: ScanResult, alert: Dict[str, Any], target_url: str):
         """ZAP alert'ini işler ve güvenlik açığına dönüştürür"""
         try:
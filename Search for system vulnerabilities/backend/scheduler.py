@@ -0,0 +1,432 @@
+"""
+GuardMesh Tarama Zamanlayıcı
+Eşzamanlı tarama ve tarayıcı sınırları, öncelik sınıfları ve hedefler arası adil sıralama
+Kuyruk ve sınırlar ortak veritabanında tutulur; API ve tüm worker süreçleri aynı kuyruğu paylaşır
+"""
+
+import os
+import uuid
+import heapq
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+
+from sqlalchemy import select, update, delete, func
+
+from database import ScanRecord, ScannerLeaseRecord, scan_store
+
+
+logger = logging.getLogger("guardmesh-scheduler")
+
+# Aynı anda çalışabilecek en fazla tarama sayısı (tüm süreçler genelinde; toplu taramada bir host grubu tek sayılır)
+SCAN_MAX_RUNNING = int(os.getenv("SCAN_MAX_RUNNING", "3"))
+
+# Tarayıcı türü başına, tüm taramalar genelinde eşzamanlı çalışma sınırı
+# Listede olmayan tarayıcılar (xss, shodan gibi hafif olanlar) sınırlanmaz
+DEFAULT_SCANNER_LIMITS = {"nmap": 2, "nuclei": 2, "nikto": 2, "sqlmap": 1, "zap": 1}
+
+# Öncelik sınıfları - küçük değer önce çalışır
+SCAN_PRIORITIES = {"quick": 0, "standard": 1, "full": 2}
+
+# Bekleyen tarama bu süre (saniye) geçtikçe bir üst öncelik sınıfına yükselir - tam taramalar aç kalmaz
+SCAN_PRIORITY_AGING = float(os.getenv("SCAN_PRIORITY_AGING", "600"))
+
+# Ölçüm yokken tahmini bekleme süresi için kullanılan ortalama tarama süreleri (saniye)
+DEFAULT_SCAN_DURATIONS = {"quick": 120.0, "standard": 600.0, "full": 1800.0}
+# Tahminde ortalaması alınan son tamamlanmış tarama sayısı
+DURATION_SAMPLE_SIZE = 200
+
+# Bekleyen taramanın sırasını (ve tarayıcı izninin verilip verilmediğini) kontrol etme aralığı (saniye)
+SCAN_ADMISSION_POLL_INTERVAL = float(os.getenv("SCAN_ADMISSION_POLL_INTERVAL", "1"))
+# Bekleyen/çalışan taramaların canlılık sinyali aralığı ve sinyali kesilen sürecin yerinin boşaltılma süresi (saniye)
+SCAN_HEARTBEAT_INTERVAL = float(os.getenv("SCAN_HEARTBEAT_INTERVAL", "10"))
+SCAN_HEARTBEAT_TIMEOUT = float(os.getenv("SCAN_HEARTBEAT_TIMEOUT", "60"))
+
+
+def _parse_scanner_limits(value: str) -> Dict[str, int]:
+    """"nmap=2,sqlmap=1" biçimindeki ayarı varsayılanların üzerine uygular"""
+    limits = dict(DEFAULT_SCANNER_LIMITS)
+    for item in value.split(","):
+        name, _, limit = item.partition("=")
+        if name.strip() and limit.strip():
+            limits[name.strip().lower()] = int(limit)
+    return limits
+
+
+SCANNER_LIMITS = _parse_scanner_limits(os.getenv("SCAN_SCANNER_LIMITS", ""))
+
+
+def scan_priority(scan_type: str) -> int:
+    """Tarama türünün öncelik sınıfını döndürür"""
+    return SCAN_PRIORITIES.get(scan_type, SCAN_PRIORITIES["standard"])
+
+
+@dataclass
+class ScanGroupState:
+    """Veritabanındaki üye kayıtlarından derlenen bekleyen veya çalışan tarama grubu"""
+    group_id: str
+    host: str
+    scan_type: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    waiting: bool = False
+
+    def is_live(self, now: datetime) -> bool:
+        """Grubu bekleten veya çalıştıran süreç canlılık sinyali vermeye devam ediyor mu"""
+        return self.heartbeat_at is not None and now - self.heartbeat_at <= timedelta(seconds=SCAN_HEARTBEAT_TIMEOUT)
+
+
+class ScanScheduler:
+    """Taramaları genel sınıra göre kabul eder, tarayıcı türü sınırlarını uygular
+    Kararlar ortak veritabanındaki kilit altında verilir; her süreç kendi bekleyen taramalarının sırasını yoklar"""
+
+    def __init__(self, store=scan_store, max_running: int = SCAN_MAX_RUNNING,
+                 scanner_limits: Optional[Dict[str, int]] = None):
+        self.store = store
+        self.max_running = max(1, max_running)
+        self.scanner_limits = SCANNER_LIMITS if scanner_limits is None else scanner_limits
+        # Bu süreçte bekleyen/çalışan gruplar ve tarayıcı izinleri - canlılık sinyalleri bunlar için gönderilir
+        self._groups: set = set()
+        self._leases: set = set()
+        # Bu süreçte sıra bekleyen gruplar - tek bir görev hepsinin sırasını tek sorguyla yoklar
+        self._waiters: Dict[str, asyncio.Future] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        # Bu süreçte bir tarayıcı izni bırakıldığında bekleyen izinler yoklamayı beklemeden yeniden denenir
+        self._lease_released: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._admission_task: Optional[asyncio.Task] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    async def acquire(self, group_id: str, scan_type: str, member_ids: List[str]):
+        """Tarama grubu için çalışma izni bekler - izin gelene kadar üyeler "queued" durumunda kalır"""
+        await self.store.run(self._enqueue, member_ids)
+        self._groups.add(group_id)
+        self._ensure_background_tasks()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[group_id] = waiter
+        self._wakeup.set()
+        try:
+            await waiter
+        finally:
+            self._waiters.pop(group_id, None)
+
+    async def release(self, group_id: str):
+        """Grubun iznini (veya kuyruktaki yerini) bırakır - bu süreçte bekleyen taramalar hemen yoklanır,
+        diğer süreçlerdekiler bir sonraki yoklamada başlar"""
+        self._groups.discard(group_id)
+        await self.store.run(self._clear_heartbeat, group_id)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _admission_loop(self):
+        """Bu süreçte bekleyen grupların sırasını yoklar ve sırası gelenleri başlatır"""
+        logged = set()
+        while self._waiters:
+            self._wakeup.clear()
+            try:
+                admitted = await self.store.run(self._admit_waiting, list(self._waiters))
+            except Exception as e:
+                logger.warning(f"Tarama kuyruğu yoklanamadı: {e}")
+                admitted = []
+
+            for group_id in admitted:
+                waiter = self._waiters.get(group_id)
+                if waiter is not None and not waiter.done():
+                    waiter.set_result(None)
+
+            for group_id in set(self._waiters) - logged:
+                logger.info(f"Tarama {group_id} kuyrukta bekliyor")
+                logged.add(group_id)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), SCAN_ADMISSION_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    def _enqueue(self, member_ids: List[str]):
+        """Üyeleri kuyruğa alır; yeniden denenen (başarısız veya worker'ı çöken) üyeler de yeniden bekler"""
+        with self.store.session() as session:
+            session.execute(
+                update(ScanRecord)
+                .where(
+                    ScanRecord.scan_id.in_(member_ids),
+                    ScanRecord.cancel_requested.is_(False),
+                    ScanRecord.status.notin_(("completed", "cancelled"))
+                )
+                .values(status="queued", start_time=None, heartbeat_at=datetime.now())
+            )
+
+    def _clear_heartbeat(self, group_id: str):
+        with self.store.session() as session:
+            session.execute(update(ScanRecord).where(ScanRecord.group_id == group_id).values(heartbeat_at=None))
+
+    def _load_groups(self, session) -> Dict[str, ScanGroupState]:
+        """Bekleyen ve çalışan tarama gruplarını üye kayıtlarından derler"""
+        rows = session.execute(
+            select(
+                ScanRecord.group_id, ScanRecord.target_host, ScanRecord.scan_type, ScanRecord.status,
+                ScanRecord.cancel_requested, ScanRecord.created_at, ScanRecord.start_time, ScanRecord.heartbeat_at
+            ).where(ScanRecord.status.in_(("queued", "running")))
+        ).all()
+
+        groups: Dict[str, ScanGroupState] = {}
+        for row in rows:
+            group = groups.get(row.group_id)
+            if group is None:
+                group = groups[row.group_id] = ScanGroupState(
+                    group_id=row.group_id, host=row.target_host, scan_type=row.scan_type, created_at=row.created_at
+                )
+            group.created_at = min(group.created_at, row.created_at)
+            if row.heartbeat_at is not None and (group.heartbeat_at is None or row.heartbeat_at > group.heartbeat_at):
+                group.heartbeat_at = row.heartbeat_at
+            if row.start_time is not None:
+                group.started_at = row.start_time if group.started_at is None else min(group.started_at, row.start_time)
+            elif row.status == "queued" and not row.cancel_requested:
+                group.waiting = True
+
+        # Kabul edilmiş (başlama zamanı olan) grup, üyeleri henüz "queued" olsa da çalışıyor sayılır
+        for group in groups.values():
+            if group.started_at is not None:
+                group.waiting = False
+        return {group_id: group for group_id, group in groups.items() if group.waiting or group.started_at is not None}
+
+    def _effective_priority(self, group: ScanGroupState, now: datetime) -> int:
+        """Bekleme süresine göre yükseltilmiş öncelik sınıfı"""
+        priority = scan_priority(group.scan_type)
+        if SCAN_PRIORITY_AGING <= 0:
+            return priority
+        return priority - int((now - group.created_at).total_seconds() / SCAN_PRIORITY_AGING)
+
+    def _ordered_waiting(self, groups: Dict[str, ScanGroupState], now: datetime,
+                         live_only: bool = True) -> List[ScanGroupState]:
+        """Bekleyen grupları çalışma sırasına göre döndürür: öncelik sınıfı, hedef turu, geliş sırası
+        Hedef turu: hostun çalışan grup sayısı + o hostta öndeki bekleyen grup sayısı - aynı hedefin
+        taramaları diğer hedeflerle sırayla çalışır"""
+        host_rounds: Dict[str, int] = {}
+        for group in groups.values():
+            if group.started_at is not None and group.is_live(now):
+                host_rounds[group.host] = host_rounds.get(group.host, 0) + 1
+
+        waiting = sorted(
+            (group for group in groups.values() if group.waiting and (group.is_live(now) or not live_only)),
+            key=lambda group: (group.created_at, group.group_id)
+        )
+        keys = {}
+        for group in waiting:
+            host_round = host_rounds.get(group.host, 0)
+            host_rounds[group.host] = host_round + 1
+            keys[group.group_id] = (self._effective_priority(group, now), host_round, group.created_at, group.group_id)
+
+        return sorted(waiting, key=lambda group: keys[group.group_id])
+
+    def _admit_waiting(self, group_ids: List[str]) -> List[str]:
+        """Verilen gruplardan sırası gelenleri kabul eder (başlama zamanını yazar) ve döndürür"""
+        now = datetime.now()
+
+        # Boş yer yoksa kilit alınmaz - bekleyen çok sayıda tarama veritabanına yazma yükü bindirmez
+        with self.store.session() as session:
+            groups = self._load_groups(session)
+        if self._running_count(groups, now) >= self.max_running:
+            return []
+
+        with self.store.locked_session("scan_admission") as session:
+            groups = self._load_groups(session)
+            free_slots = self.max_running - self._running_count(groups, now)
+            if free_slots <= 0:
+                return []
+
+            # Sırası gelen gruplardan bu süreçte bekleyenler başlatılır, diğerlerini kendi süreçleri başlatır
+            local = set(group_ids)
+            admitted = [
+                group.group_id for group in self._ordered_waiting(groups, now)[:free_slots] if group.group_id in local
+            ]
+            if admitted:
+                session.execute(
+                    update(ScanRecord)
+                    .where(ScanRecord.group_id.in_(admitted), ScanRecord.status == "queued",
+                           ScanRecord.cancel_requested.is_(False))
+                    .values(start_time=now, heartbeat_at=now)
+                )
+            return admitted
+
+    def _running_count(self, groups: Dict[str, ScanGroupState], now: datetime) -> int:
+        return sum(1 for group in groups.values() if group.started_at is not None and group.is_live(now))
+
+    def _average_durations(self, session) -> Dict[str, float]:
+        """Son tamamlanmış taramalardan tür başına ortalama süre - ölçüm yoksa varsayılan"""
+        rows = session.execute(
+            select(ScanRecord.scan_type, ScanRecord.start_time, ScanRecord.end_time)
+            .where(ScanRecord.status == "completed", ScanRecord.start_time.is_not(None),
+                   ScanRecord.end_time.is_not(None))
+            .order_by(ScanRecord.end_time.desc())
+            .limit(DURATION_SAMPLE_SIZE)
+        ).all()
+
+        samples: Dict[str, List[float]] = {}
+        for row in rows:
+            samples.setdefault(row.scan_type, []).append((row.end_time - row.start_time).total_seconds())
+
+        durations = dict(DEFAULT_SCAN_DURATIONS)
+        durations.update({scan_type: sum(values) / len(values) for scan_type, values in samples.items()})
+        return durations
+
+    def queue_info(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        """Bekleyen taramanın sırası ve tahmini bekleme süresi (saniye) - tüm süreçlerin kuyruğuna göre
+        Henüz bir worker'a ulaşmamış (broker kuyruğundaki) taramalar da sıraya dahildir"""
+        with self.store.session() as session:
+            group_id = session.scalar(
+                select(ScanRecord.group_id).where(
+                    ScanRecord.scan_id == scan_id, ScanRecord.status == "queued", ScanRecord.start_time.is_(None)
+                )
+            )
+            if group_id is None:
+                return None
+
+            groups = self._load_groups(session)
+            durations = self._average_durations(session)
+
+        now = datetime.now()
+        default_duration = DEFAULT_SCAN_DURATIONS["standard"]
+
+        # Her çalışma yuvasının ne zaman boşalacağı: çalışan taramanın kalan tahmini süresi
+        slots = [
+            max(0.0, durations.get(group.scan_type, default_duration) - (now - group.started_at).total_seconds())
+            for group in groups.values()
+            if group.started_at is not None and group.is_live(now)
+        ]
+        slots += [0.0] * (self.max_running - len(slots))
+        heapq.heapify(slots)
+
+        # Öndeki taramalar boşalan yuvalara sırayla yerleştirilir
+        for position, group in enumerate(self._ordered_waiting(groups, now, live_only=False), start=1):
+            start = heapq.heappop(slots)
+            if group.group_id == group_id:
+                return {"queue_position": position, "estimated_wait": round(start, 1)}
+            heapq.heappush(slots, start + durations.get(group.scan_type, default_duration))
+
+        return None
+
+    @asynccontextmanager
+    async def scanner_slot(self, scanner_name: str, scan_type: str):
+        """Tarayıcı türünün genel eşzamanlılık sınırı içinde çalışma izni verir"""
+        limit = self.scanner_limits.get(scanner_name)
+        if limit is None:
+            yield
+            return
+
+        lease_id = uuid.uuid4().hex
+        await self.store.run(self._create_lease, lease_id, scanner_name, scan_priority(scan_type))
+        self._leases.add(lease_id)
+        self._ensure_background_tasks()
+        try:
+            while not await self.store.run(self._try_grant, lease_id, scanner_name, limit):
+                released = self._lease_released
+                try:
+                    await asyncio.wait_for(released.wait(), SCAN_ADMISSION_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+            yield
+        finally:
+            # İzin (veya bekleme) bırakılır; iptal edilen bekleyen de sıradan düşer
+            self._leases.discard(lease_id)
+            await self.store.run(self._delete_lease, lease_id)
+            self._lease_released.set()
+            self._lease_released = asyncio.Event()
+
+    def _create_lease(self, lease_id: str, scanner_name: str, priority: int):
+        now = datetime.now()
+        with self.store.session() as session:
+            session.add(ScannerLeaseRecord(
+                lease_id=lease_id, scanner_name=scanner_name, priority=priority, granted=False,
+                created_at=now, heartbeat_at=now
+            ))
+
+    def _delete_lease(self, lease_id: str):
+        with self.store.session() as session:
+            session.execute(delete(ScannerLeaseRecord).where(ScannerLeaseRecord.lease_id == lease_id))
+
+    def _try_grant(self, lease_id: str, scanner_name: str, limit: int) -> bool:
+        """Sırası gelmişse tarayıcı iznini verir: öncelik sınıfı, geliş sırası"""
+        stale_before = datetime.now() - timedelta(seconds=SCAN_HEARTBEAT_TIMEOUT)
+        granted_count = (
+            select(func.count()).select_from(ScannerLeaseRecord)
+            .where(ScannerLeaseRecord.scanner_name == scanner_name, ScannerLeaseRecord.granted.is_(True),
+                   ScannerLeaseRecord.heartbeat_at >= stale_before)
+        )
+
+        # Boş yer yoksa kilit alınmaz
+        with self.store.session() as session:
+            if session.scalar(granted_count) >= limit:
+                return False
+
+        with self.store.locked_session("scanner_leases") as session:
+            # Sinyali kesilen süreçlerin (çöken worker) izinleri geri alınır
+            session.execute(delete(ScannerLeaseRecord).where(ScannerLeaseRecord.heartbeat_at < stale_before))
+
+            free_slots = limit - session.scalar(granted_count)
+            if free_slots <= 0:
+                return False
+
+            next_leases = session.scalars(
+                select(ScannerLeaseRecord.lease_id)
+                .where(ScannerLeaseRecord.scanner_name == scanner_name, ScannerLeaseRecord.granted.is_(False))
+                .order_by(ScannerLeaseRecord.priority, ScannerLeaseRecord.created_at)
+                .limit(free_slots)
+            ).all()
+            if lease_id not in next_leases:
+                return False
+
+            session.execute(
+                update(ScannerLeaseRecord).where(ScannerLeaseRecord.lease_id == lease_id).values(granted=True)
+            )
+            return True
+
+    def _ensure_background_tasks(self):
+        """Bu süreçteki olay döngüsünde kuyruk yoklama ve canlılık sinyali görevlerini başlatır
+        (worker'da her görev yeni olay döngüsü açar, önceki döngünün görevleri kullanılamaz)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._lease_released = asyncio.Event()
+            self._admission_task = self._heartbeat_task = None
+
+        if self._admission_task is None or self._admission_task.done():
+            self._admission_task = loop.create_task(self._admission_loop())
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = loop.create_task(self._heartbeat())
+
+    async def _heartbeat(self):
+        """Bekleyen/çalışan grupların ve tarayıcı izinlerinin canlılık sinyalini yeniler"""
+        while True:
+            await asyncio.sleep(SCAN_HEARTBEAT_INTERVAL)
+            if not self._groups and not self._leases:
+                return
+
+            try:
+                await self.store.run(self._refresh_heartbeats, list(self._groups), list(self._leases))
+            except Exception as e:
+                logger.warning(f"Zamanlayıcı canlılık sinyali yazılamadı: {e}")
+
+    def _refresh_heartbeats(self, group_ids: List[str], lease_ids: List[str]):
+        now = datetime.now()
+        with self.store.session() as session:
+            if group_ids:
+                session.execute(
+                    update(ScanRecord)
+                    .where(ScanRecord.group_id.in_(group_ids), ScanRecord.status.in_(("queued", "running")))
+                    .values(heartbeat_at=now)
+                )
+            if lease_ids:
+                session.execute(
+                    update(ScannerLeaseRecord).where(ScannerLeaseRecord.lease_id.in_(lease_ids)).values(heartbeat_at=now)
+                )
+
+
+# Uygulama genelinde paylaşılan zamanlayıcı
+scan_scheduler = ScanScheduler()
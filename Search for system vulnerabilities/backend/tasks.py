@@ -0,0 +1,135 @@
+"""
+GuardMesh Tarama Kuyruğu
+Celery tabanlı dağıtık tarama görevleri ve worker yapılandırması
+"""
+
+import os
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from celery import Celery
+from dotenv import load_dotenv
+
+from scheduler import scan_priority
+
+
+# Ortam değişkenlerini yükle
+load_dotenv()
+
+logger = logging.getLogger("guardmesh-worker")
+
+
+# Broker ayarları - broker tanımlı değilse görevler kuyruğa hiç gönderilmez, taramalar API sürecinde çalışır
+# (yerel mod: onay ve yeniden deneme yoktur, API yeniden başlarsa çalışan taramalar kaybolur)
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL") or os.getenv("REDIS_URL")
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND") or CELERY_BROKER_URL
+USE_LOCAL_QUEUE = not CELERY_BROKER_URL
+
+# Yeniden deneme ayarları
+SCAN_TASK_MAX_RETRIES = int(os.getenv("SCAN_TASK_MAX_RETRIES", "2"))
+SCAN_TASK_RETRY_DELAY = int(os.getenv("SCAN_TASK_RETRY_DELAY", "30"))
+
+celery_app = Celery(
+    "guardmesh",
+    broker=CELERY_BROKER_URL or "memory://",
+    backend=CELERY_RESULT_BACKEND or "cache+memory://",
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    # Onay görev bittikten sonra verilir; worker çökerse görev yeniden kuyruğa girer
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    task_track_started=True,
+    result_expires=int(os.getenv("SCAN_RESULT_EXPIRES", "86400")),
+    # Redis görevi bu süre içinde onaylanmazsa başka bir worker'a verir (tam tarama 1 saati aşabilir)
+    # Öncelikli görevler (hızlı taramalar) kuyrukta öne geçer
+    broker_transport_options={
+        "visibility_timeout": int(os.getenv("SCAN_VISIBILITY_TIMEOUT", "14400")),
+        "queue_order_strategy": "priority",
+        "priority_steps": list(range(10)),
+    },
+)
+
+
+async def _run_in_worker(coro):
+    """Taramayı görevin olay döngüsünde çalıştırır; döngü kapanmadan paylaşılan HTTP oturumu kapatılır"""
+    from scanners.http_client import shared_http_client
+
+    try:
+        await coro
+    finally:
+        shared_http_client.log_stats()
+        await shared_http_client.close()
+
+
+class ScanTaskFailed(Exception):
+    """Tarama başarısız olduğunda görevi yeniden denemek için kullanılır"""
+
+
+@celery_app.task(
+    bind=True,
+    name="guardmesh.run_scan",
+    max_retries=SCAN_TASK_MAX_RETRIES,
+    default_retry_delay=SCAN_TASK_RETRY_DELAY,
+)
+def run_scan_task(self, scan_id: str, url: str, scan_type: str, scanner_names: List[str], options: Optional[dict] = None):
+    """Güvenlik taramasını worker sürecinde çalıştırır - durum ve sonuçlar ortak veritabanına yazılır"""
+    # main modülü FastAPI uygulamasını da içerdiği için döngüsel import'u önlemek adına burada yüklenir
+    from main import run_scan
+    from database import scan_store
+
+    logger.info(f"Tarama {scan_id} worker'da başlatıldı (deneme {self.request.retries + 1})")
+    asyncio.run(_run_in_worker(run_scan(scan_id, url, scan_type, scanner_names, options)))
+
+    scan_info = scan_store.get_status(scan_id) or {}
+    if scan_info.get("status") == "failed":
+        raise self.retry(exc=ScanTaskFailed(scan_info.get("error", "Tarama başarısız")))
+
+    return {"scan_id": scan_id, "status": scan_info.get("status")}
+
+
+@celery_app.task(
+    bind=True,
+    name="guardmesh.run_scan_group",
+    max_retries=SCAN_TASK_MAX_RETRIES,
+    default_retry_delay=SCAN_TASK_RETRY_DELAY,
+)
+def run_scan_group_task(self, group_id: str, targets: List[Dict[str, str]], scan_type: str, scanner_names: List[str],
+                        options: Optional[dict] = None):
+    """Aynı hostu hedefleyen taramaları worker sürecinde birlikte çalıştırır"""
+    from main import run_scan_group
+    from database import scan_store
+
+    logger.info(f"Tarama grubu {group_id} worker'da başlatıldı ({len(targets)} hedef, deneme {self.request.retries + 1})")
+    asyncio.run(_run_in_worker(run_scan_group(group_id, targets, scan_type, scanner_names, options)))
+
+    statuses = {target["scan_id"]: (scan_store.get_status(target["scan_id"]) or {}) for target in targets}
+    failed = [scan_info for scan_info in statuses.values() if scan_info.get("status") == "failed"]
+    if failed:
+        raise self.retry(exc=ScanTaskFailed(failed[0].get("error", "Tarama başarısız")))
+
+    return {"group_id": group_id, "statuses": {scan_id: scan_info.get("status") for scan_id, scan_info in statuses.items()}}
+
+
+def enqueue_scan(scan_id: str, url: str, scan_type: str, scanner_names: List[str], options: Optional[dict] = None):
+    """Taramayı kuyruğa ekler - scan_id aynı zamanda Celery görev kimliğidir"""
+    return run_scan_task.apply_async(
+        args=[scan_id, url, scan_type, scanner_names, options],
+        task_id=scan_id,
+        priority=scan_priority(scan_type),
+    )
+
+
+def enqueue_scan_group(group_id: str, targets: List[Dict[str, str]], scan_type: str, scanner_names: List[str],
+                       options: Optional[dict] = None):
+    """Host grubunu tek görev olarak kuyruğa ekler - host düzeyindeki tarayıcılar grup için bir kez çalışır"""
+    return run_scan_group_task.apply_async(
+        args=[group_id, targets, scan_type, scanner_names, options],
+        task_id=group_id,
+        priority=scan_priority(scan_type),
+    )
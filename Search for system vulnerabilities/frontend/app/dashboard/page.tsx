@@ -199,29 +199,42 @@ export default function DashboardPage() {
     fetchScanners();
   }, []);
 
-  // Gerçek tarama verileri için interval
+  // Gerçek tarama verileri için canlı olay akışı (SSE)
   useEffect(() => {
-    let statusInterval: NodeJS.Timeout;
+    let closeStream: (() => void) | undefined;
 
     if (isScanning && currentScanId) {
-      statusInterval = setInterval(async () => {
+      closeStream = scanAPI.streamScanEvents(currentScanId, async (type, data) => {
         try {
-          const statusResponse = await scanAPI.getScanStatus(currentScanId);
-          setScanProgress(statusResponse.progress);
-
-          // Engine adını güncelle (backend'den gelen mesaja göre)
-          if (
-            statusResponse.message &&
-            statusResponse.message.includes('tarayıcısı')
-          ) {
-            const engineMatch =
-              statusResponse.message.match(/(\w+) tarayıcısı/);
+          if (type === 'progress') {
+            setScanProgress(data.progress);
+            return;
+          }
+
+          if (type === 'vulnerability') {
+            setVulnerabilities((prev: any[]) => [...prev, data.vulnerability]);
+            setDetectedThreats((prev: number) => prev + 1);
+            return;
+          }
+
+          if (type === 'log') {
+            // Engine adını güncelle (backend'den gelen log satırına göre)
+            const engineMatch = data.message.match(/(\w+) tarayıcısı/);
             if (engineMatch) {
               setCurrentEngine(engineMatch[1]);
             }
+            return;
+          }
+
+          if (type !== 'status') return;
+          setScanProgress(data.progress);
+
+          if (data.status === 'failed' || data.status === 'cancelled') {
+            setIsScanning(false);
+            console.error('Tarama sonlandı:', data.error || data.status);
           }
 
-          if (statusResponse.status === 'completed') {
+          if (data.status === 'completed') {
             const resultsResponse = await scanAPI.getScanResults(currentScanId);
             setVulnerabilities(resultsResponse.vulnerabilities);
             setDetectedThreats(resultsResponse.vulnerabilities.length);
@@ -242,16 +255,15 @@ export default function DashboardPage() {
             setSecurityScore(Math.max(0, newScore));
 
             setIsScanning(false);
-            clearInterval(statusInterval);
           }
         } catch (error) {
           console.error('Tarama durumu kontrol hatası:', error);
         }
-      }, 2000);
+      });
     }
 
     return () => {
-      if (statusInterval) clearInterval(statusInterval);
+      if (closeStream) closeStream();
     };
   }, [isScanning, currentScanId]);
 
@@ -270,59 +282,8 @@ export default function DashboardPage() {
 
       // Backend API'ye tarama başlatma isteği gönder
       const response = await scanAPI.startScan(url, { scan_type: scanType });
+      // Tarama durumu, currentScanId üzerinden canlı olay akışıyla takip edilir
       setCurrentScanId(response.scan_id);
-
-      // Tarama durumunu takip et
-      const checkStatus = async () => {
-        if (!response.scan_id) return;
-
-        try {
-          const statusResponse = await scanAPI.getScanStatus(response.scan_id);
-          setScanProgress(statusResponse.progress);
-
-          if (statusResponse.status === 'completed') {
-            // Tarama tamamlandığında sonuçları al
-            const resultsResponse = await scanAPI.getScanResults(
-              response.scan_id
-            );
-            setVulnerabilities(resultsResponse.vulnerabilities);
-            setDetectedThreats(resultsResponse.vulnerabilities.length);
-
-            // Güvenlik skorunu hesapla
-            const criticalCount = resultsResponse.vulnerabilities.filter(
-              (v: any) => v.severity === 'critical'
-            ).length;
-            const highCount = resultsResponse.vulnerabilities.filter(
-              (v: any) => v.severity === 'high'
-            ).length;
-            const mediumCount = resultsResponse.vulnerabilities.filter(
-              (v: any) => v.severity === 'medium'
-            ).length;
-
-            const newScore =
-              100 - (criticalCount * 30 + highCount * 20 + mediumCount * 10);
-            setSecurityScore(Math.max(0, newScore));
-
-            setIsScanning(false);
-          } else if (statusResponse.status === 'failed') {
-            setIsScanning(false);
-            console.error('Tarama başarısız:', statusResponse.message);
-          }
-        } catch (error) {
-          console.error('Tarama durumu kontrol hatası:', error);
-        }
-      };
-
-      // Her 3 saniyede bir durumu kontrol et
-      const statusInterval = setInterval(checkStatus, 3000);
-
-      // 5 dakika sonra durumu kontrol etmeyi durdur
-      setTimeout(() => {
-        clearInterval(statusInterval);
-        if (isScanning) {
-          setIsScanning(false);
-        }
-      }, 300000);
     } catch (error) {
       console.error('Tarama başlatma hatası:', error);
       setIsScanning(false);
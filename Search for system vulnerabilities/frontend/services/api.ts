@@ -46,6 +46,12 @@ export const scanAPI = {
     return response.data;
   },
 
+  // Start scans for many targets; host-level scanners run once per host
+  startBatchScan: async (targets: string[], options?: any) => {
+    const response = await api.post('/scan/batch', { targets, ...options });
+    return response.data;
+  },
+
   // Get scan status
   getScanStatus: async (scanId: string) => {
     const response = await api.get(`/scan/status/${scanId}`);
@@ -58,6 +64,36 @@ export const scanAPI = {
     return response.data;
   },
 
+  // Subscribe to live scan events (progress, logs, new vulnerabilities) via SSE
+  streamScanEvents: (
+    scanId: string,
+    onEvent: (type: string, data: any) => void,
+    onError?: (error: Event) => void
+  ) => {
+    const source = new EventSource(`${API_BASE_URL}/scan/stream/${scanId}`);
+    const eventTypes = ['status', 'progress', 'log', 'vulnerability', 'lagged'];
+
+    eventTypes.forEach((type) => {
+      source.addEventListener(type, (event) => {
+        const data = JSON.parse((event as MessageEvent).data);
+        onEvent(type, data);
+
+        if (
+          type === 'status' &&
+          ['completed', 'failed', 'cancelled'].includes(data.status)
+        ) {
+          source.close();
+        }
+      });
+    });
+
+    source.onerror = (error) => {
+      if (onError) onError(error);
+    };
+
+    return () => source.close();
+  },
+
   // Get all scans
   getAllScans: async () => {
     const response = await api.get('/scan/list');
@@ -66,7 +102,7 @@ export const scanAPI = {
 
   // Stop a scan
   stopScan: async (scanId: string) => {
-    const response = await api.post(`/scan/stop/${scanId}`);
+    const response = await api.post(`/scan/cancel/${scanId}`);
     return response.data;
   },
 